@@ -2,6 +2,7 @@
 Django settings for backend project.
 """
 
+import os
 from pathlib import Path
 
 # ------------------------
@@ -112,6 +113,9 @@ INSTALLED_APPS = [
     
     # NEW APPS - Accounting
     'lab.components.Accounting',
+
+    # NEW APPS - Full-text Search
+    'lab.components.Search',
 ]
 
 # ------------------------
@@ -160,6 +164,33 @@ DATABASES = {
     }
 }
 
+# ------------------------
+# CACHE
+# ------------------------
+# Local memory by default; set CACHE_DIR for a cache shared by workers on one
+# host, or REDIS_URL for a cache shared across hosts.
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+elif os.environ.get('CACHE_DIR'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ['CACHE_DIR'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'lims-default',
+        }
+    }
+
 # ------------------------
 # AUTH PASSWORD VALIDATORS
 # ------------------------
@@ -190,12 +221,47 @@ STATICFILES_DIRS = [BASE_DIR / "static"]
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Let the web server send downloads: 'x-accel-redirect' (nginx) or 'x-sendfile'
+FILE_DOWNLOAD_OFFLOAD = os.environ.get('FILE_DOWNLOAD_OFFLOAD') or None
+# nginx internal location aliased to MEDIA_ROOT, used with x-accel-redirect
+FILE_DOWNLOAD_ACCEL_PREFIX = os.environ.get('FILE_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+# Chunked uploads are assembled here before moving into content-addressed storage
+FILE_UPLOAD_PARTIAL_DIR = os.environ.get('FILE_UPLOAD_PARTIAL_DIR', MEDIA_ROOT / 'partial')
+
 # Force media URLs to use backend host in development
 if DEBUG:
     # This ensures media URLs always point to the backend server
-    import os
     os.environ['DJANGO_MEDIA_HOST'] = 'http://localhost:8001'
 
+# ------------------------
+# DATABASE BACKUPS
+# ------------------------
+BACKUP_DIR = os.environ.get('BACKUP_DIR', BASE_DIR / 'backups')
+# Pages copied per step of SQLite's online backup, and the pause between steps
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_SLEEP = 0.01
+
+# ------------------------
+# LOG RETENTION
+# ------------------------
+# Days to keep SystemLog rows per level (None keeps them); see prune_system_logs
+LOG_RETENTION_DAYS = {
+    'debug': 7,
+    'info': 30,
+    'success': 30,
+    'warning': 90,
+    'error': 365,
+    'critical': None,
+    'default': 90,
+}
+LOG_ARCHIVE_DIR = os.environ.get('LOG_ARCHIVE_DIR', BASE_DIR / 'log_archive')
+
+# ------------------------
+# WORK QUEUE
+# ------------------------
+# Seconds a claimed sample or workflow stays leased before returning to the queue
+WORK_QUEUE_LEASE_SECONDS = int(os.environ.get('WORK_QUEUE_LEASE_SECONDS', 15 * 60))
+
 # ------------------------
 # DEFAULT PK FIELD TYPE
 # ------------------------
@@ -254,13 +320,20 @@ CORS_ALLOWED_METHODS = [
 # ------------------------
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Builds request.user from token claims instead of loading the row
+        'lab.components.TenantAccessAuth.authentication.ClaimsJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # Keyset pages on (created_at, id); see lab/pagination.py
+    'DEFAULT_PAGINATION_CLASS': 'lab.pagination.CreatedAtCursorPagination',
+    'PAGE_SIZE': 100,
 }
+# Page every list response, not only requests passing ?cursor= or ?page_size=.
+# Off until all API clients read the {"next", "results"} envelope.
+API_PAGINATE_BY_DEFAULT = os.environ.get('API_PAGINATE_BY_DEFAULT', 'False') == 'True'
 
 # ------------------------
 # AUTHENTICATION
@@ -268,7 +341,20 @@ REST_FRAMEWORK = {
 AUTH_USER_MODEL = 'tenantaccess_login.User'  # <-- Fixed: use app label + model name
 
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',  # keep default
-    'lab.components.TenantAccessAuth.backends.EmailBackend',  # custom email backend
+    # Email or username login in one query; extends ModelBackend for permissions
+    'lab.components.TenantAccessAuth.backends.EmailBackend',
+]
+
+# Password hashing cost. Hashes made with a different iteration count are
+# upgraded transparently on the user's next successful login.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 600000))
+
+PASSWORD_HASHERS = [
+    'lab.components.TenantAccessAuth.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
 ]
 
@@ -95,6 +95,9 @@ urlpatterns = [
     
     # Accounting
     path('api/accounting/', include('lab.components.Accounting.accounting_urls')),
+
+    # Full-text Search
+    path('api/search/', include('lab.components.Search.search_urls')),
 ]
 
 
@@ -0,0 +1,20 @@
+"""
+Helpers for code that keeps cross-request state in Django's cache.
+
+The default cache is per-process local memory unless REDIS_URL or CACHE_DIR is
+set (see backend/settings.py). State that every worker must agree on, such as
+counters or revocation markers, is only reliable when the cache is shared.
+"""
+from django.core.cache import caches
+
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def cache_is_shared(alias='default'):
+    """True when every worker process sees the same ``alias`` cache"""
+    backend = caches[alias]
+    path = f"{type(backend).__module__}.{type(backend).__name__}"
+    return path not in PROCESS_LOCAL_BACKENDS
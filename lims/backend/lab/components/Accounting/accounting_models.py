@@ -58,6 +58,9 @@ class AccountingEntry(models.Model):
     
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='accounting_entry_cursor_idx'),
+        ]
     
     def __str__(self):
         return f"{self.description} - {self.amount}"
@@ -1,4 +1,3 @@
-import time
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -11,6 +10,7 @@ from .accounting_serializers import (
     AccountingEntrySerializer, AccountingEntryListSerializer,
     FinancialReportSerializer, FinancialReportListSerializer
 )
+from lab.id_generator import new_id
 
 class AccountingEntryViewSet(viewsets.ModelViewSet):
     queryset = AccountingEntry.objects.all().order_by('-date', '-created_at')
@@ -32,7 +32,7 @@ class AccountingEntryViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing
         if not data.get('id'):
-            data['id'] = f"AE{int(time.time() * 1000)}"
+            data['id'] = new_id('AE')
         
         # Set default values
         if not data.get('tenant'):
@@ -96,7 +96,7 @@ class FinancialReportViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing
         if not data.get('id'):
-            data['id'] = f"FR{int(time.time() * 1000)}"
+            data['id'] = new_id('FR')
         
         # Set default values
         if not data.get('tenant'):
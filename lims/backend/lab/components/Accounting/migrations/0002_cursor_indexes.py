@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Accounting', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='accountingentry',
+            index=models.Index(fields=['created_at', 'id'], name='accounting_entry_cursor_idx'),
+        ),
+    ]
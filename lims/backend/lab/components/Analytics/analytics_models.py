@@ -46,6 +46,17 @@ class TestCategoryAnalytics(LabBaseModel):
     def __str__(self):
         return f"{self.category} analytics for {self.tenant} on {self.date}"
 
+class AnalyticsRollupState(LabBaseModel):
+    """High-water mark of an incremental analytics rollup"""
+    name = models.CharField(max_length=100, unique=True)
+    high_water_mark = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        app_label = 'lab'
+    
+    def __str__(self):
+        return f"{self.name} rolled up to {self.high_water_mark}"
+
 class SystemLog(LabBaseModel):
     LOG_LEVELS = [
         ('info', 'Info'),
@@ -64,6 +75,10 @@ class SystemLog(LabBaseModel):
     class Meta:
         app_label = 'lab'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='lab_systemlog_created_idx'),
+            models.Index(fields=['level', 'created_at'], name='lab_systemlog_level_idx'),
+        ]
     
     def __str__(self):
         return f"{self.level.upper()}: {self.action} by {self.user}"
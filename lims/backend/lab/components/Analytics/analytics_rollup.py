@@ -0,0 +1,299 @@
+"""
+Incremental daily rollup of LabAnalytics and TestCategoryAnalytics.
+
+Each run finds the days touched since the stored high-water mark (requests
+created or updated, samples and results changed, reports changed) and
+recomputes only those days, with one grouped query per table and chunk of
+days, upserting the rows. Today is always recomputed so the equipment status
+snapshot stays current; past days keep the snapshot they recorded.
+
+* Lab rows count TestRequests by creation day. Requests are attributed to the
+  tenant of the Sample accepted from them (ANALYTICS_DEFAULT_TENANT until a
+  sample exists). Turnaround runs from request creation to the latest
+  TestResult completion of that sample.
+* Category rows count TestReports by generation day and category.
+* Equipment counts are a snapshot of Equipment.status, taken for today's row.
+
+Run it with the ``rollup_lab_analytics`` management command.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Avg, CharField, Count, DurationField, ExpressionWrapper, F, OuterRef, Q, Subquery, Value
+)
+from django.db.models.functions import Cast, Coalesce, TruncDate
+from django.utils import timezone
+
+from lab.components.Doctor.NewTestRequest.NewTestRequest_models import TestRequest
+from lab.components.Technician.Equipment.equipment_models import Equipment
+from lab.models import Sample, TestReport, TestResult
+from .analytics_models import AnalyticsRollupState, LabAnalytics, TestCategoryAnalytics
+
+DEFAULT_TENANT = getattr(settings, 'ANALYTICS_DEFAULT_TENANT', 'default_tenant')
+ROLLUP_NAME = 'lab-daily'
+DAYS_PER_CHUNK = 90
+IDS_PER_CHUNK = 500
+
+LAB_FIELDS = ['total_tests', 'completed_tests', 'pending_tests', 'failed_tests',
+              'avg_turnaround_time', 'success_rate']
+EQUIPMENT_FIELDS = ['equipment_operational', 'equipment_maintenance', 'equipment_out_of_service']
+CATEGORY_FIELDS = ['total_tests', 'success_rate', 'avg_turnaround_time', 'failures']
+
+
+def _rate(part, total):
+    if not total:
+        return Decimal('0')
+    return (Decimal(part) * 100 / total).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def _day_range(days):
+    """Datetime bounds covering ``days``, so the date filter can use an index"""
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(min(days), time.min), tz)
+    end = timezone.make_aware(datetime.combine(max(days) + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def sample_tenant(request_ref):
+    """Tenant of the sample accepted from the TestRequest referenced by ``request_ref``"""
+    return Coalesce(
+        Subquery(
+            Sample.objects.filter(
+                test_request_id=Cast(request_ref, CharField()), tenant_id__isnull=False
+            ).values('tenant_id')[:1]
+        ),
+        Value(DEFAULT_TENANT)
+    )
+
+
+# ------------------------
+# Change detection
+# ------------------------
+def _request_days(request_ids):
+    days = set()
+    request_ids = sorted({int(pk) for pk in request_ids if pk and str(pk).isdigit()})
+    for start in range(0, len(request_ids), IDS_PER_CHUNK):
+        days.update(
+            TestRequest.objects.filter(pk__in=request_ids[start:start + IDS_PER_CHUNK])
+            .annotate(day=TruncDate('created_at')).values_list('day', flat=True).distinct()
+        )
+    return days
+
+
+def changed_days(since):
+    """Return the days whose rollup rows may have changed after ``since``"""
+    days = {timezone.localdate()}
+    requests = TestRequest.objects.all()
+    reports = TestReport.objects.all()
+    if since is not None:
+        requests = requests.filter(Q(created_at__gt=since) | Q(updated_at__gt=since))
+        reports = reports.filter(updated_at__gt=since)
+    days.update(
+        requests.annotate(day=TruncDate('created_at')).values_list('day', flat=True).distinct()
+    )
+    days.update(reports.values_list('generated_date', flat=True).distinct())
+
+    if since is not None:
+        # Samples and results move a request's tenant and turnaround
+        request_ids = set(
+            Sample.objects.filter(updated_at__gt=since).values_list('test_request_id', flat=True)
+        )
+        request_ids.update(
+            TestResult.objects.filter(updated_at__gt=since)
+            .values_list('sample__test_request_id', flat=True)
+        )
+        request_ids.update(reports.values_list('test_request_id', flat=True))
+        days.update(_request_days(request_ids))
+    return {day for day in days if day is not None}
+
+
+# ------------------------
+# Aggregation
+# ------------------------
+def _lab_rows(days):
+    start, end = _day_range(days)
+    completed_at = Subquery(
+        TestResult.objects.filter(
+            sample__test_request_id=Cast(OuterRef('pk'), CharField()),
+            completion_date__isnull=False
+        ).order_by('-completion_date').values('completion_date')[:1]
+    )
+    grouped = TestRequest.objects.filter(
+        created_at__gte=start, created_at__lt=end
+    ).annotate(
+        day=TruncDate('created_at'),
+        rollup_tenant=sample_tenant(OuterRef('pk')),
+        completed_at=completed_at,
+    ).filter(day__in=days).values('rollup_tenant', 'day').annotate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='Completed')),
+        failed=Count('id', filter=Q(status='Rejected')),
+        turnaround=Avg(
+            ExpressionWrapper(F('completed_at') - F('created_at'), output_field=DurationField()),
+            filter=Q(status='Completed', completed_at__isnull=False)
+        ),
+    ).order_by()
+
+    rows = {}
+    for row in grouped:
+        rows[(row['rollup_tenant'], row['day'])] = LabAnalytics(
+            tenant=row['rollup_tenant'],
+            date=row['day'],
+            total_tests=row['total'],
+            completed_tests=row['completed'],
+            pending_tests=row['total'] - row['completed'] - row['failed'],
+            failed_tests=row['failed'],
+            avg_turnaround_time=row['turnaround'],
+            success_rate=_rate(row['completed'], row['total']),
+        )
+    return rows
+
+
+def _equipment_snapshot():
+    grouped = Equipment.objects.values('tenant').annotate(
+        operational=Count('id', filter=Q(status='operational')),
+        maintenance=Count('id', filter=Q(status='maintenance')),
+        out_of_service=Count('id', filter=Q(status='out-of-service')),
+    ).order_by()
+    snapshot = {}
+    for row in grouped:
+        counts = snapshot.setdefault(row['tenant'] or DEFAULT_TENANT, [0, 0, 0])
+        counts[0] += row['operational']
+        counts[1] += row['maintenance']
+        counts[2] += row['out_of_service']
+    return snapshot
+
+
+def _category_rows(days):
+    grouped = TestReport.objects.filter(generated_date__in=days).annotate(
+        rollup_tenant=sample_tenant(OuterRef('test_request_id')),
+    ).values('rollup_tenant', 'category', 'generated_date').annotate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='Completed')),
+        failures=Count('id', filter=Q(status='Cancelled')),
+        turnaround=Avg(
+            ExpressionWrapper(F('completed_date') - F('generated_date'), output_field=DurationField()),
+            filter=Q(status='Completed', completed_date__isnull=False)
+        ),
+    ).order_by()
+
+    rows = {}
+    for row in grouped:
+        key = (row['rollup_tenant'], row['category'], row['generated_date'])
+        rows[key] = TestCategoryAnalytics(
+            tenant=row['rollup_tenant'],
+            category=row['category'],
+            date=row['generated_date'],
+            total_tests=row['total'],
+            success_rate=_rate(row['completed'], row['total']),
+            avg_turnaround_time=row['turnaround'],
+            failures=row['failures'],
+        )
+    return rows
+
+
+def _upsert(model, rows, unique_fields, update_fields):
+    if rows:
+        model.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=unique_fields,
+            update_fields=update_fields + ['updated_at'],
+        )
+
+
+def _delete_stale(model, days, keys, key_fields):
+    """Delete rows for ``days`` that the rollup no longer produces"""
+    existing = model.objects.filter(date__in=days).values_list('pk', *key_fields)
+    stale = [row[0] for row in existing if tuple(row[1:]) not in keys]
+    if stale:
+        model.objects.filter(pk__in=stale).delete()
+
+
+def _equipment_rows(days):
+    """(tenant, date) keys of LabAnalytics rows for ``days`` holding equipment counts"""
+    if not days:
+        return []
+    has_equipment = Q()
+    for field in EQUIPMENT_FIELDS:
+        has_equipment |= Q(**{f'{field}__gt': 0})
+    return LabAnalytics.objects.filter(has_equipment, date__in=days).values_list('tenant', 'date')
+
+
+def rollup_days(days):
+    """Recompute LabAnalytics and TestCategoryAnalytics for ``days``"""
+    days = sorted(days)
+    today = timezone.localdate()
+    now = timezone.now()
+    for start in range(0, len(days), DAYS_PER_CHUNK):
+        chunk = days[start:start + DAYS_PER_CHUNK]
+        lab_rows = _lab_rows(chunk)
+
+        if today in chunk:
+            for tenant, counts in _equipment_snapshot().items():
+                row = lab_rows.get((tenant, today))
+                if row is None:
+                    row = lab_rows[(tenant, today)] = LabAnalytics(tenant=tenant, date=today)
+                (row.equipment_operational, row.equipment_maintenance,
+                 row.equipment_out_of_service) = counts
+        # A past day's equipment snapshot cannot be retaken, so its row is kept
+        # with zeroed lab counts rather than deleted as stale
+        for key in _equipment_rows([day for day in chunk if day != today]):
+            lab_rows.setdefault(key, LabAnalytics(tenant=key[0], date=key[1]))
+
+        for row in lab_rows.values():
+            # bulk_create skips auto_now on conflict updates
+            row.created_at = row.updated_at = now
+        category_rows = _category_rows(chunk)
+        for row in category_rows.values():
+            row.created_at = row.updated_at = now
+
+        with transaction.atomic():
+            _delete_stale(LabAnalytics, chunk, set(lab_rows), ('tenant', 'date'))
+            # Equipment counts of past days stay as they were recorded
+            _upsert(
+                LabAnalytics,
+                [row for key, row in lab_rows.items() if key[1] != today],
+                ['tenant', 'date'], LAB_FIELDS
+            )
+            _upsert(
+                LabAnalytics,
+                [row for key, row in lab_rows.items() if key[1] == today],
+                ['tenant', 'date'], LAB_FIELDS + EQUIPMENT_FIELDS
+            )
+            _delete_stale(
+                TestCategoryAnalytics, chunk, set(category_rows), ('tenant', 'category', 'date')
+            )
+            _upsert(
+                TestCategoryAnalytics, list(category_rows.values()),
+                ['tenant', 'category', 'date'], CATEGORY_FIELDS
+            )
+    return len(days)
+
+
+def run_rollup(full=False, since=None):
+    """
+    Roll up every day changed since the high-water mark and advance it.
+
+    ``full`` recomputes every day with data. ``since`` (a date) recomputes
+    every day from that date on and leaves the high-water mark alone, since
+    older days may still have pending changes. Returns the number of days
+    recomputed.
+    """
+    state, _ = AnalyticsRollupState.objects.get_or_create(name=ROLLUP_NAME)
+    # Changes made while the rollup runs are picked up by the next run
+    started = timezone.now()
+
+    if since is not None:
+        days = {day for day in changed_days(None) if day >= since}
+    else:
+        days = changed_days(None if full else state.high_water_mark)
+
+    count = rollup_days(days) if days else 0
+    if since is None:
+        state.high_water_mark = started
+        state.save(update_fields=['high_water_mark', 'updated_at'])
+    return count
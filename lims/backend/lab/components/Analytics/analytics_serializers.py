@@ -31,3 +31,10 @@ class AnalyticsSummarySerializer(serializers.Serializer):
     critical_failures = serializers.IntegerField()
     equipment_status = serializers.DictField()
     test_categories = serializers.ListField()
+
+class TurnaroundGroupSerializer(serializers.Serializer):
+    key = serializers.CharField(allow_null=True)
+    count = serializers.IntegerField()
+    p50 = serializers.DurationField(allow_null=True)
+    p90 = serializers.DurationField(allow_null=True)
+    p99 = serializers.DurationField(allow_null=True)
@@ -0,0 +1,136 @@
+"""
+Turnaround-time (TAT) percentiles.
+
+Each TestRequest is one order; its timeline is
+
+    created_at (TestRequest) -> received_date (Sample) -> completion_date (TestResult)
+
+taking the latest result completion of the request's sample. Segments:
+
+* ``total``: request created to result completed (the SLA figure)
+* ``pre_analytical``: request created to sample received
+* ``analytical``: sample received to result completed
+
+Percentiles use the nearest-rank method and are computed in the database: rows
+are numbered within each group by a window function and only the rows at the
+p50/p90/p99 ranks are returned, so the cost does not depend on Python looping
+over every order. Results are cached for ANALYTICS_TAT_CACHE_TTL seconds.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import (
+    CharField, Count, DurationField, ExpressionWrapper, F, OuterRef, Q, Subquery, Window
+)
+from django.db.models.functions import Cast, Coalesce, RowNumber
+
+from lab.components.Doctor.NewTestRequest.NewTestRequest_models import TestRequest
+from lab.models import Sample, TestResult
+from .analytics_rollup import sample_tenant
+
+TAT_CACHE_TTL = getattr(settings, 'ANALYTICS_TAT_CACHE_TTL', 300)
+
+# Percentile name -> percent; nearest rank is ceil(count * percent / 100)
+PERCENTILES = {'p50': 50, 'p90': 90, 'p99': 99}
+SEGMENTS = {
+    'total': ('created_at', 'completed_at'),
+    'pre_analytical': ('created_at', 'received_at'),
+    'analytical': ('received_at', 'completed_at'),
+}
+# Group name -> annotation holding the group key
+DIMENSIONS = {
+    'category': 'tat_category',
+    'priority': 'priority',
+    'tenant': 'tat_tenant',
+}
+
+
+def timelines(start=None, end=None, tenant=None):
+    """TestRequests annotated with the timestamps of their sample and results"""
+    request_ref = Cast(OuterRef('pk'), CharField())
+    queryset = TestRequest.objects.annotate(
+        received_at=Subquery(
+            Sample.objects.filter(test_request_id=request_ref).values('received_date')[:1]
+        ),
+        completed_at=Subquery(
+            TestResult.objects.filter(
+                sample__test_request_id=request_ref, completion_date__isnull=False
+            ).order_by('-completion_date').values('completion_date')[:1]
+        ),
+        # Reports carry the lab category; fall back to the requested test type
+        tat_category=Coalesce('report__category', 'test_type'),
+        tat_tenant=sample_tenant(OuterRef('pk')),
+    )
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=start)
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=end)
+    if tenant:
+        queryset = queryset.filter(tat_tenant=tenant)
+    return queryset
+
+
+def _percentile_rows(queryset, segment, dimension=None):
+    begin, finish = SEGMENTS[segment]
+    partition = [F(DIMENSIONS[dimension])] if dimension else None
+    ranked = queryset.filter(
+        **{f'{begin}__isnull': False, f'{finish}__isnull': False}
+    ).annotate(
+        tat=ExpressionWrapper(F(finish) - F(begin), output_field=DurationField()),
+    ).annotate(
+        tat_rank=Window(RowNumber(), partition_by=partition, order_by=F('tat').asc()),
+        tat_count=Window(Count('id'), partition_by=partition),
+    )
+    at_percentile = Q()
+    for percent in PERCENTILES.values():
+        # Integer ceiling division, identical in SQL and Python
+        at_percentile |= Q(tat_rank=(F('tat_count') * percent + 99) / 100)
+    fields = ['tat_rank', 'tat_count', 'tat']
+    if dimension:
+        fields.append(DIMENSIONS[dimension])
+    return ranked.filter(at_percentile).values(*fields)
+
+
+def percentiles(queryset, segment='total', dimension=None):
+    """
+    Return ``[{'key', 'count', 'p50', 'p90', 'p99'}]`` for each group of
+    ``dimension`` (a single overall group when None), largest groups first.
+    """
+    groups = {}
+    for row in _percentile_rows(queryset, segment, dimension):
+        key = row[DIMENSIONS[dimension]] if dimension else None
+        group = groups.setdefault(key, {'key': key, 'count': row['tat_count']})
+        for name, percent in PERCENTILES.items():
+            if row['tat_rank'] == (row['tat_count'] * percent + 99) // 100:
+                group[name] = row['tat']
+    for group in groups.values():
+        for name in PERCENTILES:
+            group.setdefault(name, None)
+    return sorted(groups.values(), key=lambda group: -group['count'])
+
+
+def turnaround_report(segment='total', dimensions=tuple(DIMENSIONS), start=None, end=None,
+                      tenant=None, refresh=False):
+    """Cached TAT percentiles overall and per requested dimension"""
+    params = json.dumps(
+        [segment, list(dimensions), start, end, tenant], sort_keys=True, default=str
+    )
+    key = f"analytics:tat:{hashlib.md5(params.encode()).hexdigest()}"
+    report = None if refresh else cache.get(key)
+    if report is None:
+        queryset = timelines(start, end, tenant)
+        overall = percentiles(queryset, segment)
+        report = {
+            'segment': segment,
+            'start': start,
+            'end': end,
+            'overall': overall[0] if overall else {
+                'key': None, 'count': 0, **{name: None for name in PERCENTILES}
+            },
+        }
+        for dimension in dimensions:
+            report[f'by_{dimension}'] = percentiles(queryset, segment, dimension)
+        cache.set(key, report, TAT_CACHE_TTL)
+    return report
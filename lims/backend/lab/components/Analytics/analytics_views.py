@@ -3,13 +3,19 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from django.db.models import Avg, Count, Sum
+from django.db.models import Avg, Count, Q, Subquery, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from datetime import datetime, timedelta
 from .analytics_models import LabAnalytics, TestCategoryAnalytics, SystemLog
 from .analytics_serializers import (
     LabAnalyticsSerializer, TestCategoryAnalyticsSerializer, 
-    SystemLogSerializer, SystemLogListSerializer, AnalyticsSummarySerializer
+    SystemLogSerializer, SystemLogListSerializer, AnalyticsSummarySerializer,
+    TurnaroundGroupSerializer
 )
+from .analytics_turnaround import DIMENSIONS, SEGMENTS, turnaround_report
+from .analytics_export import ENCODERS, export_response
+from .log_retention import archive_query, read_archive
 
 class LabAnalyticsViewSet(viewsets.ModelViewSet):
     queryset = LabAnalytics.objects.all()
@@ -27,29 +33,36 @@ class LabAnalyticsViewSet(viewsets.ModelViewSet):
         end_date = datetime.now().date()
         start_date = end_date - timedelta(days=days)
         
-        queryset = self.get_queryset()
+        queryset = LabAnalytics.objects.filter(date__range=[start_date, end_date])
         if tenant:
             queryset = queryset.filter(tenant=tenant)
         
-        queryset = queryset.filter(date__range=[start_date, end_date])
-        
-        # Calculate summary statistics
-        total_tests = queryset.aggregate(total=Sum('total_tests'))['total'] or 0
-        avg_success_rate = queryset.aggregate(avg=Avg('success_rate'))['avg'] or 0
-        critical_failures = queryset.aggregate(total=Sum('failed_tests'))['total'] or 0
-        
-        # Equipment status
-        latest_analytics = queryset.order_by('-date').first()
+        # Rows are precomputed by the rollup_lab_analytics command. Equipment
+        # counts come from the latest rolled-up day, across tenants if unfiltered.
+        latest_date = queryset.order_by('-date').values('date')[:1]
+        latest = Q(date=Subquery(latest_date))
+        totals = queryset.aggregate(
+            total_tests=Sum('total_tests'),
+            completed_tests=Sum('completed_tests'),
+            critical_failures=Sum('failed_tests'),
+            avg_turnaround_time=Avg('avg_turnaround_time'),
+            operational=Sum('equipment_operational', filter=latest),
+            maintenance=Sum('equipment_maintenance', filter=latest),
+            out_of_service=Sum('equipment_out_of_service', filter=latest),
+        )
+        total_tests = totals['total_tests'] or 0
+        success_rate = (totals['completed_tests'] or 0) * 100 / total_tests if total_tests else 0
         equipment_status = {
-            'operational': latest_analytics.equipment_operational if latest_analytics else 0,
-            'maintenance': latest_analytics.equipment_maintenance if latest_analytics else 0,
-            'out_of_service': latest_analytics.equipment_out_of_service if latest_analytics else 0,
+            'operational': totals['operational'] or 0,
+            'maintenance': totals['maintenance'] or 0,
+            'out_of_service': totals['out_of_service'] or 0,
         }
         
         # Test categories
-        category_analytics = TestCategoryAnalytics.objects.filter(
-            tenant=tenant, date__range=[start_date, end_date]
-        ).values('category').annotate(
+        category_analytics = TestCategoryAnalytics.objects.filter(date__range=[start_date, end_date])
+        if tenant:
+            category_analytics = category_analytics.filter(tenant=tenant)
+        category_analytics = category_analytics.values('category').annotate(
             total_tests=Sum('total_tests'),
             avg_success_rate=Avg('success_rate'),
             failures=Sum('failures')
@@ -57,9 +70,9 @@ class LabAnalyticsViewSet(viewsets.ModelViewSet):
         
         summary_data = {
             'total_tests': total_tests,
-            'success_rate': float(avg_success_rate),
-            'avg_turnaround_time': None,  # Would need to calculate from actual test data
-            'critical_failures': critical_failures,
+            'success_rate': round(success_rate, 2),
+            'avg_turnaround_time': totals['avg_turnaround_time'],
+            'critical_failures': totals['critical_failures'] or 0,
             'equipment_status': equipment_status,
             'test_categories': list(category_analytics)
         }
@@ -67,6 +80,57 @@ class LabAnalyticsViewSet(viewsets.ModelViewSet):
         serializer = AnalyticsSummarySerializer(summary_data)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def turnaround(self, request):
+        """
+        Turnaround-time percentiles (p50/p90/p99), overall and per group.
+
+        Query params: segment (total, pre_analytical, analytical), group_by
+        (comma-separated: category, priority, tenant), days (default 30),
+        tenant, refresh=true to bypass the cache.
+        """
+        segment = request.query_params.get('segment', 'total')
+        if segment not in SEGMENTS:
+            return Response(
+                {'error': f"segment must be one of: {', '.join(SEGMENTS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        group_by = request.query_params.get('group_by')
+        dimensions = [name for name in group_by.split(',') if name] if group_by else list(DIMENSIONS)
+        unknown = [name for name in dimensions if name not in DIMENSIONS]
+        if unknown:
+            return Response(
+                {'error': f"group_by must be among: {', '.join(DIMENSIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            days = int(request.query_params.get('days', 30))
+        except ValueError:
+            return Response({'error': 'days must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Day-aligned window so the cache key is stable within a day
+        midnight = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        end = midnight + timedelta(days=1)
+        start = end - timedelta(days=days)
+        report = turnaround_report(
+            segment=segment,
+            dimensions=dimensions,
+            start=start,
+            end=end,
+            tenant=request.query_params.get('tenant'),
+            refresh=request.query_params.get('refresh') == 'true'
+        )
+        
+        data = {
+            'segment': report['segment'],
+            'start': report['start'],
+            'end': report['end'],
+            'overall': TurnaroundGroupSerializer(report['overall']).data,
+        }
+        for dimension in dimensions:
+            data[f'by_{dimension}'] = TurnaroundGroupSerializer(report[f'by_{dimension}'], many=True).data
+        return Response(data)
+
 class TestCategoryAnalyticsViewSet(viewsets.ModelViewSet):
     queryset = TestCategoryAnalytics.objects.all()
     serializer_class = TestCategoryAnalyticsSerializer
@@ -89,9 +153,70 @@ class SystemLogViewSet(viewsets.ModelViewSet):
             return SystemLogListSerializer
         return SystemLogSerializer
     
+    @action(detail=False, methods=['get'])
+    def archived(self, request):
+        """Query logs pruned into the archive (start/end dates, level, search, limit)"""
+        try:
+            params = archive_query(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(list(read_archive(SystemLog, search_fields=self.search_fields, **params)))
+    
     @action(detail=False, methods=['get'])
     def export(self, request):
-        # Export logs functionality
+        """
+        Stream the filtered logs as json (default), ndjson or csv.
+
+        Query params: export_format, gzip=true, start/end (ISO date or
+        datetime bounds on created_at), after_id and limit for keyset paging.
+        When more rows follow a limited page, X-Next-After-Id holds the
+        after_id of the next page.
+        """
+        export_format = request.query_params.get('export_format', 'json')
+        if export_format not in ENCODERS:
+            return Response(
+                {'error': f"export_format must be one of: {', '.join(ENCODERS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         queryset = self.filter_queryset(self.get_queryset())
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        
+        try:
+            for param, lookup in (('start', 'created_at__gte'), ('end', 'created_at__lt')):
+                value = request.query_params.get(param)
+                if value:
+                    bound = parse_datetime(value) or datetime.combine(parse_date(value), datetime.min.time())
+                    if timezone.is_naive(bound):
+                        bound = timezone.make_aware(bound)
+                    queryset = queryset.filter(**{lookup: bound})
+            after_id = request.query_params.get('after_id')
+            if after_id:
+                queryset = queryset.filter(id__gt=int(after_id))
+            limit = request.query_params.get('limit')
+            limit = int(limit) if limit else None
+            if limit is not None and limit < 1:
+                raise ValueError(limit)
+        except (TypeError, ValueError):
+            return Response(
+                {'error': 'start/end must be ISO dates, after_id and limit positive integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        next_after_id = None
+        if limit:
+            # The row after this page exists only if the page is full
+            edge = list(queryset.order_by('id').values_list('id', flat=True)[limit - 1:limit + 1])
+            if len(edge) == 2:
+                next_after_id = edge[0]
+        
+        fields = list(SystemLogSerializer.Meta.fields)
+        response = export_response(
+            queryset,
+            fields,
+            export_format,
+            filename=f"system_logs_{timezone.now():%Y%m%d%H%M%S}",
+            compress=request.query_params.get('gzip') == 'true',
+            limit=limit
+        )
+        if next_after_id is not None:
+            response['X-Next-After-Id'] = str(next_after_id)
+        return response
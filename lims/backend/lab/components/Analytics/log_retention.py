@@ -0,0 +1,183 @@
+"""
+Retention and archival for the SystemLog tables.
+
+Both ``superadmin.SystemLog`` and the Analytics ``SystemLog`` keep rows for a
+number of days that depends on their level (LOG_RETENTION_DAYS; ``None`` keeps
+a level forever). Expired rows are removed in batches of LOG_RETENTION_BATCH_SIZE,
+each in its own short transaction, with LOG_RETENTION_BATCH_SLEEP seconds between
+batches so writers are never locked out for long.
+
+Before a batch is deleted it is appended to date-partitioned archives under
+LOG_ARCHIVE_DIR::
+
+    <db_table>/<YYYY>/<MM>/<YYYY-MM-DD>.ndjson.gz
+
+one JSON object per row. Each batch is written as its own gzip member, so
+appending never rewrites a file. ``read_archive`` scans the partitions of a date
+range on demand. If a run is interrupted between archiving and deleting a batch,
+the next run archives those rows again; readers see them twice.
+
+Run it with the ``prune_system_logs`` management command.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+import gzip
+import json
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from lab.components.superadmin.models import SystemLog as SuperAdminSystemLog
+from .analytics_models import SystemLog
+
+LOG_RETENTION_DAYS = getattr(settings, 'LOG_RETENTION_DAYS', {
+    'debug': 7,
+    'info': 30,
+    'success': 30,
+    'warning': 90,
+    'error': 365,
+    'critical': None,
+    'default': 90,
+})
+LOG_RETENTION_BATCH_SIZE = getattr(settings, 'LOG_RETENTION_BATCH_SIZE', 1000)
+LOG_RETENTION_BATCH_SLEEP = getattr(settings, 'LOG_RETENTION_BATCH_SLEEP', 0.05)
+LOG_ARCHIVE_QUERY_DAYS = 30
+# Widest start..end span one query may scan, one partition per day
+LOG_ARCHIVE_MAX_QUERY_DAYS = 366
+LOG_ARCHIVE_MAX_ROWS = 1000
+LOG_ARCHIVE_DIR = Path(getattr(settings, 'LOG_ARCHIVE_DIR', Path(settings.BASE_DIR) / 'log_archive'))
+
+LOG_MODELS = {
+    'superadmin': SuperAdminSystemLog,
+    'analytics': SystemLog,
+}
+
+
+def _fields(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def expired_filter(model, now=None):
+    """Q matching the rows of ``model`` past their level's retention"""
+    now = now or timezone.now()
+    levels = [level for level, _ in model.LOG_LEVELS]
+    expired = Q(pk__in=[])
+    for level in levels + [None]:
+        days = LOG_RETENTION_DAYS.get(level or 'default', LOG_RETENTION_DAYS.get('default'))
+        if days is None:
+            continue
+        # Rows with a level outside LOG_LEVELS fall under 'default'
+        matches_level = Q(level=level) if level else ~Q(level__in=levels)
+        expired |= matches_level & Q(created_at__lt=now - timedelta(days=days))
+    return expired
+
+
+# ------------------------
+# Archive files
+# ------------------------
+def partition_path(model, day):
+    return LOG_ARCHIVE_DIR / model._meta.db_table / f"{day:%Y}" / f"{day:%m}" / f"{day:%Y-%m-%d}.ndjson.gz"
+
+
+def _archive_rows(model, rows):
+    by_day = defaultdict(list)
+    for row in rows:
+        by_day[timezone.localdate(row['created_at'])].append(row)
+    for day, day_rows in by_day.items():
+        path = partition_path(model, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, 'at', encoding='utf-8') as archive:
+            for row in day_rows:
+                archive.write(json.dumps(row, default=str) + '\n')
+
+
+def read_archive(model, start, end, level=None, search=None, search_fields=(), limit=None):
+    """
+    Yield archived rows of ``model`` created in the days ``start`` to ``end``
+    (inclusive), newest first. ``search`` is matched case-insensitively
+    against ``search_fields``.
+    """
+    search = search.lower() if search else None
+    day = end
+    returned = 0
+    while day >= start:
+        path = partition_path(model, day)
+        day -= timedelta(days=1)
+        if not path.exists():
+            continue
+        # A partition holds one day of rows, so reading it whole stays bounded
+        with gzip.open(path, 'rt', encoding='utf-8') as archive:
+            rows = [json.loads(line) for line in archive if line.strip()]
+        rows.sort(key=lambda row: (parse_datetime(row['created_at']), row['id']), reverse=True)
+        for row in rows:
+            if level and row.get('level') != level:
+                continue
+            if search and not any(search in str(row.get(field) or '').lower() for field in search_fields):
+                continue
+            yield row
+            returned += 1
+            if limit is not None and returned >= limit:
+                return
+
+
+def archive_query(query_params):
+    """
+    Read ``start``, ``end`` (ISO dates), ``level``, ``search`` and ``limit``
+    from request query params as keyword arguments for ``read_archive``.
+    Raises ValueError for malformed values and for spans over
+    LOG_ARCHIVE_MAX_QUERY_DAYS, which callers page through by moving ``end``.
+    """
+    end = query_params.get('end')
+    end = parse_date(end) if end else timezone.localdate()
+    start = query_params.get('start')
+    if start:
+        start = parse_date(start)
+    elif end is not None:
+        start = end - timedelta(days=LOG_ARCHIVE_QUERY_DAYS)
+    if start is None or end is None or start > end:
+        raise ValueError('start and end must be ISO dates with start <= end')
+    if (end - start).days >= LOG_ARCHIVE_MAX_QUERY_DAYS:
+        raise ValueError(f'start and end may span at most {LOG_ARCHIVE_MAX_QUERY_DAYS} days')
+    limit = int(query_params.get('limit', 100))
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return {
+        'start': start,
+        'end': end,
+        'level': query_params.get('level'),
+        'search': query_params.get('search'),
+        'limit': min(limit, LOG_ARCHIVE_MAX_ROWS),
+    }
+
+
+# ------------------------
+# Pruning
+# ------------------------
+def prune(model, archive=True, dry_run=False, now=None, batch_size=None):
+    """
+    Archive and delete the expired rows of ``model`` and return how many
+    there were. ``dry_run`` only counts them.
+    """
+    expired = model.objects.filter(expired_filter(model, now))
+    if dry_run:
+        return expired.count()
+
+    batch_size = batch_size or LOG_RETENTION_BATCH_SIZE
+    fields = _fields(model)
+    removed = 0
+    while True:
+        ids = list(expired.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return removed
+        if archive:
+            _archive_rows(model, model.objects.filter(pk__in=ids).order_by('id').values(*fields))
+        with transaction.atomic():
+            removed += model.objects.filter(pk__in=ids).delete()[0]
+        if len(ids) < batch_size:
+            return removed
+        time.sleep(LOG_RETENTION_BATCH_SLEEP)
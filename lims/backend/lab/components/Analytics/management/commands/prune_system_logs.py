@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from lab.components.Analytics.log_retention import LOG_MODELS, prune
+
+
+class Command(BaseCommand):
+    help = 'Archive and delete system log rows older than their level\'s retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--table',
+            choices=sorted(LOG_MODELS),
+            help='Prune only this log table (default: all)',
+        )
+        parser.add_argument(
+            '--no-archive',
+            action='store_true',
+            help='Delete expired rows without archiving them',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows have expired',
+        )
+
+    def handle(self, *args, **options):
+        tables = [options['table']] if options['table'] else sorted(LOG_MODELS)
+        for table in tables:
+            count = prune(
+                LOG_MODELS[table],
+                archive=not options['no_archive'],
+                dry_run=options['dry_run'],
+            )
+            verb = 'would be pruned' if options['dry_run'] else 'pruned'
+            self.stdout.write(self.style.SUCCESS(f'{table}: {count} log rows {verb}'))
@@ -0,0 +1,30 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from lab.components.Analytics.analytics_rollup import run_rollup
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily lab and test category analytics for days changed since the last run'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every day instead of only the days changed since the last run',
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Recompute every day from this date (YYYY-MM-DD) on',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be a date in YYYY-MM-DD format')
+
+        days = run_rollup(full=options['full'], since=since)
+        self.stdout.write(self.style.SUCCESS(f'Rolled up analytics for {days} days'))
@@ -1,4 +1,3 @@
-import time
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -10,6 +9,7 @@ from .branch_serializers import (
     BranchSerializer, BranchListSerializer,
     BranchStaffSerializer, BranchStaffListSerializer
 )
+from lab.id_generator import new_id
 
 class BranchViewSet(viewsets.ModelViewSet):
     queryset = Branch.objects.all().order_by('name')
@@ -31,7 +31,7 @@ class BranchViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing
         if not data.get('id'):
-            data['id'] = f"BR{int(time.time() * 1000)}"
+            data['id'] = new_id('BR')
         
         # Set default values
         if not data.get('tenant'):
@@ -80,7 +80,7 @@ class BranchStaffViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing
         if not data.get('id'):
-            data['id'] = f"BS{int(time.time() * 1000)}"
+            data['id'] = new_id('BS')
         
         # Set default values
         if not data.get('tenant'):
@@ -10,6 +10,7 @@ from .contract_serializers import (
     ContractSerializer, ContractListSerializer,
     ContractRenewalSerializer, ContractRenewalListSerializer
 )
+from lab.id_generator import new_id
 
 class ContractViewSet(viewsets.ModelViewSet):
     queryset = Contract.objects.all().order_by('-created_at')
@@ -31,7 +32,7 @@ class ContractViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing or empty
         if not data.get('id') or data.get('id') == '':
-            data['id'] = f"CT{int(time.time() * 1000)}"
+            data['id'] = new_id('CT')
         
         # Set default values
         if not data.get('tenant'):
@@ -89,7 +90,7 @@ class ContractViewSet(viewsets.ModelViewSet):
         if new_end_date:
             # Create renewal record
             renewal_data = {
-                'id': f"CR{int(time.time() * 1000)}",
+                'id': new_id('CR'),
                 'contract': contract.id,
                 'renewal_date': time.strftime('%Y-%m-%d'),
                 'new_end_date': new_end_date,
@@ -130,7 +131,7 @@ class ContractRenewalViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing
         if not data.get('id'):
-            data['id'] = f"CR{int(time.time() * 1000)}"
+            data['id'] = new_id('CR')
         
         # Set default values
         if not data.get('tenant'):
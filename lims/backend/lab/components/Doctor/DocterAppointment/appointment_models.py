@@ -1,5 +1,6 @@
 from django.db import models
 from datetime import date, time
+from lab.field_tracking import FieldTrackerMixin, FieldTrackerQuerySet
 
 # Status choices for appointments
 STATUS_CHOICES = [
@@ -19,7 +20,7 @@ TYPE_CHOICES = [
     ('Emergency', 'Emergency'),
 ]
 
-class Appointment(models.Model):
+class Appointment(FieldTrackerMixin, models.Model):
     patient_id = models.CharField(max_length=50)
     patient_name = models.CharField(max_length=255)
     doctor_id = models.CharField(max_length=50, default='current_doctor')
@@ -32,6 +33,9 @@ class Appointment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    tracked_fields = ('status',)
+    objects = FieldTrackerQuerySet.as_manager()
+
     class Meta:
         app_label = 'lab'
         ordering = ['appointment_date', 'appointment_time']
@@ -1,5 +1,6 @@
 from django.db import models
 from datetime import date
+from lab.field_tracking import FieldTrackerMixin, FieldTrackerQuerySet
 
 # Optional: define choices for priority
 PRIORITY_CHOICES = [
@@ -17,7 +18,7 @@ STATUS_CHOICES = [
     ('Completed', 'Completed'),
 ]
 
-class TestRequest(models.Model):
+class TestRequest(FieldTrackerMixin, models.Model):
     patient_id = models.CharField(max_length=50, default='UNKNOWN')   # default for existing rows
     patient_name = models.CharField(max_length=255, default='UNKNOWN')
     test_type = models.CharField(max_length=255, default='General')
@@ -26,8 +27,12 @@ class TestRequest(models.Model):
     notes = models.TextField(blank=True, null=True)
     date_requested = models.DateField(default=date.today)  # default today to avoid migration issues
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
     accepted = models.BooleanField(default=False)
 
+    tracked_fields = ('status',)
+    objects = FieldTrackerQuerySet.as_manager()
+
     class Meta:
         app_label = 'lab'
 
@@ -36,6 +36,9 @@ class Patient(models.Model):
     class Meta:
         app_label = 'lab'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='lab_patient_cursor_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.patient_id})"
@@ -0,0 +1,90 @@
+"""
+Content-addressed storage for uploaded files.
+
+Every upload is stored once under ``blobs/<aa>/<bb>/<sha256>`` in the default
+storage; FileUpload rows with identical content share that file and differ only
+in metadata. Files are never rewritten, so rows can point at the same name.
+
+Chunked uploads are assembled in FILE_UPLOAD_PARTIAL_DIR, one file per
+UploadSession, and moved into blob storage on commit.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+BLOB_PREFIX = 'blobs'
+HASH_BLOCK_SIZE = 1024 * 1024
+UPLOAD_CHUNK_SIZE = getattr(settings, 'FILE_UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024)
+UPLOAD_MAX_CHUNK_SIZE = getattr(settings, 'FILE_UPLOAD_MAX_CHUNK_SIZE', 32 * 1024 * 1024)
+UPLOAD_SESSION_TTL = getattr(settings, 'FILE_UPLOAD_SESSION_TTL', 24 * 60 * 60)
+PARTIAL_DIR = Path(getattr(settings, 'FILE_UPLOAD_PARTIAL_DIR', Path(settings.MEDIA_ROOT) / 'partial'))
+
+
+def blob_name(digest):
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def hash_file(fileobj):
+    """Return ``(sha256 hex digest, size)`` reading ``fileobj`` from the start"""
+    fileobj.seek(0)
+    digest = hashlib.sha256()
+    size = 0
+    for block in iter(lambda: fileobj.read(HASH_BLOCK_SIZE), b''):
+        digest.update(block)
+        size += len(block)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+def store_blob(fileobj, digest=None):
+    """
+    Store ``fileobj`` by content and return ``(name, digest, size)``.
+
+    Content that is already stored is not written again.
+    """
+    if digest is None:
+        digest, size = hash_file(fileobj)
+    else:
+        fileobj.seek(0, os.SEEK_END)
+        size = fileobj.tell()
+        fileobj.seek(0)
+    name = blob_name(digest)
+    if not default_storage.exists(name):
+        # A concurrent identical upload may win the race; its suffixed copy is still valid
+        name = default_storage.save(name, File(fileobj))
+    return name, digest, size
+
+
+# ------------------------
+# Partial files for chunked uploads
+# ------------------------
+def partial_path(session):
+    return PARTIAL_DIR / str(session.pk)
+
+
+def append_chunk(session, stream, length):
+    """Append ``length`` bytes from ``stream`` to the session's partial file"""
+    path = partial_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(path, 'ab') as partial:
+        # Drop bytes past the acknowledged offset left by an interrupted request
+        partial.truncate(session.received_bytes)
+        while written < length:
+            block = stream.read(min(HASH_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            partial.write(block)
+            written += len(block)
+    return written
+
+
+def discard_partial(session):
+    try:
+        partial_path(session).unlink()
+    except FileNotFoundError:
+        pass
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+import uuid
 
 User = get_user_model()
 from lab.models import LabBaseModel
@@ -23,6 +24,7 @@ class FileUpload(LabBaseModel):
     is_public = models.BooleanField(default=False)
     description = models.TextField(blank=True, null=True)
     download_count = models.PositiveIntegerField(default=0)
+    content_hash = models.CharField(max_length=64, blank=True, db_index=True, help_text="SHA-256 of the stored blob")
     
     class Meta:
         app_label = 'lab'
@@ -47,3 +49,32 @@ class FileShare(LabBaseModel):
     
     def __str__(self):
         return f"{self.file.name} shared with {self.shared_with.username}"
+
+class UploadSession(LabBaseModel):
+    """A chunked upload in progress; chunks are appended in order until commit"""
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('complete', 'Complete'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    name = models.CharField(max_length=255)
+    file_type = models.CharField(max_length=20, choices=FileUpload.FILE_TYPES)
+    tenant = models.CharField(max_length=100, null=True, blank=True)
+    is_public = models.BooleanField(default=False)
+    description = models.TextField(blank=True, null=True)
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='upload_sessions')
+    total_size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    expected_hash = models.CharField(max_length=64, blank=True, help_text="Optional client SHA-256, checked on commit")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    expires_at = models.DateTimeField()
+    file_upload = models.ForeignKey(FileUpload, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions')
+
+    class Meta:
+        app_label = 'lab'
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.name} ({self.received_bytes}/{self.total_size})"
@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .file_models import FileUpload, FileShare
+from .file_models import FileUpload, FileShare, UploadSession
+from .file_blobs import UPLOAD_CHUNK_SIZE
 
 class FileUploadSerializer(serializers.ModelSerializer):
     uploaded_by_name = serializers.CharField(source='uploaded_by.username', read_only=True)
@@ -9,7 +10,8 @@ class FileUploadSerializer(serializers.ModelSerializer):
         model = FileUpload
         fields = ['id', 'name', 'file', 'file_url', 'file_type', 'file_size', 
                  'uploaded_by', 'uploaded_by_name', 'tenant', 'is_public', 
-                 'description', 'download_count', 'created_at', 'updated_at']
+                 'description', 'download_count', 'content_hash', 'created_at', 'updated_at']
+        read_only_fields = ['content_hash']
     
     def get_file_url(self, obj):
         if obj.file:
@@ -39,3 +41,22 @@ class FileShareSerializer(serializers.ModelSerializer):
         model = FileShare
         fields = ['id', 'file', 'file_name', 'shared_with', 'shared_with_name', 
                  'shared_by', 'shared_by_name', 'permission', 'expires_at', 'created_at']
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    chunk_size = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'name', 'file_type', 'tenant', 'is_public', 'description',
+                 'total_size', 'received_bytes', 'expected_hash', 'chunk_size',
+                 'status', 'expires_at', 'file_upload', 'created_at']
+        read_only_fields = ['received_bytes', 'status', 'expires_at', 'file_upload']
+    
+    def get_chunk_size(self, obj):
+        return UPLOAD_CHUNK_SIZE
+    
+    def validate_expected_hash(self, value):
+        value = (value or '').lower()
+        if value and (len(value) != 64 or any(c not in '0123456789abcdef' for c in value)):
+            raise serializers.ValidationError('Expected a hex SHA-256 digest')
+        return value
@@ -0,0 +1,137 @@
+"""
+Streaming responses for stored uploads.
+
+Files are sent from storage in FILE_DOWNLOAD_CHUNK_SIZE pieces rather than read
+into memory. Every response carries an ETag and Last-Modified header, so
+conditional GETs are answered with 304 and range requests resuming a download
+get 206 with only the requested bytes.
+
+With FILE_DOWNLOAD_OFFLOAD set to 'x-accel-redirect' (nginx) or 'x-sendfile'
+(Apache, lighttpd) Django only authorises the download and the web server
+sends the bytes; nginx needs an internal location for
+FILE_DOWNLOAD_ACCEL_PREFIX aliased to MEDIA_ROOT.
+"""
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+DOWNLOAD_CHUNK_SIZE = getattr(settings, 'FILE_DOWNLOAD_CHUNK_SIZE', 64 * 1024)
+DOWNLOAD_OFFLOAD = getattr(settings, 'FILE_DOWNLOAD_OFFLOAD', None)
+DOWNLOAD_ACCEL_PREFIX = getattr(settings, 'FILE_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_etag(file_upload):
+    """Strong validator that changes whenever the stored file is replaced"""
+    return f'"{file_upload.pk}-{file_upload.file_size}-{int(file_upload.updated_at.timestamp())}"'
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single-range ``Range`` header.
+
+    Returns None when the header is absent, malformed or asks for several
+    ranges (the whole file is sent instead) and raises ValueError when the
+    range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError('Empty suffix range')
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+
+def _iter_range(file, start, length):
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(DOWNLOAD_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def _content_disposition(filename):
+    try:
+        filename.encode('ascii')
+        return f'attachment; filename="{filename}"'
+    except UnicodeEncodeError:
+        return f"attachment; filename*=utf-8''{quote(filename)}"
+
+
+def build_download_response(request, file_upload):
+    """
+    Return ``(response, counted)`` for downloading ``file_upload``.
+
+    ``counted`` is True when the response starts a new download (a full
+    transfer or a range from the first byte) rather than revalidating a
+    cached copy or resuming a partial one.
+    """
+    etag = file_etag(file_upload)
+    last_modified = int(file_upload.updated_at.timestamp())
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        return conditional, False
+
+    size = file_upload.file.size
+    content_type = mimetypes.guess_type(file_upload.name)[0] or 'application/octet-stream'
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if if_range is None or if_range == etag or parse_http_date_safe(if_range) == last_modified:
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response, False
+
+    if DOWNLOAD_OFFLOAD in ('x-accel-redirect', 'x-sendfile'):
+        # The web server handles ranges itself
+        response = HttpResponse(content_type=content_type)
+        if DOWNLOAD_OFFLOAD == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = quote(DOWNLOAD_ACCEL_PREFIX + file_upload.file.name)
+        else:
+            response['X-Sendfile'] = file_upload.file.path
+        counted = byte_range is None or byte_range[0] == 0
+    elif byte_range is not None:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_range(file_upload.file.open('rb'), start, length),
+            status=206,
+            content_type=content_type
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+        counted = start == 0
+    else:
+        response = FileResponse(file_upload.file.open('rb'), content_type=content_type)
+        response.block_size = DOWNLOAD_CHUNK_SIZE
+        response['Content-Length'] = str(size)
+        counted = True
+
+    response['Content-Disposition'] = _content_disposition(file_upload.name)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response, counted
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .file_views import FileUploadViewSet, FileShareViewSet
+from .file_views import FileUploadViewSet, FileShareViewSet, UploadSessionViewSet
 
 router = DefaultRouter()
 router.register(r'files', FileUploadViewSet)
 router.register(r'shares', FileShareViewSet)
+router.register(r'uploads', UploadSessionViewSet, basename='upload-session')
 
 urlpatterns = [
     path('', include(router.urls)),
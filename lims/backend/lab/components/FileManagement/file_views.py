@@ -1,12 +1,26 @@
-from rest_framework import viewsets, status
+from rest_framework import generics, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
-from django.http import HttpResponse
+from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from datetime import timedelta
+import re
 from django.shortcuts import get_object_or_404
-from .file_models import FileUpload, FileShare
-from .file_serializers import FileUploadSerializer, FileUploadListSerializer, FileShareSerializer
+from .file_models import FileUpload, FileShare, UploadSession
+from .file_streaming import build_download_response
+from .file_blobs import (
+    UPLOAD_MAX_CHUNK_SIZE, UPLOAD_SESSION_TTL, append_chunk, discard_partial, hash_file,
+    partial_path, store_blob
+)
+from .file_serializers import (
+    FileUploadSerializer, FileUploadListSerializer, FileShareSerializer, UploadSessionSerializer
+)
+
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+|\*)$')
 
 class FileUploadViewSet(viewsets.ModelViewSet):
     queryset = FileUpload.objects.all()
@@ -23,7 +37,19 @@ class FileUploadViewSet(viewsets.ModelViewSet):
         return FileUploadSerializer
     
     def perform_create(self, serializer):
-        serializer.save(uploaded_by=self.request.user)
+        # Store by content so identical files share one blob
+        upload = serializer.validated_data.pop('file')
+        name, digest, size = store_blob(upload)
+        serializer.save(uploaded_by=self.request.user, file=name, file_size=size, content_hash=digest)
+    
+    def perform_update(self, serializer):
+        # A replaced file is stored by content too, so content_hash stays accurate
+        upload = serializer.validated_data.pop('file', None)
+        if upload is None:
+            serializer.save()
+            return
+        name, digest, size = store_blob(upload)
+        serializer.save(file=name, file_size=size, content_hash=digest)
     
     @action(detail=True, methods=['get'])
     def download(self, request, pk=None):
@@ -35,13 +61,10 @@ class FileUploadViewSet(viewsets.ModelViewSet):
             if not FileShare.objects.filter(file=file_upload, shared_with=request.user).exists():
                 return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        # Increment download count
-        file_upload.download_count += 1
-        file_upload.save()
-        
-        # Return file
-        response = HttpResponse(file_upload.file.read(), content_type='application/octet-stream')
-        response['Content-Disposition'] = f'attachment; filename="{file_upload.name}"'
+        response, counted = build_download_response(request, file_upload)
+        if counted:
+            # Atomic increment; revalidations and resumed ranges are not new downloads
+            FileUpload.objects.filter(pk=file_upload.pk).update(download_count=F('download_count') + 1)
         return response
     
     @action(detail=True, methods=['post'])
@@ -73,3 +96,135 @@ class FileShareViewSet(viewsets.ModelViewSet):
     serializer_class = FileShareSerializer
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['file', 'shared_with', 'shared_by', 'permission']
+
+
+class UploadSessionViewSet(viewsets.GenericViewSet):
+    """
+    Chunked, resumable uploads.
+
+    POST /uploads/ opens a session with the file's metadata and total_size.
+    PUT /uploads/<id>/ appends the raw request body at the offset given by
+    ``Content-Range: bytes <start>-<end>/<total>``; chunks must arrive in order
+    and a chunk already received is acknowledged without being written again.
+    GET /uploads/<id>/ reports received_bytes so an interrupted client can
+    resume. POST /uploads/<id>/commit/ hashes the assembled file, stores it by
+    content and creates the FileUpload. DELETE /uploads/<id>/ aborts.
+    """
+    serializer_class = UploadSessionSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return UploadSession.objects.filter(uploaded_by=self.request.user)
+    
+    def create(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(
+            uploaded_by=request.user,
+            expires_at=timezone.now() + timedelta(seconds=UPLOAD_SESSION_TTL)
+        )
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    def retrieve(self, request, pk=None):
+        return Response(self.get_serializer(self.get_object()).data)
+    
+    def update(self, request, pk=None):
+        match = CONTENT_RANGE_RE.match(request.headers.get('Content-Range', ''))
+        if not match:
+            return Response(
+                {'error': 'Content-Range: bytes <start>-<end>/<total> is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end = int(match.group(1)), int(match.group(2))
+        length = end - start + 1
+        if length <= 0 or length > UPLOAD_MAX_CHUNK_SIZE:
+            return Response(
+                {'error': f'Chunks must be between 1 and {UPLOAD_MAX_CHUNK_SIZE} bytes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        with transaction.atomic():
+            session = generics.get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            if session.status != 'active' or session.expires_at <= timezone.now():
+                return Response({'error': 'Upload session is closed'}, status=status.HTTP_410_GONE)
+            if end >= session.total_size:
+                return Response(
+                    {'error': 'Chunk extends past total_size'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if end < session.received_bytes:
+                # Retransmitted chunk
+                return Response(self.get_serializer(session).data)
+            if start != session.received_bytes:
+                return Response(
+                    {'error': 'Chunk does not start at the received offset',
+                     'received_bytes': session.received_bytes},
+                    status=status.HTTP_409_CONFLICT
+                )
+            
+            written = append_chunk(session, request.stream, length)
+            session.received_bytes += written
+            session.save(update_fields=['received_bytes', 'updated_at'])
+        
+        if written < length:
+            return Response(
+                {'error': 'Incomplete chunk', 'received_bytes': session.received_bytes},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(self.get_serializer(session).data)
+    
+    def destroy(self, request, pk=None):
+        with transaction.atomic():
+            session = generics.get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            if session.status == 'active':
+                discard_partial(session)
+                session.status = 'aborted'
+                session.save(update_fields=['status', 'updated_at'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    @action(detail=True, methods=['post'])
+    def commit(self, request, pk=None):
+        # The lock makes a retried or concurrent commit wait, then see the finished session
+        with transaction.atomic():
+            session = generics.get_object_or_404(self.get_queryset().select_for_update(), pk=pk)
+            if session.status == 'complete':
+                return Response(FileUploadSerializer(session.file_upload, context={'request': request}).data)
+            if session.status != 'active':
+                return Response({'error': 'Upload session is closed'}, status=status.HTTP_410_GONE)
+            if session.received_bytes != session.total_size:
+                return Response(
+                    {'error': 'Upload is incomplete', 'received_bytes': session.received_bytes},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            
+            with open(partial_path(session), 'rb') as partial:
+                digest, size = hash_file(partial)
+                if session.expected_hash and digest != session.expected_hash:
+                    discard_partial(session)
+                    session.status = 'aborted'
+                    session.save(update_fields=['status', 'updated_at'])
+                    return Response(
+                        {'error': 'Content hash does not match expected_hash', 'content_hash': digest},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                name, digest, size = store_blob(partial, digest)
+            
+            file_upload = FileUpload.objects.create(
+                name=session.name,
+                file=name,
+                file_type=session.file_type,
+                file_size=size,
+                content_hash=digest,
+                uploaded_by=session.uploaded_by,
+                tenant=session.tenant,
+                is_public=session.is_public,
+                description=session.description
+            )
+            session.status = 'complete'
+            session.file_upload = file_upload
+            session.save(update_fields=['status', 'file_upload', 'updated_at'])
+            # Only drop the partial once the session can no longer be committed again
+            transaction.on_commit(lambda: discard_partial(session))
+        
+        serializer = FileUploadSerializer(file_upload, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
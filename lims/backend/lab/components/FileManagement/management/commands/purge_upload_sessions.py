@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from lab.components.FileManagement.file_models import UploadSession
+from lab.components.FileManagement.file_blobs import discard_partial
+
+
+class Command(BaseCommand):
+    help = 'Abort expired chunked upload sessions and delete their partial files'
+
+    def handle(self, *args, **options):
+        expired = UploadSession.objects.filter(status='active', expires_at__lte=timezone.now())
+        purged = 0
+        for session in expired.iterator():
+            discard_partial(session)
+            purged += 1
+        expired.update(status='aborted', updated_at=timezone.now())
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} expired upload sessions'))
@@ -1,4 +1,3 @@
-import time
 from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
@@ -11,14 +10,17 @@ from .home_visit_serializers import (
     HomeVisitRequestSerializer, HomeVisitRequestListSerializer,
     HomeVisitScheduleSerializer, HomeVisitScheduleListSerializer
 )
+from lab.id_generator import new_id
+from lab.components.Search.search_filters import FullTextSearchFilter
 
 class HomeVisitRequestViewSet(viewsets.ModelViewSet):
     queryset = HomeVisitRequest.objects.all().order_by('-created_at')
     serializer_class = HomeVisitRequestSerializer
     permission_classes = [AllowAny]  # Temporarily allow unauthenticated access for testing
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'priority', 'service_type', 'tenant', 'doctor']
     search_fields = ['patient_name', 'patient_id', 'id']
+    search_kind = 'home_visit'
     ordering_fields = ['created_at', 'requested_date', 'priority']
     ordering = ['-created_at']
     
@@ -32,7 +34,7 @@ class HomeVisitRequestViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing
         if not data.get('id'):
-            data['id'] = f"HVR{int(time.time() * 1000)}"
+            data['id'] = new_id('HVR')
         
         # Set default values - use existing tenant if available, otherwise use tenant 1
         if not data.get('tenant'):
@@ -102,7 +104,7 @@ class HomeVisitScheduleViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing
         if not data.get('id'):
-            data['id'] = f"HVS{int(time.time() * 1000)}"
+            data['id'] = new_id('HVS')
         
         # Set default values
         if not data.get('tenant'):
@@ -0,0 +1,134 @@
+"""
+Stock ledger for InventoryItem quantities.
+
+Every quantity change goes through ``apply_adjustments``, which in a single
+transaction:
+
+1. locks the affected items (``select_for_update``, in primary key order so
+   concurrent batches cannot deadlock),
+2. checks that no quantity would drop below zero,
+3. applies all deltas with one ``UPDATE ... SET quantity = quantity + delta``,
+4. recomputes ``status`` against ``threshold`` in SQL,
+5. records one InventoryTransaction per adjustment.
+
+Because the arithmetic happens in the database on locked rows, concurrent
+adjustments never overwrite each other, and a batch is applied completely or
+not at all.
+"""
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .inventory_models import InventoryItem, InventoryTransaction
+
+TRANSACTION_TYPES = {choice for choice, _ in InventoryTransaction.TRANSACTION_TYPES}
+
+# Mirrors InventoryItem.save(), evaluated by the database
+STATUS_EXPRESSION = Case(
+    When(quantity__lte=0, then=Value('out-of-stock')),
+    When(quantity__lte=F('threshold'), then=Value('low-stock')),
+    default=Value('in-stock'),
+)
+
+
+class InsufficientStock(Exception):
+    """Raised when an adjustment would take an item below zero"""
+
+    def __init__(self, shortages):
+        self.shortages = shortages
+        super().__init__(f"Insufficient stock for items {sorted(shortages)}")
+
+
+def recompute_status(queryset):
+    """Set ``status`` of every item in ``queryset`` from its quantity in one query"""
+    return queryset.update(status=STATUS_EXPRESSION, updated_at=timezone.now())
+
+
+def _clean(adjustments, default_type):
+    cleaned = []
+    for adjustment in adjustments:
+        if not isinstance(adjustment, dict):
+            raise ValueError('Each adjustment must be an object with item and quantity')
+        item = adjustment.get('item')
+        quantity = adjustment.get('quantity')
+        transaction_type = adjustment.get('transaction_type') or default_type
+        if isinstance(quantity, bool) or (isinstance(quantity, float) and not quantity.is_integer()):
+            raise ValueError('quantity must be an integer')
+        try:
+            item = int(item)
+            quantity = int(quantity)
+        except (TypeError, ValueError):
+            raise ValueError('Each adjustment needs an integer item and quantity')
+        if transaction_type not in TRANSACTION_TYPES:
+            raise ValueError(f"transaction_type must be one of: {', '.join(sorted(TRANSACTION_TYPES))}")
+        cleaned.append({
+            'item': item,
+            'quantity': quantity,
+            'transaction_type': transaction_type,
+            'notes': adjustment.get('notes', ''),
+            'reference_number': adjustment.get('reference_number'),
+        })
+    return cleaned
+
+
+def apply_adjustments(adjustments, performed_by, default_type='adjustment'):
+    """
+    Apply ``adjustments`` (dicts with ``item``, ``quantity`` and optionally
+    ``transaction_type``, ``notes`` and ``reference_number``) atomically.
+
+    Returns the updated items as ``{id: {'quantity', 'status', 'threshold'}}``.
+    Raises ValueError for malformed adjustments, InventoryItem.DoesNotExist
+    for unknown items and InsufficientStock when a quantity would go negative.
+    """
+    adjustments = _clean(adjustments, default_type)
+    if not adjustments:
+        raise ValueError('No adjustments given')
+
+    deltas = OrderedDict()
+    for adjustment in adjustments:
+        deltas[adjustment['item']] = deltas.get(adjustment['item'], 0) + adjustment['quantity']
+    item_ids = sorted(deltas)
+
+    with transaction.atomic():
+        locked = dict(
+            InventoryItem.objects.select_for_update()
+            .filter(pk__in=item_ids).order_by('pk').values_list('pk', 'quantity')
+        )
+        missing = set(item_ids) - set(locked)
+        if missing:
+            raise InventoryItem.DoesNotExist(f"Inventory items not found: {sorted(missing)}")
+        shortages = {
+            pk: locked[pk] for pk, delta in deltas.items() if locked[pk] + delta < 0
+        }
+        if shortages:
+            raise InsufficientStock(shortages)
+
+        items = InventoryItem.objects.filter(pk__in=item_ids)
+        changed = [pk for pk in item_ids if deltas[pk]]
+        if changed:
+            InventoryItem.objects.filter(pk__in=changed).update(
+                quantity=F('quantity') + Case(
+                    *[When(pk=pk, then=Value(deltas[pk])) for pk in changed],
+                    default=Value(0),
+                    output_field=IntegerField(),
+                ),
+            )
+        # A separate statement, so the status sees the new quantities
+        recompute_status(items)
+
+        InventoryTransaction.objects.bulk_create([
+            InventoryTransaction(
+                item_id=adjustment['item'],
+                transaction_type=adjustment['transaction_type'],
+                quantity=adjustment['quantity'],
+                reference_number=adjustment['reference_number'],
+                notes=adjustment['notes'],
+                performed_by=performed_by,
+            )
+            for adjustment in adjustments
+        ])
+        return {
+            row['id']: row for row in items.values('id', 'quantity', 'status', 'threshold')
+        }
@@ -54,6 +54,11 @@ class InventoryItem(LabBaseModel):
     class Meta:
         app_label = 'lab'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['tenant', 'status'], name='inventory_item_stock_idx'),
+            # stock_alerts across all tenants
+            models.Index(fields=['status'], name='inventory_item_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} ({self.quantity} units)"
@@ -0,0 +1,141 @@
+"""
+Low-stock reorder planner.
+
+Consumption rates come from InventoryTransaction history: stock leaving an
+item (negative ``out`` and ``adjustment`` transactions) is summed over a short
+and a long trailing window in one grouped query over the whole catalog, and the
+higher of the two daily rates is used, so a recent surge is not averaged away.
+
+An item is planned for reorder when it is at or below its threshold, or when
+it would run out within INVENTORY_REORDER_LEAD_DAYS at that rate. The quantity
+ordered brings it back to the threshold plus INVENTORY_REORDER_COVER_DAYS of
+consumption after the lead time. Items with an open reorder are skipped.
+
+Plans are grouped by supplier; ``create_reorders`` bulk-creates the requests.
+Run it with the ``plan_inventory_reorders`` management command or the
+``reorders/plan/`` endpoint.
+"""
+from collections import OrderedDict
+from datetime import timedelta
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, IntegerField, OuterRef, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .inventory_models import InventoryItem, ReorderRequest
+
+SHORT_WINDOW_DAYS = getattr(settings, 'INVENTORY_REORDER_SHORT_WINDOW_DAYS', 7)
+LONG_WINDOW_DAYS = getattr(settings, 'INVENTORY_REORDER_LONG_WINDOW_DAYS', 30)
+LEAD_DAYS = getattr(settings, 'INVENTORY_REORDER_LEAD_DAYS', 7)
+COVER_DAYS = getattr(settings, 'INVENTORY_REORDER_COVER_DAYS', 30)
+
+OPEN_REORDER_STATUSES = ['pending', 'approved', 'ordered']
+CONSUMPTION_TYPES = ['out', 'adjustment']
+PLANNER_NAME = 'reorder-planner'
+
+
+def _consumed_since(since):
+    return Coalesce(
+        Sum(
+            'transactions__quantity',
+            filter=Q(
+                transactions__created_at__gte=since,
+                transactions__quantity__lt=0,
+                transactions__transaction_type__in=CONSUMPTION_TYPES,
+            ),
+        ),
+        0,
+        output_field=IntegerField(),
+    )
+
+
+def consumption(tenant=None, now=None):
+    """Items annotated with stock consumed over the short and long windows"""
+    now = now or timezone.now()
+    items = InventoryItem.objects.all()
+    if tenant:
+        items = items.filter(tenant=tenant)
+    return items.annotate(
+        consumed_short=_consumed_since(now - timedelta(days=SHORT_WINDOW_DAYS)),
+        consumed_long=_consumed_since(now - timedelta(days=LONG_WINDOW_DAYS)),
+        has_open_reorder=Exists(
+            ReorderRequest.objects.filter(item=OuterRef('pk'), status__in=OPEN_REORDER_STATUSES)
+        ),
+    ).order_by()
+
+
+def plan_reorders(tenant=None, now=None):
+    """
+    Return the reorder plan as a list of supplier groups::
+
+        [{'supplier': id, 'supplier_name', 'items': [{'item', 'name', 'tenant',
+          'quantity', 'threshold', 'daily_consumption', 'days_to_stockout',
+          'reorder_quantity'}]}]
+    """
+    rows = consumption(tenant, now).filter(has_open_reorder=False).values(
+        'id', 'name', 'tenant', 'quantity', 'threshold', 'supplier_id', 'supplier__name',
+        'consumed_short', 'consumed_long',
+    )
+    groups = OrderedDict()
+    for row in rows:
+        # Consumed quantities are negative sums
+        rate = max(-row['consumed_short'] / SHORT_WINDOW_DAYS, -row['consumed_long'] / LONG_WINDOW_DAYS)
+        days_to_stockout = row['quantity'] / rate if rate else None
+        if row['quantity'] > row['threshold'] and (days_to_stockout is None or days_to_stockout > LEAD_DAYS):
+            continue
+        target = row['threshold'] + 1 + math.ceil(rate * (LEAD_DAYS + COVER_DAYS))
+        group = groups.setdefault(row['supplier_id'], {
+            'supplier': row['supplier_id'],
+            'supplier_name': row['supplier__name'],
+            'items': [],
+        })
+        group['items'].append({
+            'item': row['id'],
+            'name': row['name'],
+            'tenant': row['tenant'],
+            'quantity': row['quantity'],
+            'threshold': row['threshold'],
+            'daily_consumption': round(rate, 2),
+            'days_to_stockout': round(days_to_stockout, 1) if days_to_stockout is not None else None,
+            'reorder_quantity': max(target - row['quantity'], 1),
+        })
+    for group in groups.values():
+        group['items'].sort(key=lambda item: (item['days_to_stockout'] is None, item['days_to_stockout']))
+    return sorted(groups.values(), key=lambda group: (group['supplier'] is None, group['supplier_name'] or ''))
+
+
+def create_reorders(plan, requested_by=PLANNER_NAME):
+    """Bulk-create pending ReorderRequests for ``plan``; returns the new requests"""
+    reorders = []
+    for group in plan:
+        supplier = group['supplier_name'] or 'no supplier'
+        for item in group['items']:
+            days = item['days_to_stockout']
+            reorders.append(ReorderRequest(
+                item_id=item['item'],
+                requested_quantity=item['reorder_quantity'],
+                requested_by=requested_by,
+                tenant=item['tenant'],
+                notes=(
+                    f"Planned for {supplier}: {item['quantity']} in stock, "
+                    f"{item['daily_consumption']}/day, "
+                    + (f"{days} days to stockout" if days is not None else 'at or below threshold')
+                ),
+            ))
+    item_ids = [reorder.item_id for reorder in reorders]
+    with transaction.atomic():
+        # Locking the items, in a fixed order, serializes concurrent planners
+        # even when no reorder exists yet to lock
+        list(InventoryItem.objects.select_for_update().filter(pk__in=item_ids).order_by('pk').values_list('pk'))
+        # Items reordered since the plan was computed are left alone
+        open_items = set(
+            ReorderRequest.objects.filter(
+                item_id__in=item_ids, status__in=OPEN_REORDER_STATUSES,
+            ).values_list('item_id', flat=True)
+        )
+        return ReorderRequest.objects.bulk_create(
+            [reorder for reorder in reorders if reorder.item_id not in open_items]
+        )
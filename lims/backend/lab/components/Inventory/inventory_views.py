@@ -3,6 +3,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
+from django.db import transaction
+from .inventory_ledger import InsufficientStock, apply_adjustments
+from .inventory_planner import create_reorders, plan_reorders
 from .inventory_models import InventoryCategory, Supplier, InventoryItem, InventoryTransaction, ReorderRequest
 from .inventory_serializers import (
     InventoryCategorySerializer, SupplierSerializer, InventoryItemSerializer, 
@@ -51,27 +54,67 @@ class InventoryItemViewSet(viewsets.ModelViewSet):
         item.save()
         return Response({'status': 'Item rejected successfully'})
     
+    def _apply(self, adjustments, default_type='adjustment'):
+        performed_by = self.request.user.username if hasattr(self.request, 'user') else 'System'
+        try:
+            return apply_adjustments(adjustments, performed_by or 'System', default_type), None
+        except ValueError as e:
+            return None, Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except InventoryItem.DoesNotExist as e:
+            return None, Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except InsufficientStock as e:
+            return None, Response(
+                {'error': 'Insufficient stock', 'available': e.shortages},
+                status=status.HTTP_409_CONFLICT
+            )
+    
     @action(detail=True, methods=['post'])
     def adjust_quantity(self, request, pk=None):
         item = self.get_object()
-        adjustment = request.data.get('quantity', 0)
-        transaction_type = request.data.get('transaction_type', 'adjustment')
-        notes = request.data.get('notes', '')
-        
-        # Create transaction record
-        InventoryTransaction.objects.create(
-            item=item,
-            transaction_type=transaction_type,
-            quantity=adjustment,
-            notes=notes,
-            performed_by=request.user.username if hasattr(request, 'user') else 'System'
-        )
-        
-        # Update item quantity
-        item.quantity += adjustment
-        item.save()
+        items, error = self._apply([{
+            'item': item.pk,
+            'quantity': request.data.get('quantity', 0),
+            'transaction_type': request.data.get('transaction_type', 'adjustment'),
+            'notes': request.data.get('notes', ''),
+        }])
+        if error:
+            return error
         
-        return Response({'status': 'Quantity adjusted successfully'})
+        return Response({
+            'status': 'Quantity adjusted successfully',
+            'quantity': items[item.pk]['quantity'],
+            'stock_status': items[item.pk]['status'],
+        })
+    
+    @action(detail=False, methods=['post'])
+    def bulk_adjust(self, request):
+        """
+        Apply several adjustments at once, all or nothing:
+        {"adjustments": [{"item", "quantity", "transaction_type"?, "notes"?, "reference_number"?}],
+         "transaction_type"?: default for entries without one}
+        """
+        adjustments = request.data.get('adjustments')
+        if not isinstance(adjustments, list):
+            return Response({'error': 'adjustments must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        items, error = self._apply(adjustments, request.data.get('transaction_type', 'adjustment'))
+        if error:
+            return error
+        return Response({
+            'status': f'{len(adjustments)} adjustments applied',
+            'items': list(items.values()),
+        })
+    
+    @action(detail=False, methods=['get'])
+    def stock_alerts(self, request):
+        """
+        Items at or below their threshold, served from the (tenant, status)
+        index when ``?tenant=`` is given and from the status index otherwise
+        """
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            status__in=['low-stock', 'out-of-stock']
+        ).select_related('category', 'supplier')
+        serializer = InventoryItemListSerializer(queryset, many=True)
+        return Response(serializer.data)
 
 class InventoryTransactionViewSet(viewsets.ModelViewSet):
     queryset = InventoryTransaction.objects.all()
@@ -92,6 +135,24 @@ class ReorderRequestViewSet(viewsets.ModelViewSet):
             return ReorderRequestListSerializer
         return ReorderRequestSerializer
     
+    @action(detail=False, methods=['get', 'post'])
+    def plan(self, request):
+        """
+        GET previews the automatic reorder plan, grouped by supplier; POST also
+        creates the planned requests. Optional ?tenant= limits it to one tenant.
+        """
+        tenant = request.query_params.get('tenant') or request.data.get('tenant')
+        plan = plan_reorders(tenant=tenant)
+        if request.method == 'GET':
+            return Response({'plan': plan})
+        
+        requested_by = request.user.username if hasattr(request, 'user') else ''
+        created = create_reorders(plan, requested_by=requested_by or 'reorder-planner')
+        return Response({
+            'plan': plan,
+            'created': ReorderRequestSerializer(created, many=True).data,
+        }, status=status.HTTP_201_CREATED)
+    
     @action(detail=True, methods=['post'])
     def approve(self, request, pk=None):
         reorder = self.get_object()
@@ -118,22 +179,23 @@ class ReorderRequestViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=['post'])
     def mark_received(self, request, pk=None):
         reorder = self.get_object()
-        reorder.status = 'received'
+        performed_by = request.user.username if hasattr(request, 'user') else 'System'
         
-        # Update inventory quantity
-        item = reorder.item
-        item.quantity += reorder.requested_quantity
-        item.save()
+        with transaction.atomic():
+            # Claim the reorder first so it cannot be received twice
+            claimed = ReorderRequest.objects.filter(pk=reorder.pk).exclude(status='received').update(status='received')
+            if not claimed:
+                return Response(
+                    {'error': 'Reorder request was already received'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            # Update inventory quantity and create the transaction record
+            apply_adjustments([{
+                'item': reorder.item_id,
+                'quantity': reorder.requested_quantity,
+                'transaction_type': 'in',
+                'reference_number': f"REORDER-{reorder.id}",
+                'notes': f"Received from reorder request #{reorder.id}",
+            }], performed_by or 'System')
         
-        # Create transaction record
-        InventoryTransaction.objects.create(
-            item=item,
-            transaction_type='in',
-            quantity=reorder.requested_quantity,
-            reference_number=f"REORDER-{reorder.id}",
-            notes=f"Received from reorder request #{reorder.id}",
-            performed_by=request.user.username if hasattr(request, 'user') else 'System'
-        )
-        
-        reorder.save()
         return Response({'status': 'Reorder request marked as received and inventory updated'})
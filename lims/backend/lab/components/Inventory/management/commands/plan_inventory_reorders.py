@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from lab.components.Inventory.inventory_planner import create_reorders, plan_reorders
+
+
+class Command(BaseCommand):
+    help = 'Create reorder requests for items projected to run out, grouped by supplier'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tenant',
+            type=str,
+            help='Plan only this tenant\'s items (default: every tenant)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Print the plan without creating reorder requests',
+        )
+
+    def handle(self, *args, **options):
+        plan = plan_reorders(tenant=options['tenant'])
+        for group in plan:
+            self.stdout.write(f"{group['supplier_name'] or 'No supplier'}:")
+            for item in group['items']:
+                days = item['days_to_stockout']
+                self.stdout.write(
+                    f"  {item['name']} [{item['tenant'] or '-'}]: {item['quantity']} in stock, "
+                    f"{days if days is not None else '-'} days left, order {item['reorder_quantity']}"
+                )
+
+        planned = sum(len(group['items']) for group in plan)
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'{planned} reorders planned (dry run)'))
+            return
+        created = create_reorders(plan)
+        self.stdout.write(self.style.SUCCESS(f'Created {len(created)} reorder requests'))
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand, CommandError
+from lab.components.Notifications.notification_dispatch import (
+    OUTBOX_BATCH_SIZE,
+    dispatch_pending,
+    prune_processed,
+    requeue_stale,
+)
+from django.utils import timezone
+from datetime import timedelta
+import time
+
+
+class Command(BaseCommand):
+    help = 'Dispatch queued notification events from the notification outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help='Number of outbox rows claimed per batch',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling the outbox instead of exiting once it is empty',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Seconds to sleep between polls when running with --loop',
+        )
+        parser.add_argument(
+            '--retention-days',
+            type=int,
+            default=None,
+            help='Delete dispatched rows older than this (default NOTIFICATION_OUTBOX_RETENTION_DAYS)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if options['retention_days'] is not None and options['retention_days'] < 0:
+            raise CommandError('--retention-days must not be negative')
+
+        while True:
+            requeued = requeue_stale()
+            if requeued:
+                self.stdout.write(f'Requeued {requeued} stale outbox rows')
+
+            processed = 0
+            # Rows failing in this pass are retried after their backoff, not straight away
+            started = timezone.now()
+            while True:
+                claimed = dispatch_pending(batch_size, due_before=started)
+                if not claimed:
+                    break
+                processed += claimed
+
+            if processed:
+                self.stdout.write(self.style.SUCCESS(f'Dispatched {processed} outbox rows'))
+
+            retention = options['retention_days']
+            pruned = prune_processed(timedelta(days=retention) if retention is not None else None)
+            if pruned:
+                self.stdout.write(f'Pruned {pruned} dispatched outbox rows')
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
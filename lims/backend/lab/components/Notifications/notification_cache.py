@@ -0,0 +1,75 @@
+"""
+Per-user unread notification counters.
+
+Counts live in Django's cache framework, so the backend is whatever CACHES
+configures (local memory by default, a file-based cache or Redis). A counter is
+computed with one COUNT query on a miss and afterwards kept in step by
+incrementing on delivery and decrementing on mark-read. Counters that cannot be
+adjusted exactly are dropped and recomputed on the next read.
+
+Counters are only consistent across workers when the cache is shared (REDIS_URL
+or CACHE_DIR). With the per-process local memory cache each read counts in the
+database instead, so every worker reports the same number.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from lab.cache_utils import cache_is_shared
+from .notification_models import Notification
+import logging
+
+logger = logging.getLogger(__name__)
+
+UNREAD_COUNT_TTL = getattr(settings, 'NOTIFICATION_UNREAD_COUNT_TTL', 300)
+
+
+def _key(user_id, tenant=None):
+    if tenant:
+        return f"notifications:unread:{user_id}:{tenant}"
+    return f"notifications:unread:{user_id}"
+
+
+def get_unread_count(user_id, tenant=None):
+    """Return the unread count for a user, optionally limited to one tenant"""
+    shared = cache_is_shared()
+    key = _key(user_id, tenant)
+    count = cache.get(key) if shared else None
+    if count is None:
+        queryset = Notification.objects.filter(recipient_id=user_id, is_read=False)
+        if tenant:
+            queryset = queryset.filter(tenant=tenant)
+        count = queryset.count()
+        if shared:
+            cache.set(key, count, UNREAD_COUNT_TTL)
+    return count
+
+
+def _adjust(key, delta):
+    try:
+        if cache.incr(key, delta) < 0:
+            cache.delete(key)
+    except ValueError:
+        # Not cached yet; the next read computes it from the database
+        pass
+
+
+def increment(user_id, tenant=None, delta=1):
+    """Record ``delta`` new unread notifications for a user"""
+    if not user_id:
+        return
+    _adjust(_key(user_id), delta)
+    if tenant:
+        _adjust(_key(user_id, tenant), delta)
+
+
+def decrement(user_id, tenant=None, delta=1):
+    """Record ``delta`` notifications of a user being marked as read"""
+    increment(user_id, tenant, -delta)
+
+
+def invalidate(user_ids, tenant=None):
+    """Drop cached counters so they are recomputed on the next read"""
+    keys = [_key(user_id) for user_id in user_ids if user_id]
+    if tenant:
+        keys += [_key(user_id, tenant) for user_id in user_ids if user_id]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,319 @@
+"""
+Deferred notification dispatch.
+
+Model signals no longer call NotificationService inside the save. Instead they
+enqueue an event which is buffered for the current transaction and written to
+the NotificationOutbox table in a single INSERT once the transaction commits.
+Outbox rows are then dispatched either by a small in-process thread pool or by
+the ``process_notification_outbox`` management command. A failed row is
+retried with exponential backoff, so a failing channel does not use up its
+attempts back to back.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import logging
+import threading
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .notification_models import NotificationOutbox
+from .notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+# Number of background threads draining the outbox after commit.
+# Set to 0 to rely solely on the process_notification_outbox command.
+OUTBOX_WORKERS = getattr(settings, 'NOTIFICATION_OUTBOX_WORKERS', 1)
+OUTBOX_BATCH_SIZE = getattr(settings, 'NOTIFICATION_OUTBOX_BATCH_SIZE', 200)
+OUTBOX_MAX_ATTEMPTS = getattr(settings, 'NOTIFICATION_OUTBOX_MAX_ATTEMPTS', 5)
+# Delay before the first retry of a failed row; it doubles with every further attempt
+OUTBOX_RETRY_DELAY = timedelta(seconds=getattr(settings, 'NOTIFICATION_OUTBOX_RETRY_SECONDS', 30))
+OUTBOX_MAX_RETRY_DELAY = timedelta(seconds=getattr(settings, 'NOTIFICATION_OUTBOX_MAX_RETRY_SECONDS', 3600))
+# Rows stuck in "processing" longer than this are assumed to belong to a dead worker
+OUTBOX_STALE_AFTER = timedelta(minutes=getattr(settings, 'NOTIFICATION_OUTBOX_STALE_MINUTES', 10))
+# Dispatched rows are kept this long for inspection, then pruned
+OUTBOX_RETENTION = timedelta(days=getattr(settings, 'NOTIFICATION_OUTBOX_RETENTION_DAYS', 7))
+OUTBOX_PRUNE_BATCH_SIZE = 1000
+
+
+class DeliveryError(Exception):
+    """Raised when a handler reports that its notification was not created"""
+
+
+def _check_delivered(result):
+    # NotificationService reports failures as None or {'success': False}
+    if result is None:
+        raise DeliveryError('Notification was not created')
+    if isinstance(result, dict) and not result.get('success', True):
+        raise DeliveryError(result.get('error') or result.get('message') or 'Notification was not created')
+    return result
+
+
+def _notify_test_request_created(instance, payload):
+    return NotificationService.notify_test_request_created(instance)
+
+
+def _notify_test_request_status_changed(instance, payload):
+    return NotificationService.notify_test_request_status_changed(
+        instance, payload['old_status'], payload['new_status']
+    )
+
+
+def _notify_appointment_created(instance, payload):
+    return NotificationService.notify_appointment_created(instance)
+
+
+def _notify_appointment_status_changed(instance, payload):
+    return NotificationService.notify_appointment_status_changed(
+        instance, payload['old_status'], payload['new_status']
+    )
+
+
+def _notify_new_message(instance, payload):
+    return NotificationService.notify_new_message(instance)
+
+
+def _notify_equipment_maintenance_required(instance, payload):
+    return NotificationService.notify_equipment_maintenance_required(instance)
+
+
+EVENT_HANDLERS = {
+    'test_request_created': _notify_test_request_created,
+    'test_request_status_changed': _notify_test_request_status_changed,
+    'appointment_created': _notify_appointment_created,
+    'appointment_status_changed': _notify_appointment_status_changed,
+    'message_created': _notify_new_message,
+    'equipment_maintenance_required': _notify_equipment_maintenance_required,
+}
+
+# Events carrying an old/new status pair; bursts for one object collapse to a
+# single old -> new transition and disappear entirely if the value round-trips.
+TRANSITION_EVENTS = {'test_request_status_changed', 'appointment_status_changed'}
+
+
+def _merge_events(events):
+    """Coalesce a list of (event, model_label, object_id, payload) tuples in order"""
+    merged = {}
+    for event, model_label, object_id, payload in events:
+        key = f"{event}:{model_label}:{object_id}"
+        if key in merged and event in TRANSITION_EVENTS:
+            merged[key][3]['new_status'] = payload['new_status']
+        elif key not in merged:
+            merged[key] = (event, model_label, object_id, dict(payload))
+    return {
+        key: value for key, value in merged.items()
+        if value[0] not in TRANSITION_EVENTS
+        or value[3]['old_status'] != value[3]['new_status']
+    }
+
+
+# ------------------------
+# Producer side
+# ------------------------
+_buffer = threading.local()
+
+
+def enqueue(event, instance, **payload):
+    """
+    Queue a notification event for ``instance``.
+
+    Inside a transaction, events are buffered per savepoint and coalesced, then
+    written to the outbox in one bulk INSERT after commit; nothing is written if
+    the transaction (or savepoint) rolls back. In autocommit mode the event is
+    written straight away.
+    """
+    item = (event, instance._meta.label_lower, str(instance.pk), payload)
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _buffer.batches = {}
+        _write([item])
+        return
+
+    batches = getattr(_buffer, 'batches', None)
+    if batches is None:
+        batches = _buffer.batches = {}
+    key = tuple(connection.savepoint_ids)
+    batch = batches.get(key)
+    # A batch whose flush hook was discarded by a rollback must not be reused
+    if batch and any(hook[1] is batch[1] for hook in connection.run_on_commit):
+        batch[0].append(item)
+        return
+    events = [item]
+
+    def flush():
+        batches.pop(key, None)
+        _write(events)
+
+    batches[key] = (events, flush)
+    transaction.on_commit(flush)
+
+
+def _write(events):
+    merged = _merge_events(events)
+    if not merged:
+        return
+    NotificationOutbox.objects.bulk_create([
+        NotificationOutbox(
+            event=event,
+            model_label=model_label,
+            object_id=object_id,
+            payload=payload,
+            dedupe_key=key,
+        )
+        for key, (event, model_label, object_id, payload) in merged.items()
+    ])
+    schedule_drain()
+
+
+# ------------------------
+# In-process worker pool
+# ------------------------
+_executor = None
+_drain_lock = threading.Lock()
+_drain_scheduled = False
+
+
+def schedule_drain():
+    """Ask the background pool to drain the outbox; bursts share a single drain"""
+    global _executor, _drain_scheduled
+    if OUTBOX_WORKERS <= 0:
+        return
+    with _drain_lock:
+        if _drain_scheduled:
+            return
+        _drain_scheduled = True
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=OUTBOX_WORKERS, thread_name_prefix='notification-outbox'
+            )
+    _executor.submit(_background_drain)
+
+
+def _background_drain():
+    global _drain_scheduled
+    try:
+        with _drain_lock:
+            _drain_scheduled = False
+        # Rows that fail during this drain wait for a later one
+        started = timezone.now()
+        while dispatch_pending(due_before=started):
+            pass
+    except Exception as e:
+        logger.error(f"❌ Error draining notification outbox: {e}")
+    finally:
+        close_old_connections()
+
+
+# ------------------------
+# Consumer side
+# ------------------------
+def requeue_stale():
+    """Return rows abandoned by a crashed worker to the pending state"""
+    return NotificationOutbox.objects.filter(
+        status='processing',
+        updated_at__lt=timezone.now() - OUTBOX_STALE_AFTER,
+    ).update(status='pending', claim_token=None, updated_at=timezone.now())
+
+
+def retry_delay(attempts):
+    """Backoff before retrying a row that has failed ``attempts`` times"""
+    # The exponent is bounded so large attempt counts cannot overflow timedelta
+    return min(OUTBOX_RETRY_DELAY * 2 ** min(attempts - 1, 30), OUTBOX_MAX_RETRY_DELAY)
+
+
+def _claim(batch_size, due_before):
+    """Atomically claim a batch of pending rows that are due for this worker"""
+    token = uuid.uuid4().hex
+    ids = list(
+        NotificationOutbox.objects.filter(status='pending')
+        .filter(Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=due_before))
+        .order_by('id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    if not ids:
+        return []
+    NotificationOutbox.objects.filter(id__in=ids, status='pending').update(
+        status='processing', claim_token=token, updated_at=timezone.now()
+    )
+    return list(NotificationOutbox.objects.filter(claim_token=token).order_by('id'))
+
+
+def dispatch_pending(batch_size=None, due_before=None):
+    """
+    Dispatch one batch of outbox rows. Returns the number of rows claimed.
+
+    Rows for the same object and event are coalesced into one notification and
+    the target instances are loaded with one query per model. Only rows due for
+    a retry by ``due_before`` (default now) are claimed; callers looping until
+    the outbox is empty pass the time they started so that rows failing during
+    the loop are not claimed again by it.
+    """
+    rows = _claim(batch_size or OUTBOX_BATCH_SIZE, due_before or timezone.now())
+    if not rows:
+        return 0
+
+    # Collapse duplicates across transactions, keeping the first row of each group
+    groups = {}
+    for row in rows:
+        groups.setdefault(row.dedupe_key, []).append(row)
+    merged = _merge_events(
+        (row.event, row.model_label, row.object_id, row.payload) for row in rows
+    )
+
+    ids_by_model = {}
+    for event, model_label, object_id, payload in merged.values():
+        ids_by_model.setdefault(model_label, set()).add(object_id)
+    instances = {}
+    for model_label, object_ids in ids_by_model.items():
+        model = apps.get_model(model_label)
+        pks = [model._meta.pk.to_python(object_id) for object_id in object_ids]
+        for pk, obj in model.objects.in_bulk(pks).items():
+            instances[(model_label, str(pk))] = obj
+
+    done_ids, failed = [], []
+    for key, group in groups.items():
+        item = merged.get(key)
+        instance = item and instances.get((item[1], item[2]))
+        if item is None or instance is None:
+            # Net no-op transition, or the object was deleted before dispatch
+            done_ids.extend(row.id for row in group)
+            continue
+        try:
+            _check_delivered(EVENT_HANDLERS[item[0]](instance, item[3]))
+            done_ids.extend(row.id for row in group)
+        except Exception as e:
+            logger.error(f"❌ Error dispatching {key}: {e}")
+            failed.extend((row, str(e)) for row in group)
+
+    now = timezone.now()
+    if done_ids:
+        NotificationOutbox.objects.filter(id__in=done_ids).update(
+            status='done', processed_at=now, updated_at=now
+        )
+    for row, error in failed:
+        row.attempts += 1
+        row.status = 'failed' if row.attempts >= OUTBOX_MAX_ATTEMPTS else 'pending'
+        row.claim_token = None
+        row.last_error = error
+        row.next_attempt_at = now + retry_delay(row.attempts)
+        row.save(update_fields=['attempts', 'status', 'claim_token', 'last_error', 'next_attempt_at', 'updated_at'])
+    return len(rows)
+
+
+def prune_processed(older_than=None):
+    """Delete rows dispatched more than ``older_than`` ago; returns the number deleted"""
+    cutoff = timezone.now() - (OUTBOX_RETENTION if older_than is None else older_than)
+    deleted = 0
+    while True:
+        ids = list(
+            NotificationOutbox.objects.filter(status='done', processed_at__lt=cutoff)
+            .order_by('id').values_list('id', flat=True)[:OUTBOX_PRUNE_BATCH_SIZE]
+        )
+        if not ids:
+            return deleted
+        deleted += NotificationOutbox.objects.filter(id__in=ids).delete()[0]
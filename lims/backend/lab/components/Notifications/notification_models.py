@@ -34,6 +34,9 @@ class Notification(LabBaseModel):
     class Meta:
         app_label = 'lab'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='lab_notification_cursor_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.notification_type}"
@@ -50,3 +53,34 @@ class NotificationPreference(LabBaseModel):
     
     def __str__(self):
         return f"Preferences for {self.user.username}"
+
+class NotificationOutbox(LabBaseModel):
+    """Durable queue of notification events waiting to be dispatched outside the request"""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    event = models.CharField(max_length=100)
+    model_label = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    dedupe_key = models.CharField(max_length=255, db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    claim_token = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    last_error = models.TextField(blank=True, null=True)
+    next_attempt_at = models.DateTimeField(null=True, blank=True, help_text="Failed rows are not retried before this")
+    processed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        app_label = 'lab'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='lab_outbox_status_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event} {self.model_label}#{self.object_id} ({self.status})"
@@ -1,5 +1,8 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from .notification_models import Notification
+from . import notification_cache, notification_stream
 from django.utils import timezone
 from datetime import timedelta
 from typing import List, Optional, Dict, Any
@@ -11,6 +14,9 @@ logger = logging.getLogger(__name__)
 class NotificationService:
     """Service class for creating and managing notifications"""
     
+    # Rows written per INSERT when fanning a global notification out to users
+    FANOUT_BATCH_SIZE = getattr(settings, 'NOTIFICATION_FANOUT_BATCH_SIZE', 500)
+    
     @staticmethod
     def create_notification(
         title: str,
@@ -44,6 +50,12 @@ class NotificationService:
                 is_global=is_global,
                 expires_at=expires_at
             )
+            def committed():
+                # A rolled-back notification must not leave a counted unread
+                if recipient:
+                    notification_cache.increment(recipient.id, tenant)
+                notification_stream.publish([notification])
+            transaction.on_commit(committed)
             
             print(f"✅ Notification created: {title}")
             return notification
@@ -228,43 +240,31 @@ class NotificationService:
             )
             
             # Determine recipients based on target audience
-            recipients = []
-            if target_audience == 'all':
-                recipients = list(User.objects.filter(is_active=True).values_list('id', flat=True))
-            elif target_audience == 'roles' and target_roles:
-                recipients = list(User.objects.filter(
-                    is_active=True,
-                    role__in=target_roles
-                ).values_list('id', flat=True))
-            elif target_audience == 'tenants' and target_tenants:
-                recipients = list(User.objects.filter(
-                    is_active=True,
-                    tenant__in=target_tenants
-                ).values_list('id', flat=True))
+            recipients = NotificationService._get_global_recipients(
+                target_audience, target_roles, target_tenants
+            )
             
-            # Create individual notifications for each recipient
-            individual_notifications = []
-            for recipient_id in recipients:
-                individual_notification = Notification.objects.create(
-                    title=title,
-                    message=message,
-                    notification_type=notification_type,
-                    priority=priority,
-                    recipient_id=recipient_id,
-                    is_global=True,
-                    action_url=action_url,
-                    expires_at=expires_at
-                )
-                individual_notifications.append(individual_notification)
+            # Fan out to each recipient in chunks instead of one INSERT per user
+            delivered_count = NotificationService._fan_out(
+                recipients,
+                title=title,
+                message=message,
+                notification_type=notification_type,
+                priority=priority,
+                is_global=True,
+                action_url=action_url,
+                expires_at=expires_at
+            )
+            total_recipients = delivered_count
             
-            logger.info(f"✅ Global notification created: {title} for {len(recipients)} recipients")
+            logger.info(f"✅ Global notification created: {title} for {total_recipients} recipients")
             
             return {
                 'success': True,
                 'notification_id': notification.id,
-                'total_recipients': len(recipients),
-                'delivered_count': len(individual_notifications),
-                'message': f'Global notification sent to {len(recipients)} recipients'
+                'total_recipients': total_recipients,
+                'delivered_count': delivered_count,
+                'message': f'Global notification sent to {total_recipients} recipients'
             }
             
         except Exception as e:
@@ -275,6 +275,55 @@ class NotificationService:
                 'message': 'Failed to create global notification'
             }
     
+    @staticmethod
+    def _get_global_recipients(
+        target_audience: str,
+        target_roles: List[str] = None,
+        target_tenants: List[str] = None
+    ):
+        """Return a lazy queryset of recipient ids for a global notification"""
+        queryset = User.objects.filter(is_active=True)
+        if target_audience == 'roles' and target_roles:
+            queryset = queryset.filter(role__in=target_roles)
+        elif target_audience == 'tenants' and target_tenants:
+            queryset = queryset.filter(tenant__in=target_tenants)
+        elif target_audience != 'all':
+            queryset = queryset.none()
+        return queryset.order_by('id').values_list('id', flat=True)
+    
+    @staticmethod
+    def _fan_out(recipient_ids, batch_size: int = None, **fields) -> int:
+        """
+        Write one notification per recipient using chunked bulk_create.
+        
+        Recipient ids are streamed from the database and never held in memory
+        all at once. Returns the number of notifications written.
+        """
+        batch_size = batch_size or NotificationService.FANOUT_BATCH_SIZE
+        delivered = 0
+        batch = []
+        with transaction.atomic():
+            for recipient_id in recipient_ids.iterator(chunk_size=batch_size):
+                batch.append(Notification(recipient_id=recipient_id, **fields))
+                if len(batch) >= batch_size:
+                    Notification.objects.bulk_create(batch, batch_size=batch_size)
+                    NotificationService._on_batch_commit(batch)
+                    delivered += len(batch)
+                    batch = []
+            if batch:
+                Notification.objects.bulk_create(batch, batch_size=batch_size)
+                NotificationService._on_batch_commit(batch)
+                delivered += len(batch)
+        return delivered
+    
+    @staticmethod
+    def _on_batch_commit(batch):
+        """Refresh unread counts and push a fan-out batch once its rows are visible"""
+        def committed():
+            notification_cache.invalidate([n.recipient_id for n in batch])
+            notification_stream.publish(batch)
+        transaction.on_commit(committed)
+    
     @staticmethod
     def send_global_notification_to_roles(
         title: str,
@@ -416,8 +465,10 @@ class NotificationService:
                 id=notification_id,
                 recipient_id=user_id
             )
-            notification.is_read = True
-            notification.save()
+            if not notification.is_read:
+                notification.is_read = True
+                notification.save(update_fields=['is_read', 'updated_at'])
+                transaction.on_commit(lambda: notification_cache.decrement(user_id, notification.tenant))
             return True
         except Notification.DoesNotExist:
             logger.warning(f"Notification {notification_id} not found for user {user_id}")
@@ -430,10 +481,7 @@ class NotificationService:
     def get_unread_count(user_id: int) -> int:
         """Get unread notification count for a user"""
         try:
-            return Notification.objects.filter(
-                recipient_id=user_id,
-                is_read=False
-            ).count()
+            return notification_cache.get_unread_count(user_id)
         except Exception as e:
             logger.error(f"❌ Error getting unread count: {e}")
             return 0
@@ -1,7 +1,8 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .notification_service import NotificationService
+from lab.field_tracking import tracked_fields_changed
+from .notification_dispatch import enqueue
 
 # Import models
 from ..Doctor.NewTestRequest.NewTestRequest_models import TestRequest
@@ -16,66 +17,57 @@ User = get_user_model()
 def notify_test_request_created(sender, instance, created, **kwargs):
     """Notify when a new test request is created"""
     if created:
-        NotificationService.notify_test_request_created(instance)
+        enqueue('test_request_created', instance)
 
-@receiver(pre_save, sender=TestRequest)
-def notify_test_request_status_changed(sender, instance, **kwargs):
+@receiver(tracked_fields_changed, sender=TestRequest)
+def notify_test_request_status_changed(sender, instance, changes, **kwargs):
     """Notify when test request status changes"""
-    if instance.pk:
-        try:
-            old_instance = TestRequest.objects.get(pk=instance.pk)
-            if old_instance.status != instance.status:
-                NotificationService.notify_test_request_status_changed(
-                    instance, old_instance.status, instance.status
-                )
-        except TestRequest.DoesNotExist:
-            pass
+    if 'status' in changes:
+        old_status, new_status = changes['status']
+        enqueue(
+            'test_request_status_changed', instance,
+            old_status=old_status, new_status=new_status
+        )
 
 # Appointment Signals
 @receiver(post_save, sender=Appointment)
 def notify_appointment_created(sender, instance, created, **kwargs):
     """Notify when a new appointment is created"""
     if created:
-        NotificationService.notify_appointment_created(instance)
+        enqueue('appointment_created', instance)
 
-@receiver(pre_save, sender=Appointment)
-def notify_appointment_status_changed(sender, instance, **kwargs):
+@receiver(tracked_fields_changed, sender=Appointment)
+def notify_appointment_status_changed(sender, instance, changes, **kwargs):
     """Notify when appointment status changes"""
-    if instance.pk:
-        try:
-            old_instance = Appointment.objects.get(pk=instance.pk)
-            if old_instance.status != instance.status:
-                NotificationService.notify_appointment_status_changed(
-                    instance, old_instance.status, instance.status
-                )
-        except Appointment.DoesNotExist:
-            pass
+    if 'status' in changes:
+        old_status, new_status = changes['status']
+        enqueue(
+            'appointment_status_changed', instance,
+            old_status=old_status, new_status=new_status
+        )
 
 # Message Signals
 @receiver(post_save, sender=Message)
 def notify_new_message(sender, instance, created, **kwargs):
     """Notify when a new message is created"""
     if created:
-        NotificationService.notify_new_message(instance)
+        enqueue('message_created', instance)
 
 # Equipment Signals
 @receiver(post_save, sender=Equipment)
 def notify_equipment_maintenance_required(sender, instance, created, **kwargs):
     """Notify when equipment requires maintenance"""
     if created and instance.priority in ['Critical', 'Urgent']:
-        NotificationService.notify_equipment_maintenance_required(instance)
+        enqueue('equipment_maintenance_required', instance)
 
-@receiver(pre_save, sender=Equipment)
-def notify_equipment_priority_changed(sender, instance, **kwargs):
+@receiver(tracked_fields_changed, sender=Equipment)
+def notify_equipment_priority_changed(sender, instance, changes, **kwargs):
     """Notify when equipment priority changes to critical/urgent"""
-    if instance.pk:
-        try:
-            old_instance = Equipment.objects.get(pk=instance.pk)
-            if (old_instance.priority not in ['Critical', 'Urgent'] and 
-                instance.priority in ['Critical', 'Urgent']):
-                NotificationService.notify_equipment_maintenance_required(instance)
-        except Equipment.DoesNotExist:
-            pass
+    if 'priority' in changes:
+        old_priority, new_priority = changes['priority']
+        if (old_priority not in ['Critical', 'Urgent'] and 
+            new_priority in ['Critical', 'Urgent']):
+            enqueue('equipment_maintenance_required', instance)
 
 # Sample Processing Signals - Commented out until AcceptTestRequest model is properly set up
 # @receiver(post_save, sender=AcceptTestRequest)
@@ -0,0 +1,230 @@
+"""
+Server-Sent Events push channel for notifications.
+
+NotificationService publishes every committed notification to an in-process
+broker. Each open stream subscribes to its user channel (``user:<id>``) and its
+tenant channel (``tenant:<name>``, for notifications addressed to a tenant
+rather than a person) and receives events as they are published.
+
+Event ids are notification ids, so a reconnecting EventSource resumes from its
+Last-Event-ID by replaying newer rows from the database. Streams also catch up
+from the database every NOTIFICATION_STREAM_SYNC_SECONDS, which covers
+notifications created in another process (for example by the
+process_notification_outbox command) and subscribers that fell behind.
+
+Streaming needs the ASGI application in ``backend/asgi.py`` (uvicorn, daphne);
+under WSGI the endpoint answers 501 instead of pinning a worker.
+"""
+import asyncio
+import json
+import logging
+import threading
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from lab.components.TenantAccessAuth.authentication import ClaimsJWTAuthentication
+from .notification_models import Notification
+from .notification_serializers import NotificationListSerializer
+
+logger = logging.getLogger(__name__)
+
+STREAM_SYNC_SECONDS = getattr(settings, 'NOTIFICATION_STREAM_SYNC_SECONDS', 30)
+STREAM_HEARTBEAT_SECONDS = getattr(settings, 'NOTIFICATION_STREAM_HEARTBEAT_SECONDS', 15)
+STREAM_QUEUE_SIZE = 100
+STREAM_REPLAY_LIMIT = 100
+
+
+def channels_for(notification):
+    """Return the channels a notification is delivered on"""
+    if notification.recipient_id:
+        return [f"user:{notification.recipient_id}"]
+    if notification.tenant:
+        return [f"tenant:{notification.tenant}"]
+    # Global anchors without a recipient reach users through their fan-out rows
+    return []
+
+
+def _encode(notification):
+    return json.dumps(NotificationListSerializer(notification).data, default=str)
+
+
+class _Subscriber:
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=STREAM_QUEUE_SIZE)
+        self.lagging = False
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The stream will notice and catch up from the database
+            self.lagging = True
+
+
+class NotificationBroker:
+    """Thread-safe fan-out of published notifications to open streams"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._channels = {}
+
+    def subscribe(self, channels):
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            for channel in channels:
+                self._channels.setdefault(channel, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber, channels):
+        with self._lock:
+            for channel in channels:
+                subscribers = self._channels.get(channel)
+                if subscribers:
+                    subscribers.discard(subscriber)
+                    if not subscribers:
+                        del self._channels[channel]
+
+    def publish(self, notifications):
+        """Deliver notifications to subscribed streams; callable from any thread"""
+        with self._lock:
+            if not self._channels:
+                return
+            targets = []
+            for notification in notifications:
+                if notification.pk is None:
+                    continue
+                for channel in channels_for(notification):
+                    for subscriber in self._channels.get(channel, ()):
+                        targets.append((subscriber, notification))
+        encoded = {}
+        for subscriber, notification in targets:
+            if notification.pk not in encoded:
+                encoded[notification.pk] = _encode(notification)
+            event = (notification.pk, encoded[notification.pk])
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.push, event)
+            except RuntimeError:
+                # Event loop already closed; the stream is gone
+                pass
+
+
+broker = NotificationBroker()
+
+
+def publish(notifications):
+    try:
+        broker.publish(notifications)
+    except Exception as e:
+        logger.error(f"❌ Error publishing notifications: {e}")
+
+
+# ------------------------
+# Stream endpoint
+# ------------------------
+def _authenticate(request):
+    """Authenticate from the Authorization header or, for EventSource, ?token="""
+    authenticator = ClaimsJWTAuthentication()
+    token = request.GET.get('token')
+    try:
+        if token:
+            validated = authenticator.get_validated_token(token)
+            return authenticator.get_user(validated)
+        result = authenticator.authenticate(request)
+        return result[0] if result else None
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def _replay_queryset(user, after_id):
+    query = Q(recipient_id=user.id)
+    if getattr(user, 'tenant', None):
+        query |= Q(recipient__isnull=True, tenant=user.tenant)
+    return Notification.objects.filter(query, id__gt=after_id).order_by('id')
+
+
+def _replay(user, after_id):
+    return [
+        (notification.pk, _encode(notification))
+        for notification in _replay_queryset(user, after_id)[:STREAM_REPLAY_LIMIT]
+    ]
+
+
+def _latest_id(user):
+    latest = _replay_queryset(user, 0).order_by('-id').values_list('id', flat=True).first()
+    return latest or 0
+
+
+def _format(event_id, data):
+    return f"id: {event_id}\nevent: notification\ndata: {data}\n\n"
+
+
+async def _event_stream(user, last_event_id):
+    channels = [f"user:{user.id}"]
+    if getattr(user, 'tenant', None):
+        channels.append(f"tenant:{user.tenant}")
+    subscriber = broker.subscribe(channels)
+    loop = asyncio.get_running_loop()
+    try:
+        yield "retry: 5000\n\n"
+        if last_event_id is None:
+            last_event_id = await sync_to_async(_latest_id)(user)
+        last_sent = last_event_id
+        for event_id, data in await sync_to_async(_replay)(user, last_sent):
+            last_sent = event_id
+            yield _format(event_id, data)
+
+        next_sync = loop.time() + STREAM_SYNC_SECONDS
+        while True:
+            timeout = min(STREAM_HEARTBEAT_SECONDS, max(next_sync - loop.time(), 0))
+            try:
+                event_id, data = await asyncio.wait_for(subscriber.queue.get(), timeout)
+                idle = False
+                if event_id > last_sent:
+                    last_sent = event_id
+                    yield _format(event_id, data)
+            except asyncio.TimeoutError:
+                idle = True
+
+            if subscriber.lagging or loop.time() >= next_sync:
+                subscriber.lagging = False
+                next_sync = loop.time() + STREAM_SYNC_SECONDS
+                for event_id, data in await sync_to_async(_replay)(user, last_sent):
+                    last_sent = event_id
+                    yield _format(event_id, data)
+            elif idle:
+                yield ": keep-alive\n\n"
+    finally:
+        broker.unsubscribe(subscriber, channels)
+
+
+async def notification_stream(request):
+    """GET an SSE stream of the authenticated user's notifications"""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'Notification streaming requires the ASGI server (backend.asgi)'},
+            status=501
+        )
+
+    user = await sync_to_async(_authenticate)(request)
+    if user is None or not user.is_authenticated:
+        return JsonResponse({'error': 'Authentication required'}, status=401)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+
+    response = StreamingHttpResponse(
+        _event_stream(user, last_event_id), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
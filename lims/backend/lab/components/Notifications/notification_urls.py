@@ -1,11 +1,13 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .notification_views import NotificationViewSet, NotificationPreferenceViewSet
+from .notification_stream import notification_stream
 
 router = DefaultRouter()
 router.register(r'notifications', NotificationViewSet)
 router.register(r'preferences', NotificationPreferenceViewSet)
 
 urlpatterns = [
+    path('stream/', notification_stream, name='notification-stream'),
     path('', include(router.urls)),
 ]
@@ -8,6 +8,7 @@ from django.contrib.auth import get_user_model
 from .notification_models import Notification, NotificationPreference
 from .notification_serializers import NotificationSerializer, NotificationListSerializer, NotificationPreferenceSerializer
 from .notification_service import NotificationService
+from . import notification_cache
 
 User = get_user_model()
 
@@ -26,11 +27,28 @@ class NotificationViewSet(viewsets.ModelViewSet):
             return NotificationListSerializer
         return NotificationSerializer
     
+    def perform_create(self, serializer):
+        notification = serializer.save()
+        notification_cache.invalidate([notification.recipient_id], notification.tenant)
+    
+    def perform_update(self, serializer):
+        previous = (serializer.instance.recipient_id, serializer.instance.tenant)
+        notification = serializer.save()
+        notification_cache.invalidate([previous[0]], previous[1])
+        notification_cache.invalidate([notification.recipient_id], notification.tenant)
+    
+    def perform_destroy(self, instance):
+        recipient_id, tenant = instance.recipient_id, instance.tenant
+        instance.delete()
+        notification_cache.invalidate([recipient_id], tenant)
+    
     @action(detail=True, methods=['post'])
     def mark_read(self, request, pk=None):
         notification = self.get_object()
-        notification.is_read = True
-        notification.save()
+        if not notification.is_read:
+            notification.is_read = True
+            notification.save(update_fields=['is_read', 'updated_at'])
+            notification_cache.decrement(notification.recipient_id, notification.tenant)
         return Response({'status': 'Notification marked as read'})
     
     @action(detail=False, methods=['post'])
@@ -42,7 +60,14 @@ class NotificationViewSet(viewsets.ModelViewSet):
         if tenant:
             queryset = queryset.filter(tenant=tenant)
         
-        queryset.update(is_read=True)
+        tenants = set(queryset.values_list('tenant', flat=True).distinct())
+        updated = queryset.update(is_read=True)
+        if tenant:
+            notification_cache.decrement(user.id, delta=updated)
+        else:
+            notification_cache.invalidate([user.id])
+        for notification_tenant in tenants:
+            notification_cache.invalidate([user.id], notification_tenant)
         return Response({'status': 'All notifications marked as read'})
     
     @action(detail=False, methods=['get'])
@@ -50,12 +75,48 @@ class NotificationViewSet(viewsets.ModelViewSet):
         user = request.user
         tenant = request.query_params.get('tenant')
         
-        queryset = Notification.objects.filter(recipient=user, is_read=False)
+        if not user.is_authenticated:
+            return Response({'unread_count': 0})
+        
+        count = notification_cache.get_unread_count(user.id, tenant)
+        return Response({'unread_count': count})
+    
+    @action(detail=False, methods=['get'])
+    def inbox(self, request):
+        """
+        Return the user's notifications newer than the ``since`` cursor.
+        
+        Clients pass back the returned ``cursor`` on the next call so only new
+        notifications are transferred.
+        """
+        user = request.user
+        tenant = request.query_params.get('tenant')
+        
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = max(1, min(int(request.query_params.get('limit', 50)), 200))
+        except ValueError:
+            return Response(
+                {'error': 'since and limit must be integers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        if not user.is_authenticated:
+            return Response({'results': [], 'cursor': since, 'has_more': False, 'unread_count': 0})
+        
+        queryset = Notification.objects.filter(recipient=user, id__gt=since)
         if tenant:
             queryset = queryset.filter(tenant=tenant)
+        notifications = list(queryset.order_by('id')[:limit + 1])
+        has_more = len(notifications) > limit
+        notifications = notifications[:limit]
         
-        count = queryset.count()
-        return Response({'unread_count': count})
+        return Response({
+            'results': NotificationListSerializer(notifications, many=True).data,
+            'cursor': notifications[-1].id if notifications else since,
+            'has_more': has_more,
+            'unread_count': notification_cache.get_unread_count(user.id, tenant),
+        })
     
     @action(detail=False, methods=['post'])
     def send_global(self, request):
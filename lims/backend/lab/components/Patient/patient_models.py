@@ -154,6 +154,9 @@ class Patient(models.Model):
     
     class Meta:
         ordering = ['last_name', 'first_name']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='patient_cursor_idx'),
+        ]
         verbose_name = 'Patient'
         verbose_name_plural = 'Patients'
     
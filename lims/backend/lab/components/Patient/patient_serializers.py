@@ -57,6 +57,7 @@ class AppointmentSerializer(serializers.ModelSerializer):
             'created_at', 'updated_at', 'created_by'
         ]
         read_only_fields = ['id', 'appointment_id', 'created_at', 'updated_at', 'patient_name', 'doctor_name']
+        select_related = ['patient', 'doctor']
 
 
 class AppointmentListSerializer(serializers.ModelSerializer):
@@ -71,6 +72,12 @@ class AppointmentListSerializer(serializers.ModelSerializer):
             'appointment_date', 'appointment_time', 'appointment_type', 'status',
             'reason', 'created_at'
         ]
+        select_related = ['patient', 'doctor']
+        only = [
+            'id', 'appointment_id', 'patient', 'doctor', 'appointment_date', 'appointment_time',
+            'appointment_type', 'status', 'reason', 'created_at',
+            'patient__first_name', 'patient__last_name', 'doctor__first_name', 'doctor__last_name'
+        ]
 
 
 class TestResultSerializer(serializers.ModelSerializer):
@@ -93,6 +100,7 @@ class TestResultSerializer(serializers.ModelSerializer):
             'id', 'test_id', 'created_at', 'updated_at', 
             'patient_name', 'doctor_name', 'technician_name'
         ]
+        select_related = ['patient', 'doctor', 'technician']
 
 
 class TestResultListSerializer(serializers.ModelSerializer):
@@ -107,6 +115,12 @@ class TestResultListSerializer(serializers.ModelSerializer):
             'test_name', 'test_category', 'test_date', 'result_date', 'status',
             'is_abnormal', 'is_critical', 'created_at'
         ]
+        select_related = ['patient', 'doctor']
+        only = [
+            'id', 'test_id', 'patient', 'doctor', 'test_name', 'test_category', 'test_date',
+            'result_date', 'status', 'is_abnormal', 'is_critical', 'created_at',
+            'patient__first_name', 'patient__last_name', 'doctor__first_name', 'doctor__last_name'
+        ]
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -127,6 +141,7 @@ class MessageSerializer(serializers.ModelSerializer):
             'id', 'message_id', 'created_at', 'updated_at',
             'sender_name', 'recipient_name', 'patient_name', 'read_at'
         ]
+        select_related = ['sender', 'recipient', 'patient']
 
 
 class MessageListSerializer(serializers.ModelSerializer):
@@ -140,6 +155,11 @@ class MessageListSerializer(serializers.ModelSerializer):
             'id', 'message_id', 'sender', 'sender_name', 'recipient', 'recipient_name',
             'subject', 'priority', 'is_read', 'created_at'
         ]
+        select_related = ['sender', 'recipient']
+        only = [
+            'id', 'message_id', 'sender', 'recipient', 'subject', 'priority', 'is_read', 'created_at',
+            'sender__first_name', 'sender__last_name', 'recipient__first_name', 'recipient__last_name'
+        ]
 
 
 class SupportTicketSerializer(serializers.ModelSerializer):
@@ -161,6 +181,7 @@ class SupportTicketSerializer(serializers.ModelSerializer):
             'id', 'ticket_id', 'created_at', 'updated_at',
             'patient_name', 'assigned_to_name', 'resolved_by_name', 'resolved_at'
         ]
+        select_related = ['patient', 'assigned_to', 'resolved_by']
 
 
 class SupportTicketListSerializer(serializers.ModelSerializer):
@@ -175,6 +196,12 @@ class SupportTicketListSerializer(serializers.ModelSerializer):
             'subject', 'category', 'priority', 'status',
             'assigned_to', 'assigned_to_name', 'created_at'
         ]
+        select_related = ['patient', 'assigned_to']
+        only = [
+            'id', 'ticket_id', 'patient', 'subject', 'category', 'priority', 'status',
+            'assigned_to', 'created_at',
+            'patient__first_name', 'patient__last_name', 'assigned_to__first_name', 'assigned_to__last_name'
+        ]
 
 
 class PatientNotificationSerializer(serializers.ModelSerializer):
@@ -192,6 +219,7 @@ class PatientNotificationSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'id', 'notification_id', 'created_at', 'patient_name', 'read_at'
         ]
+        select_related = ['patient']
 
 
 class PatientNotificationListSerializer(serializers.ModelSerializer):
@@ -217,6 +245,10 @@ class PatientDetailSerializer(PatientSerializer):
         fields = PatientSerializer.Meta.fields + [
             'appointments', 'test_results', 'messages', 'support_tickets', 'notifications'
         ]
+        prefetch_related = [
+            'appointments__doctor', 'test_results__doctor', 'messages__sender', 'messages__recipient',
+            'support_tickets__assigned_to', 'notifications'
+        ]
 
 
 class AppointmentDetailSerializer(AppointmentSerializer):
@@ -6,7 +6,6 @@ from django.conf import settings
 from django.db.models import Q
 from django.utils import timezone
 from datetime import date, timedelta
-import uuid
 
 # Import the User model
 from django.contrib.auth import get_user_model
@@ -24,9 +23,11 @@ from .patient_serializers import (
     SupportTicketSerializer, SupportTicketListSerializer, SupportTicketDetailSerializer,
     PatientNotificationSerializer, PatientNotificationListSerializer
 )
+from lab.id_generator import new_id
+from lab.query_plan import QueryPlanMixin, plan_queryset
 
 
-class PatientViewSet(viewsets.ModelViewSet):
+class PatientViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """ViewSet for Patient management"""
     queryset = Patient.objects.all()
     permission_classes = [AllowAny]  # AllowAny for testing, change to IsAuthenticated in production
@@ -64,7 +65,7 @@ class PatientViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Create a new patient with auto-generated ID"""
-        patient_id = f"PAT{str(uuid.uuid4())[:8].upper()}"
+        patient_id = new_id("PAT")
         # Only set created_by if user is authenticated
         created_by = self.request.user if self.request.user.is_authenticated else None
         serializer.save(patient_id=patient_id, created_by=created_by)
@@ -74,6 +75,7 @@ class PatientViewSet(viewsets.ModelViewSet):
         """Get appointments for a specific patient"""
         patient = self.get_object()
         appointments = patient.appointments.all()
+        appointments = plan_queryset(appointments, AppointmentListSerializer)
         serializer = AppointmentListSerializer(appointments, many=True)
         return Response(serializer.data)
     
@@ -82,6 +84,7 @@ class PatientViewSet(viewsets.ModelViewSet):
         """Get test results for a specific patient"""
         patient = self.get_object()
         test_results = patient.test_results.all()
+        test_results = plan_queryset(test_results, TestResultListSerializer)
         serializer = TestResultListSerializer(test_results, many=True)
         return Response(serializer.data)
     
@@ -90,6 +93,7 @@ class PatientViewSet(viewsets.ModelViewSet):
         """Get messages for a specific patient"""
         patient = self.get_object()
         messages = patient.messages.all()
+        messages = plan_queryset(messages, MessageListSerializer)
         serializer = MessageListSerializer(messages, many=True)
         return Response(serializer.data)
     
@@ -98,6 +102,7 @@ class PatientViewSet(viewsets.ModelViewSet):
         """Get support tickets for a specific patient"""
         patient = self.get_object()
         support_tickets = patient.support_tickets.all()
+        support_tickets = plan_queryset(support_tickets, SupportTicketListSerializer)
         serializer = SupportTicketListSerializer(support_tickets, many=True)
         return Response(serializer.data)
     
@@ -106,6 +111,7 @@ class PatientViewSet(viewsets.ModelViewSet):
         """Get notifications for a specific patient"""
         patient = self.get_object()
         notifications = patient.notifications.all()
+        notifications = plan_queryset(notifications, PatientNotificationListSerializer)
         serializer = PatientNotificationListSerializer(notifications, many=True)
         return Response(serializer.data)
     
@@ -120,7 +126,7 @@ class PatientViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class AppointmentViewSet(viewsets.ModelViewSet):
+class AppointmentViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """ViewSet for Appointment management"""
     queryset = Appointment.objects.all()
     permission_classes = [AllowAny]  # AllowAny for testing, change to IsAuthenticated in production
@@ -162,7 +168,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Create a new appointment with auto-generated ID"""
-        appointment_id = f"APT{str(uuid.uuid4())[:8].upper()}"
+        appointment_id = new_id("APT")
         serializer.save(appointment_id=appointment_id, created_by=self.request.user)
     
     @action(detail=True, methods=['post'])
@@ -219,6 +225,7 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 status__in=['Scheduled', 'Confirmed']
             ).order_by('appointment_date', 'appointment_time')
         
+        appointments = plan_queryset(appointments, AppointmentListSerializer)
         serializer = AppointmentListSerializer(appointments, many=True)
         return Response(serializer.data)
     
@@ -242,11 +249,12 @@ class AppointmentViewSet(viewsets.ModelViewSet):
                 appointment_date=today
             ).order_by('appointment_time')
         
+        appointments = plan_queryset(appointments, AppointmentListSerializer)
         serializer = AppointmentListSerializer(appointments, many=True)
         return Response(serializer.data)
 
 
-class TestResultViewSet(viewsets.ModelViewSet):
+class TestResultViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """ViewSet for TestResult management"""
     queryset = TestResult.objects.all()
     permission_classes = [AllowAny]  # AllowAny for testing, change to IsAuthenticated in production
@@ -294,7 +302,7 @@ class TestResultViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Create a new test result with auto-generated ID"""
-        test_id = f"TST{str(uuid.uuid4())[:8].upper()}"
+        test_id = new_id("TST")
         serializer.save(test_id=test_id, created_by=self.request.user)
     
     @action(detail=True, methods=['post'])
@@ -329,6 +337,7 @@ class TestResultViewSet(viewsets.ModelViewSet):
         else:
             test_results = TestResult.objects.filter(is_abnormal=True)
         
+        test_results = plan_queryset(test_results, TestResultListSerializer)
         serializer = TestResultListSerializer(test_results, many=True)
         return Response(serializer.data)
     
@@ -346,6 +355,7 @@ class TestResultViewSet(viewsets.ModelViewSet):
         else:
             test_results = TestResult.objects.filter(is_critical=True)
         
+        test_results = plan_queryset(test_results, TestResultListSerializer)
         serializer = TestResultListSerializer(test_results, many=True)
         return Response(serializer.data)
     
@@ -370,11 +380,12 @@ class TestResultViewSet(viewsets.ModelViewSet):
                 test_date__gte=start_date
             ).order_by('-test_date')
         
+        test_results = plan_queryset(test_results, TestResultListSerializer)
         serializer = TestResultListSerializer(test_results, many=True)
         return Response(serializer.data)
 
 
-class MessageViewSet(viewsets.ModelViewSet):
+class MessageViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """ViewSet for Message management"""
     queryset = Message.objects.all()
     permission_classes = [AllowAny]  # AllowAny for testing, change to IsAuthenticated in production
@@ -415,7 +426,7 @@ class MessageViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Create a new message with auto-generated ID"""
-        message_id = f"MSG{str(uuid.uuid4())[:8].upper()}"
+        message_id = new_id("MSG")
         serializer.save(message_id=message_id, sender=self.request.user)
     
     @action(detail=True, methods=['post'])
@@ -452,6 +463,7 @@ class MessageViewSet(viewsets.ModelViewSet):
                 is_read=False
             )
         
+        messages = plan_queryset(messages, MessageListSerializer)
         serializer = MessageListSerializer(messages, many=True)
         return Response(serializer.data)
     
@@ -460,6 +472,7 @@ class MessageViewSet(viewsets.ModelViewSet):
         """Get sent messages"""
         user = request.user
         messages = Message.objects.filter(sender=user).order_by('-created_at')
+        messages = plan_queryset(messages, MessageListSerializer)
         serializer = MessageListSerializer(messages, many=True)
         return Response(serializer.data)
     
@@ -468,11 +481,12 @@ class MessageViewSet(viewsets.ModelViewSet):
         """Get received messages"""
         user = request.user
         messages = Message.objects.filter(recipient=user).order_by('-created_at')
+        messages = plan_queryset(messages, MessageListSerializer)
         serializer = MessageListSerializer(messages, many=True)
         return Response(serializer.data)
 
 
-class SupportTicketViewSet(viewsets.ModelViewSet):
+class SupportTicketViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """ViewSet for SupportTicket management"""
     queryset = SupportTicket.objects.all()
     permission_classes = [AllowAny]  # AllowAny for testing, change to IsAuthenticated in production
@@ -517,7 +531,7 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Create a new support ticket with auto-generated ID"""
-        ticket_id = f"TKT{str(uuid.uuid4())[:8].upper()}"
+        ticket_id = new_id("TKT")
         serializer.save(ticket_id=ticket_id)
     
     @action(detail=True, methods=['post'])
@@ -574,6 +588,7 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
         else:
             tickets = SupportTicket.objects.filter(status='Open')
         
+        tickets = plan_queryset(tickets, SupportTicketListSerializer)
         serializer = SupportTicketListSerializer(tickets, many=True)
         return Response(serializer.data)
     
@@ -582,11 +597,12 @@ class SupportTicketViewSet(viewsets.ModelViewSet):
         """Get support tickets assigned to current user"""
         user = request.user
         tickets = SupportTicket.objects.filter(assigned_to=user)
+        tickets = plan_queryset(tickets, SupportTicketListSerializer)
         serializer = SupportTicketListSerializer(tickets, many=True)
         return Response(serializer.data)
 
 
-class PatientNotificationViewSet(viewsets.ModelViewSet):
+class PatientNotificationViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     """ViewSet for PatientNotification management"""
     queryset = PatientNotification.objects.all()
     permission_classes = [AllowAny]  # AllowAny for testing, change to IsAuthenticated in production
@@ -623,7 +639,7 @@ class PatientNotificationViewSet(viewsets.ModelViewSet):
     
     def perform_create(self, serializer):
         """Create a new notification with auto-generated ID"""
-        notification_id = f"NOT{str(uuid.uuid4())[:8].upper()}"
+        notification_id = new_id("NOT")
         serializer.save(notification_id=notification_id)
     
     @action(detail=True, methods=['post'])
@@ -649,6 +665,7 @@ class PatientNotificationViewSet(viewsets.ModelViewSet):
         else:
             notifications = PatientNotification.objects.filter(is_read=False)
         
+        notifications = plan_queryset(notifications, PatientNotificationListSerializer)
         serializer = PatientNotificationListSerializer(notifications, many=True)
         return Response(serializer.data)
     
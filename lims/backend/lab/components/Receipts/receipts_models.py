@@ -37,6 +37,9 @@ class Receipt(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='receipt_cursor_idx'),
+        ]
     
     def __str__(self):
         return f"Receipt {self.id} - {self.patient_name}"
@@ -1,4 +1,3 @@
-import time
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -7,14 +6,17 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 from .receipts_models import Receipt, BillingTransaction
 from .receipts_serializers import ReceiptSerializer, ReceiptListSerializer, BillingTransactionSerializer
+from lab.id_generator import new_id
+from lab.components.Search.search_filters import FullTextSearchFilter
 
 class ReceiptViewSet(viewsets.ModelViewSet):
     queryset = Receipt.objects.all().order_by('-created_at')
     serializer_class = ReceiptSerializer
     permission_classes = [AllowAny]  # Temporarily allow unauthenticated access for testing
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['status', 'payment_method', 'tenant', 'doctor']
     search_fields = ['patient_name', 'patient_id', 'id']
+    search_kind = 'receipt'
     ordering_fields = ['created_at', 'amount', 'generated_date']
     ordering = ['-created_at']
     
@@ -28,7 +30,7 @@ class ReceiptViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing
         if not data.get('id'):
-            data['id'] = f"RCP{int(time.time() * 1000)}"
+            data['id'] = new_id('RCP')
         
         # Set default values
         if not data.get('tenant'):
@@ -73,7 +75,7 @@ class BillingTransactionViewSet(viewsets.ModelViewSet):
         
         # Generate unique ID if missing
         if not data.get('id'):
-            data['id'] = f"TXN{int(time.time() * 1000)}"
+            data['id'] = new_id('TXN')
         
         # Set default values
         if not data.get('tenant'):
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class SearchConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'lab.components.Search'
+
+    def ready(self):
+        import lab.components.Search.search_signals
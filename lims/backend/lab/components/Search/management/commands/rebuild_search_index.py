@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lab.components.Search.search_index import SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    help = 'Regenerate the full-text search documents from their source records'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind', action='append', choices=sorted(SOURCES),
+            help='Only rebuild this kind of document (repeatable)',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Records inserted per statement')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        counts = rebuild(options['kind'], batch_size=options['batch_size'])
+        for kind, count in counts.items():
+            self.stdout.write(f"{kind}: {count} documents")
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:34
+
+from django.db import migrations, models
+
+# The FTS5 index mirrors Search_searchdocument through triggers. SQLite
+# migrations that rebuild that table drop its triggers, so such a migration
+# must recreate them (create_search_index) and run rebuild_search_index.
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE search_fts USING fts5(
+        title, subtitle, body,
+        content='Search_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    "CREATE VIRTUAL TABLE search_fts_vocab USING fts5vocab(search_fts, row)",
+    """
+    CREATE TRIGGER search_document_insert AFTER INSERT ON "Search_searchdocument" BEGIN
+        INSERT INTO search_fts(rowid, title, subtitle, body)
+        VALUES (new.id, new.title, new.subtitle, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_document_delete AFTER DELETE ON "Search_searchdocument" BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, subtitle, body)
+        VALUES ('delete', old.id, old.title, old.subtitle, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER search_document_update AFTER UPDATE ON "Search_searchdocument" BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, subtitle, body)
+        VALUES ('delete', old.id, old.title, old.subtitle, old.body);
+        INSERT INTO search_fts(rowid, title, subtitle, body)
+        VALUES (new.id, new.title, new.subtitle, new.body);
+    END
+    """,
+]
+
+DROP_SEARCH_INDEX = [
+    'DROP TRIGGER IF EXISTS search_document_insert',
+    'DROP TRIGGER IF EXISTS search_document_delete',
+    'DROP TRIGGER IF EXISTS search_document_update',
+    'DROP TABLE IF EXISTS search_fts_vocab',
+    'DROP TABLE IF EXISTS search_fts',
+]
+
+
+def create_search_index(apps, schema_editor):
+    # Other databases search the documents without a full-text index
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in CREATE_SEARCH_INDEX:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for statement in DROP_SEARCH_INDEX:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=30)),
+                ('object_id', models.CharField(max_length=100)),
+                ('title', models.CharField(max_length=255)),
+                ('subtitle', models.CharField(blank=True, default='', max_length=255)),
+                ('body', models.TextField(blank=True, default='')),
+                ('tenant_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexState',
+            fields=[
+                ('kind', models.CharField(max_length=30, primary_key=True, serialize=False)),
+                ('rebuilt_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+from rest_framework import filters
+
+from .search_index import is_indexed, matching_ids
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    SearchFilter answered from the full-text index for viewsets that set
+    ``search_kind``. Until that kind has been rebuilt once (see the
+    rebuild_search_index command) documents exist only for records saved
+    since, so it falls back to SearchFilter's scan over ``search_fields``.
+
+    A ``?tenant=`` filter narrows the index lookup too, so the best matches
+    of other tenants do not use up its ``SEARCH_FILTER_LIMIT``.
+    """
+    tenant_param = 'tenant'
+
+    def filter_queryset(self, request, queryset, view):
+        kind = getattr(view, 'search_kind', None)
+        query = request.query_params.get(self.search_param, '')
+        if kind and query.strip() and is_indexed(kind):
+            tenant_id = request.query_params.get(self.tenant_param) or None
+            ids = matching_ids(kind, query, tenant_id=tenant_id)
+            if ids is not None:
+                return queryset.filter(pk__in=ids)
+        return super().filter_queryset(request, queryset, view)
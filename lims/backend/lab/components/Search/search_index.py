@@ -0,0 +1,294 @@
+"""
+Full-text search over patients and their records.
+
+Each searchable record (portal and doctor-managed patients, receipts, home
+visit requests) has a SearchDocument row with a display title, a subtitle and
+a body of searchable text. Documents are written by post_save/post_delete
+signals; ``rebuild_search_index`` regenerates them after bulk imports or
+``QuerySet.update()`` calls, which bypass signals. Records that predate the
+index have no document until it first runs, so ``rebuild`` records each kind
+it completes in SearchIndexState and list filters only trust kinds marked there.
+
+On SQLite the documents are mirrored by triggers into ``search_fts``, an FTS5
+external-content table (see migration 0001), so a search is one index lookup
+ranked by bm25 with the title weighted highest. Every query term matches as a
+prefix, so results update as the user types. When a query finds nothing, each
+term is widened to indexed words within one edit (two for long words) that
+share its first two letters, read from the ``search_fts_vocab`` table.
+Other databases fall back to ``icontains`` over the documents.
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .search_models import SearchDocument, SearchIndexState
+
+FTS_TABLE = 'search_fts'
+VOCAB_TABLE = 'search_fts_vocab'
+# bm25 weights of the title, subtitle and body columns
+COLUMN_WEIGHTS = (10.0, 5.0, 1.0)
+
+MAX_RESULTS = getattr(settings, 'SEARCH_MAX_RESULTS', 100)
+FILTER_LIMIT = getattr(settings, 'SEARCH_FILTER_LIMIT', 1000)
+MAX_TERMS = 8
+FUZZY_MIN_LENGTH = 4
+FUZZY_CANDIDATES = 5
+REBUILD_BATCH_SIZE = 1000
+
+TERM = re.compile(r'[^\W_]+')
+
+
+# ------------------------
+# Sources
+# ------------------------
+@dataclass(frozen=True)
+class SearchSource:
+    kind: str
+    model_path: str
+    document: Callable  # instance -> (title, subtitle, body)
+
+    @property
+    def model(self):
+        return import_string(self.model_path)
+
+
+def _digits(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def _join(*values):
+    return ' '.join(str(value) for value in values if value)
+
+
+def _portal_patient(patient):
+    return patient.full_name, patient.patient_id, _join(
+        patient.patient_id, patient.email, patient.phone, _digits(patient.phone)
+    )
+
+
+def _doctor_patient(patient):
+    return patient.name, patient.patient_id, _join(
+        patient.patient_id, patient.email, patient.phone, _digits(patient.phone)
+    )
+
+
+def _receipt(receipt):
+    return receipt.patient_name, f"Receipt {receipt.id}", _join(
+        receipt.id, receipt.patient_id, receipt.doctor
+    )
+
+
+def _home_visit(visit):
+    return visit.patient_name, f"Home visit {visit.id}", _join(
+        visit.id, visit.patient_id, visit.phone, _digits(visit.phone), visit.doctor, visit.address
+    )
+
+
+SOURCES = {source.kind: source for source in [
+    SearchSource('patient', 'lab.components.Patient.patient_models.Patient', _portal_patient),
+    SearchSource('doctor_patient', 'lab.components.Doctor.PatientManagement.patient_models.Patient', _doctor_patient),
+    SearchSource('receipt', 'lab.components.Receipts.receipts_models.Receipt', _receipt),
+    SearchSource('home_visit', 'lab.components.HomeVisit.home_visit_models.HomeVisitRequest', _home_visit),
+]}
+
+
+# ------------------------
+# Indexing
+# ------------------------
+def _document_fields(source, instance):
+    title, subtitle, body = source.document(instance)
+    tenant_id = getattr(instance, 'tenant_id', None)
+    return {
+        'title': (title or '')[:255],
+        'subtitle': (subtitle or '')[:255],
+        'body': body,
+        'tenant_id': str(tenant_id) if tenant_id is not None else None,
+    }
+
+
+def index_instance(source, instance):
+    """Create or refresh the document of ``instance``"""
+    SearchDocument.objects.update_or_create(
+        kind=source.kind, object_id=str(instance.pk),
+        defaults=_document_fields(source, instance),
+    )
+
+
+def unindex_instance(source, pk):
+    SearchDocument.objects.filter(kind=source.kind, object_id=str(pk)).delete()
+
+
+def rebuild(kinds=None, batch_size=REBUILD_BATCH_SIZE):
+    """
+    Regenerate the documents of ``kinds`` (all sources by default) and mark
+    them indexed; returns counts per kind.
+    """
+    counts = {}
+    for kind in kinds or SOURCES:
+        source = SOURCES[kind]
+        with transaction.atomic():
+            SearchDocument.objects.filter(kind=kind).delete()
+            batch = []
+            counts[kind] = 0
+            for instance in source.model.objects.order_by().iterator(chunk_size=batch_size):
+                batch.append(SearchDocument(
+                    kind=kind, object_id=str(instance.pk), **_document_fields(source, instance)
+                ))
+                if len(batch) >= batch_size:
+                    SearchDocument.objects.bulk_create(batch)
+                    counts[kind] += len(batch)
+                    batch = []
+            SearchDocument.objects.bulk_create(batch)
+            counts[kind] += len(batch)
+            SearchIndexState.objects.update_or_create(kind=kind, defaults={'rebuilt_at': timezone.now()})
+    if fts_available():
+        with connection.cursor() as cursor:
+            # Merge the index segments left by the bulk load
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return counts
+
+
+# ------------------------
+# Searching
+# ------------------------
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def query_terms(query):
+    return [term.lower() for term in TERM.findall(query or '')][:MAX_TERMS]
+
+
+def _quote(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _match_expression(terms, alternatives=None):
+    parts = []
+    for term in terms:
+        options = [_quote(term) + '*'] + [_quote(similar) for similar in (alternatives or {}).get(term, [])]
+        parts.append(options[0] if len(options) == 1 else '(' + ' OR '.join(options) + ')')
+    return ' AND '.join(parts)
+
+
+def _edit_distance(a, b, limit):
+    """Optimal string alignment distance of ``a`` and ``b``, or ``limit + 1`` once it exceeds ``limit``"""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+
+def similar_terms(term):
+    """Indexed words within the typo budget of ``term``, closest and most common first"""
+    if len(term) < FUZZY_MIN_LENGTH:
+        return []
+    limit = 1 if len(term) < 8 else 2
+    start = term[:2]
+    end = start[:-1] + chr(ord(start[-1]) + 1)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT term, doc FROM {VOCAB_TABLE} WHERE term >= %s AND term < %s", [start, end]
+        )
+        rows = cursor.fetchall()
+    candidates = []
+    for word, documents in rows:
+        if word == term or abs(len(word) - len(term)) > limit:
+            continue
+        distance = _edit_distance(term, word, limit)
+        if distance <= limit:
+            candidates.append((distance, -documents, word))
+    return [word for _, _, word in sorted(candidates)[:FUZZY_CANDIDATES]]
+
+
+def _fts_search(expression, kinds, tenant_id, limit):
+    table = SearchDocument._meta.db_table
+    sql = (
+        f'SELECT d.kind, d.object_id, d.title, d.subtitle, bm25({FTS_TABLE}, %s, %s, %s) AS score '
+        f'FROM {FTS_TABLE} JOIN "{table}" d ON d.id = {FTS_TABLE}.rowid '
+        f'WHERE {FTS_TABLE} MATCH %s'
+    )
+    params = [*COLUMN_WEIGHTS, expression]
+    if kinds:
+        sql += f" AND d.kind IN ({', '.join(['%s'] * len(kinds))})"
+        params += list(kinds)
+    if tenant_id:
+        sql += ' AND d.tenant_id = %s'
+        params.append(str(tenant_id))
+    sql += ' ORDER BY score LIMIT %s'
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [
+            # bm25 scores are negative, lower is better
+            {'kind': kind, 'id': object_id, 'title': title, 'subtitle': subtitle, 'score': -score}
+            for kind, object_id, title, subtitle, score in cursor.fetchall()
+        ]
+
+
+def _scan_search(terms, kinds, tenant_id, limit):
+    documents = SearchDocument.objects.all()
+    for term in terms:
+        documents = documents.filter(
+            Q(title__icontains=term) | Q(subtitle__icontains=term) | Q(body__icontains=term)
+        )
+    if kinds:
+        documents = documents.filter(kind__in=kinds)
+    if tenant_id:
+        documents = documents.filter(tenant_id=str(tenant_id))
+    return [
+        {'kind': kind, 'id': object_id, 'title': title, 'subtitle': subtitle, 'score': None}
+        for kind, object_id, title, subtitle in documents.order_by('-updated_at').values_list(
+            'kind', 'object_id', 'title', 'subtitle'
+        )[:limit]
+    ]
+
+
+def search(query, kinds=None, tenant_id=None, limit=20):
+    """
+    Return ``(results, fuzzy)``: up to ``limit`` ranked ``{'kind', 'id',
+    'title', 'subtitle', 'score'}`` dicts, and whether typo tolerance was
+    needed to find them.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return [], False
+    if not fts_available():
+        return _scan_search(terms, kinds, tenant_id, limit), False
+
+    results = _fts_search(_match_expression(terms), kinds, tenant_id, limit)
+    if results:
+        return results, False
+    alternatives = {term: similar_terms(term) for term in terms}
+    if not any(alternatives.values()):
+        return [], False
+    return _fts_search(_match_expression(terms, alternatives), kinds, tenant_id, limit), True
+
+
+def is_indexed(kind):
+    """Whether every ``kind`` record has a document, i.e. ``rebuild`` has run for it"""
+    return SearchIndexState.objects.filter(kind=kind).exists()
+
+
+def matching_ids(kind, query, tenant_id=None, limit=FILTER_LIMIT):
+    """
+    Primary keys of the best ``kind`` matches for ``query`` within
+    ``tenant_id``, or None when it has no terms.
+    """
+    if not query_terms(query):
+        return None
+    results, _ = search(query, kinds=[kind], tenant_id=tenant_id, limit=limit)
+    return [result['id'] for result in results]
@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """One searchable record; mirrored into the search_fts full-text index"""
+    kind = models.CharField(max_length=30)
+    object_id = models.CharField(max_length=100)
+    title = models.CharField(max_length=255)
+    subtitle = models.CharField(max_length=255, blank=True, default='')
+    body = models.TextField(blank=True, default='')
+    tenant_id = models.CharField(max_length=100, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
+
+
+class SearchIndexState(models.Model):
+    """Marks a kind whose documents have been fully built by ``rebuild``"""
+    kind = models.CharField(max_length=30, primary_key=True)
+    rebuilt_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.kind} rebuilt {self.rebuilt_at}"
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+
+from .search_index import SOURCES, index_instance, unindex_instance
+
+
+def _connect(source):
+    def update_search_document(sender, instance, raw=False, **kwargs):
+        """Index a saved record (fixture loads are indexed by rebuild_search_index)"""
+        if not raw:
+            index_instance(source, instance)
+
+    def remove_search_document(sender, instance, **kwargs):
+        unindex_instance(source, instance.pk)
+
+    model = source.model
+    post_save.connect(update_search_document, sender=model, weak=False,
+                      dispatch_uid=f'search-index-save-{source.kind}')
+    post_delete.connect(remove_search_document, sender=model, weak=False,
+                        dispatch_uid=f'search-index-delete-{source.kind}')
+
+
+for source in SOURCES.values():
+    _connect(source)
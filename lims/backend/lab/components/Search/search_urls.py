@@ -0,0 +1,6 @@
+from django.urls import path
+from .search_views import SearchAPIView
+
+urlpatterns = [
+    path('', SearchAPIView.as_view(), name='search'),
+]
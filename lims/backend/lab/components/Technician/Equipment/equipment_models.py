@@ -1,7 +1,8 @@
 from django.db import models
 from lab.models import LabBaseModel
+from lab.field_tracking import FieldTrackerMixin, FieldTrackerQuerySet
 
-class Equipment(LabBaseModel):
+class Equipment(FieldTrackerMixin, LabBaseModel):
     STATUS_CHOICES = [
         ('operational', 'Operational'),
         ('maintenance', 'Maintenance'),
@@ -25,6 +26,9 @@ class Equipment(LabBaseModel):
     notes = models.TextField(blank=True, null=True)
     tenant = models.CharField(max_length=100, null=True, blank=True)
     
+    tracked_fields = ('priority',)
+    objects = FieldTrackerQuerySet.as_manager()
+    
     class Meta:
         app_label = 'lab'
         ordering = ['name']
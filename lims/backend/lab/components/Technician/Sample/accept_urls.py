@@ -1,6 +1,7 @@
 from django.urls import path
-from .accept_views import AcceptTestRequestAPIView
+from .accept_views import AcceptTestRequestAPIView, BulkAcceptTestRequestsAPIView
 
 urlpatterns = [
     path('<int:pk>/', AcceptTestRequestAPIView.as_view(), name='accept-test-request'),
+    path('bulk/', BulkAcceptTestRequestsAPIView.as_view(), name='bulk-accept-test-requests'),
 ]
@@ -1,11 +1,86 @@
 # lab/components/Technician/Sample/accept_views.py
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from lab.models import Sample
+from lab.models import Sample, queue_due_time
 from lab.components.Doctor.NewTestRequest.NewTestRequest_models import TestRequest
 from lab.components.Technician.Sample.accept_serializers import AcceptSampleSerializer
+from lab.id_generator import new_id
+
+PRIORITY_MAP = {
+    'Normal': 'routine',
+    'Urgent': 'urgent',
+    'Critical': 'stat',
+    'STAT': 'stat'
+}
+BULK_ACCEPT_MAX = 500
+
+
+def accept_test_requests(request_ids):
+    """
+    Accept TestRequests and create their Samples in one transaction.
+
+    The requests are locked, all Samples are inserted with one bulk_create and
+    the requests are flagged with one update(). A request that already has a
+    sample is rejected by the unique constraint on Sample.test_request_id, not
+    by a pre-check. Returns ``(results, samples)``: one result per ID with a
+    status of accepted, already_accepted or not_found, and the created
+    Samples by request ID.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        test_requests = {
+            test_request.id: test_request
+            for test_request in TestRequest.objects.select_for_update().filter(pk__in=request_ids)
+            .only('id', 'patient_id', 'priority', 'test_type')
+        }
+        samples = {
+            request_id: Sample(
+                id=new_id("SMP"),
+                patient_id=test_request.patient_id,
+                test_request_id=str(request_id),
+                sample_type='blood',  # Default to blood, can be updated later
+                collection_date=now,
+                received_date=now,
+                status='received',
+                priority=PRIORITY_MAP.get(test_request.priority, 'routine'),
+                collection_notes=f"Accepted from test request: {test_request.test_type}",
+                tenant_id='default_tenant',
+                # bulk_create skips Sample.save()
+                queue_due_at=queue_due_time(PRIORITY_MAP.get(test_request.priority, 'routine'), now)
+            )
+            for request_id, test_request in test_requests.items()
+        }
+        # Rows conflicting with an existing sample are skipped by the database
+        Sample.objects.bulk_create(samples.values(), ignore_conflicts=True)
+        created_ids = set(
+            Sample.objects.filter(id__in=[sample.id for sample in samples.values()])
+            .values_list('id', flat=True)
+        )
+        samples = {
+            request_id: sample for request_id, sample in samples.items() if sample.id in created_ids
+        }
+        existing = dict(
+            Sample.objects.filter(
+                test_request_id__in=[str(request_id) for request_id in test_requests if request_id not in samples]
+            ).values_list('test_request_id', 'id')
+        )
+
+        # Mark requests as accepted to hide them from the frontend
+        TestRequest.objects.filter(pk__in=list(test_requests)).update(accepted=True, updated_at=now)
+
+    results = []
+    for request_id in request_ids:
+        if request_id in samples:
+            results.append({'id': request_id, 'status': 'accepted', 'sample_id': samples[request_id].id})
+        elif request_id in test_requests:
+            results.append({'id': request_id, 'status': 'already_accepted', 'sample_id': existing.get(str(request_id))})
+        else:
+            results.append({'id': request_id, 'status': 'not_found', 'sample_id': None})
+    return results, samples
+
 
 class AcceptTestRequestAPIView(APIView):
     """
@@ -13,48 +88,51 @@ class AcceptTestRequestAPIView(APIView):
     """
 
     def post(self, request, pk):
-        try:
-            test_request = TestRequest.objects.get(pk=pk)
-        except TestRequest.DoesNotExist:
+        results, samples = accept_test_requests([pk])
+
+        if results[0]['status'] == 'not_found':
             return Response(
                 {"error": "Test request not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
-
-        # Prevent duplicate Sample creation
-        existing_sample = Sample.objects.filter(test_request_id=str(test_request.id)).first()
-        if existing_sample:
+        if results[0]['status'] == 'already_accepted':
             return Response(
                 {"error": "Sample already exists for this request."},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        priority_map = {
-            'Normal': 'routine',
-            'Urgent': 'urgent',
-            'Critical': 'stat',
-            'STAT': 'stat'
-        }
+        serializer = AcceptSampleSerializer(samples[pk])
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
 
-        # Generate a unique sample ID
-        sample_id = f"SMP{Sample.objects.count() + 1:04d}"
-
-        sample = Sample.objects.create(
-            id=sample_id,
-            patient_id=test_request.patient_id,
-            test_request_id=str(test_request.id),
-            sample_type='blood',  # Default to blood, can be updated later
-            collection_date=timezone.now(),
-            received_date=timezone.now(),
-            status='received',
-            priority=priority_map.get(test_request.priority, 'routine'),
-            collection_notes=f"Accepted from test request: {test_request.test_type}",
-            tenant_id='default_tenant'
-        )
 
-        # Mark request as accepted to hide from frontend
-        test_request.accepted = True
-        test_request.save()
+class BulkAcceptTestRequestsAPIView(APIView):
+    """
+    Accept many TestRequests at once: {"ids": [1, 2, ...]}.
+    Returns a result per ID; the whole batch is applied in one transaction.
+    """
 
-        serializer = AcceptSampleSerializer(sample)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    def post(self, request):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response(
+                {"error": "ids must be a non-empty list of test request IDs"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > BULK_ACCEPT_MAX:
+            return Response(
+                {"error": f"At most {BULK_ACCEPT_MAX} test requests can be accepted at once"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            request_ids = list(dict.fromkeys(int(request_id) for request_id in ids))
+        except (TypeError, ValueError):
+            return Response(
+                {"error": "ids must be integers"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results, samples = accept_test_requests(request_ids)
+        return Response({
+            'accepted': len(samples),
+            'results': results,
+        })
@@ -5,6 +5,7 @@ from rest_framework.views import APIView
 from lab.models import Sample
 from lab.components.Doctor.NewTestRequest.NewTestRequest_models import TestRequest
 from .sample_serializers import SampleSerializer, TestRequestSerializer
+from lab.id_generator import new_id
 
 class SampleList(generics.ListCreateAPIView):
     queryset = Sample.objects.all()
@@ -13,7 +14,7 @@ class SampleList(generics.ListCreateAPIView):
     def perform_create(self, serializer):
         # Generate a unique sample ID if not provided
         if not serializer.validated_data.get('id'):
-            sample_id = f"SMP{Sample.objects.count() + 1:04d}"
+            sample_id = new_id("SMP")
             serializer.save(id=sample_id)
         else:
             serializer.save()
@@ -63,9 +63,10 @@ class SampleSerializer(serializers.ModelSerializer):
             'status', 'status_display', 'priority', 'priority_display', 'volume',
             'container_type', 'storage_conditions', 'expiry_date', 'collection_notes',
             'processing_notes', 'rejection_reason', 'tenant', 'tenant_name',
-            'created_at', 'updated_at', 'test_request_id', 'test_type', 'doctor_name'
+            'created_at', 'updated_at', 'test_request_id', 'test_type', 'doctor_name',
+            'queue_due_at', 'claimed_by', 'lease_expires_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'queue_due_at', 'claimed_by', 'lease_expires_at']
 
 
 class SampleListSerializer(serializers.ModelSerializer):
@@ -81,7 +82,8 @@ class SampleListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'patient_id', 'sample_type', 'sample_type_display', 'status',
             'status_display', 'priority', 'priority_display', 'collection_date',
-            'technician_name', 'test_type', 'volume'
+            'technician_name', 'test_type', 'volume', 'queue_due_at', 'claimed_by',
+            'lease_expires_at'
         ]
 
 
@@ -180,9 +182,10 @@ class LabWorkflowSerializer(serializers.ModelSerializer):
             'id', 'workflow_type', 'workflow_type_display', 'title', 'description',
             'status', 'status_display', 'assigned_to', 'assigned_to_name', 'priority',
             'priority_display', 'due_date', 'completed_date', 'estimated_duration',
-            'actual_duration', 'notes', 'tenant', 'tenant_name', 'created_at', 'updated_at'
+            'actual_duration', 'notes', 'tenant', 'tenant_name', 'created_at', 'updated_at',
+            'queue_due_at', 'claimed_by', 'lease_expires_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_at', 'updated_at', 'queue_due_at', 'claimed_by', 'lease_expires_at']
 
 
 class LabWorkflowListSerializer(serializers.ModelSerializer):
@@ -197,5 +200,6 @@ class LabWorkflowListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'workflow_type', 'workflow_type_display', 'title', 'status',
             'status_display', 'assigned_to_name', 'priority', 'priority_display',
-            'due_date', 'completed_date', 'estimated_duration', 'actual_duration'
+            'due_date', 'completed_date', 'estimated_duration', 'actual_duration',
+            'queue_due_at', 'claimed_by', 'lease_expires_at'
         ]
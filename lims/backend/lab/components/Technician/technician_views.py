@@ -17,6 +17,9 @@ from .technician_serializers import (
     QualityControlSerializer, QualityControlListSerializer,
     LabWorkflowSerializer, LabWorkflowListSerializer
 )
+from .work_queue import (
+    SAMPLE_QUEUE, WORKFLOW_QUEUE, LeaseError, claim_next, queued, release, renew
+)
 
 
 class TechnicianViewSet(viewsets.ModelViewSet):
@@ -113,7 +116,83 @@ class TechnicianViewSet(viewsets.ModelViewSet):
         return Response(stats)
 
 
-class SampleViewSet(viewsets.ModelViewSet):
+class WorkQueueMixin:
+    """Queue, claim and lease actions for viewsets over a work queue"""
+    work_queue = None
+    queue_serializer_class = None
+    queue_max_limit = 200
+
+    def _claimed_by(self, request):
+        """
+        Return ``(claimed_by, error_response)``. Authenticated callers always
+        act as themselves; ``claimed_by`` in the body is only read for
+        anonymous callers and must otherwise match the user.
+        """
+        claimed_by = request.data.get('claimed_by')
+        if request.user.is_authenticated:
+            username = request.user.get_username()
+            if claimed_by and claimed_by != username:
+                return None, Response(
+                    {"error": "claimed_by must be the authenticated user"},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            claimed_by = username
+        if not claimed_by:
+            return None, Response({"error": "claimed_by is required"}, status=status.HTTP_400_BAD_REQUEST)
+        return claimed_by, None
+
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        """Unclaimed queued items, next due first"""
+        items = queued(self.work_queue)
+        tenant_id = request.query_params.get('tenant')
+        if tenant_id:
+            items = items.filter(tenant_id=tenant_id)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 50)), 1), self.queue_max_limit)
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = self.queue_serializer_class(items[:limit], many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def claim_next(self, request):
+        """Lease the next queued item to the caller"""
+        claimed_by, error = self._claimed_by(request)
+        if error:
+            return error
+        tenant_id = request.data.get('tenant') or request.query_params.get('tenant')
+        item = claim_next(self.work_queue, claimed_by, {'tenant_id': tenant_id} if tenant_id else None)
+        if item is None:
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(self.queue_serializer_class(item).data)
+
+    @action(detail=True, methods=['post'])
+    def renew_lease(self, request, pk=None):
+        """Extend the caller's lease on an item"""
+        claimed_by, error = self._claimed_by(request)
+        if error:
+            return error
+        try:
+            lease_expires_at = renew(self.work_queue, pk, claimed_by)
+        except LeaseError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response({"id": pk, "lease_expires_at": lease_expires_at})
+
+    @action(detail=True, methods=['post'])
+    def release(self, request, pk=None):
+        """Return a claimed item to the queue"""
+        claimed_by, error = self._claimed_by(request)
+        if error:
+            return error
+        try:
+            release(self.work_queue, pk, claimed_by)
+        except LeaseError as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_409_CONFLICT)
+        return Response({"message": "Lease released"})
+
+
+class SampleViewSet(WorkQueueMixin, viewsets.ModelViewSet):
     """ViewSet for managing laboratory samples"""
     queryset = Sample.objects.all()
     serializer_class = SampleSerializer
@@ -121,8 +200,10 @@ class SampleViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['sample_type', 'status', 'priority', 'technician', 'tenant']
     search_fields = ['id', 'patient_id', 'test_request__test_type', 'collection_notes']
-    ordering_fields = ['collection_date', 'received_date', 'priority']
+    ordering_fields = ['collection_date', 'received_date', 'priority', 'queue_due_at']
     ordering = ['-collection_date']
+    work_queue = SAMPLE_QUEUE
+    queue_serializer_class = SampleListSerializer
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -187,7 +268,7 @@ class SampleViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def pending_samples(self, request):
         """Get pending samples for processing"""
-        pending_samples = Sample.objects.filter(status='received').order_by('priority', 'collection_date')
+        pending_samples = queued(SAMPLE_QUEUE, include_leased=True)
         serializer = SampleListSerializer(pending_samples, many=True)
         return Response(serializer.data)
 
@@ -406,7 +487,7 @@ class QualityControlViewSet(viewsets.ModelViewSet):
         return Response(stats)
 
 
-class LabWorkflowViewSet(viewsets.ModelViewSet):
+class LabWorkflowViewSet(WorkQueueMixin, viewsets.ModelViewSet):
     """ViewSet for managing lab workflows"""
     queryset = LabWorkflow.objects.all()
     serializer_class = LabWorkflowSerializer
@@ -414,8 +495,10 @@ class LabWorkflowViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['workflow_type', 'status', 'assigned_to', 'priority', 'tenant']
     search_fields = ['title', 'description', 'notes']
-    ordering_fields = ['created_at', 'due_date', 'priority']
+    ordering_fields = ['created_at', 'due_date', 'priority', 'queue_due_at']
     ordering = ['-created_at']
+    work_queue = WORKFLOW_QUEUE
+    queue_serializer_class = LabWorkflowListSerializer
 
     def get_serializer_class(self):
         if self.action == 'list':
@@ -463,7 +546,7 @@ class LabWorkflowViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def pending_workflows(self, request):
         """Get pending workflows"""
-        pending_workflows = LabWorkflow.objects.filter(status='pending').order_by('priority', 'due_date')
+        pending_workflows = queued(WORKFLOW_QUEUE, include_leased=True)
         serializer = LabWorkflowListSerializer(pending_workflows, many=True)
         return Response(serializer.data)
 
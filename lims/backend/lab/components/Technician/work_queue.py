@@ -0,0 +1,106 @@
+"""
+Bench work queue for samples and lab workflows.
+
+Queued work (samples received in the lab, pending workflows) is served earliest
+``queue_due_at`` first. That time is set on save from the priority's target
+turnaround (``lab.models.QUEUE_TARGET_MINUTES``) and any explicit due or expiry
+date, so STAT work jumps ahead while waiting routine work ages towards the
+front. The next item is read from the ``(status, queue_due_at, id)`` index.
+
+A technician takes work with ``claim_next``, which leases the item for
+WORK_QUEUE_LEASE_SECONDS. Leased items are hidden from the queue until the
+lease is released, expires, or the item leaves the queued status. Candidates
+are locked with ``select_for_update(skip_locked=True)`` where the database
+supports it, and the lease is taken with a conditional update, so two
+technicians never receive the same item.
+"""
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from lab.models import LabWorkflow, Sample
+
+LEASE_SECONDS = getattr(settings, 'WORK_QUEUE_LEASE_SECONDS', 15 * 60)
+CLAIM_ATTEMPTS = 5
+
+
+@dataclass(frozen=True)
+class WorkQueue:
+    model: type
+    queued_status: str
+
+
+SAMPLE_QUEUE = WorkQueue(Sample, 'received')
+WORKFLOW_QUEUE = WorkQueue(LabWorkflow, 'pending')
+
+
+class LeaseError(Exception):
+    """Raised when a lease is not held by the caller"""
+
+
+def _unleased(now):
+    return Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now)
+
+
+def queued(queue, now=None, include_leased=False):
+    """The queued items of ``queue`` in service order"""
+    items = queue.model.objects.filter(status=queue.queued_status)
+    if not include_leased:
+        items = items.filter(_unleased(now or timezone.now()))
+    return items.order_by('queue_due_at', 'id')
+
+
+def claim_next(queue, claimed_by, filters=None):
+    """
+    Lease the next item of ``queue`` to ``claimed_by`` and return it, or None
+    when nothing is available. ``filters`` narrows the candidates, e.g.
+    ``{'tenant_id': ...}``.
+    """
+    skip_locked = connection.features.has_select_for_update_skip_locked
+    for _ in range(CLAIM_ATTEMPTS):
+        now = timezone.now()
+        # Without row locks (SQLite) the conditional update alone arbitrates
+        with transaction.atomic() if skip_locked else nullcontext():
+            candidates = queued(queue, now).filter(**(filters or {}))
+            if skip_locked:
+                candidates = candidates.select_for_update(skip_locked=True)
+            item = candidates.first()
+            if item is None:
+                return None
+            lease_expires_at = now + timedelta(seconds=LEASE_SECONDS)
+            # Only succeeds if nobody leased the item since it was read
+            taken = queue.model.objects.filter(
+                _unleased(now), pk=item.pk, status=queue.queued_status
+            ).update(claimed_by=claimed_by, lease_expires_at=lease_expires_at, updated_at=now)
+            if taken:
+                item.claimed_by = claimed_by
+                item.lease_expires_at = lease_expires_at
+                return item
+    return None
+
+
+def renew(queue, pk, claimed_by):
+    """Extend ``claimed_by``'s lease on item ``pk``; returns the new expiry"""
+    now = timezone.now()
+    lease_expires_at = now + timedelta(seconds=LEASE_SECONDS)
+    renewed = queue.model.objects.filter(
+        pk=pk, claimed_by=claimed_by, lease_expires_at__gt=now
+    ).update(lease_expires_at=lease_expires_at, updated_at=now)
+    if not renewed:
+        raise LeaseError('Lease is not held or has expired')
+    return lease_expires_at
+
+
+def release(queue, pk, claimed_by):
+    """Give item ``pk`` back to the queue"""
+    now = timezone.now()
+    released = queue.model.objects.filter(
+        pk=pk, claimed_by=claimed_by, lease_expires_at__gt=now
+    ).update(claimed_by=None, lease_expires_at=None, updated_at=now)
+    if not released:
+        raise LeaseError('Lease is not held or has expired')
@@ -4,3 +4,6 @@ class LoginConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lab.components.TenantAccessAuth.Login'
     label = 'tenantaccess_login'  # ✅ unique, no other app should use this
+
+    def ready(self):
+        import lab.components.TenantAccessAuth.Login.login_signals
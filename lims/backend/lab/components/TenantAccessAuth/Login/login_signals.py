@@ -0,0 +1,16 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from .models import User
+from ..authentication import mark_user_tokens_stale
+from ..backends import forget_unknown_identifiers
+
+@receiver(post_save, sender=User)
+def forget_unknown_login_identifiers(sender, instance, **kwargs):
+    """Let a newly created or renamed account log in straight away"""
+    forget_unknown_identifiers(instance.email, instance.username)
+
+@receiver(post_save, sender=User)
+def mark_login_tokens_stale(sender, instance, created, **kwargs):
+    """Tokens carry role/tenant claims; make existing ones re-read the user"""
+    if not created:
+        mark_user_tokens_stale(instance.pk)
@@ -1,8 +1,10 @@
 from django.urls import path
-from .login_views import LoginView
+from .login_views import LoginView, LogoutView
 from rest_framework_simplejwt.views import TokenRefreshView
+from ..authentication import RevocableTokenRefreshSerializer
 
 urlpatterns = [
     path("api/login/", LoginView.as_view(), name="login"),
-    path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("api/logout/", LogoutView.as_view(), name="logout"),
+    path("api/token/refresh/", TokenRefreshView.as_view(serializer_class=RevocableTokenRefreshSerializer), name="token_refresh"),
 ]
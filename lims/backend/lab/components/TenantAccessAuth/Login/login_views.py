@@ -4,7 +4,8 @@ from django.utils.decorators import method_decorator
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import TokenError
+from ..authentication import ClaimsRefreshToken, revoke_token
 from .login_serializers import UserSerializer
 
 User = get_user_model()
@@ -18,17 +19,14 @@ class LoginView(APIView):
         if not email or not password:
             return Response({"detail": "Email and password required"}, status=400)
 
-        # Try to authenticate with email first, then username
+        # The email field also accepts a username; EmailBackend resolves both in one query
         user = authenticate(request, email=email, password=password)
-        if not user:
-            # Fallback to username authentication for default Django User model
-            user = authenticate(request, username=email, password=password)
         
         if not user:
             return Response({"detail": "Invalid credentials"}, status=401)
 
-        # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        # Generate JWT tokens carrying role/tenant claims for stateless auth
+        refresh = ClaimsRefreshToken.for_user(user)
 
         # Serialize user data
         user_data = UserSerializer(user, context={'request': request}).data
@@ -47,3 +45,20 @@ class LoginView(APIView):
             "user": user_data,
             "tenant": tenant_data,
         })
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class LogoutView(APIView):
+    def post(self, request):
+        # Revoke the access token used for this request and, if sent, its refresh token
+        if request.auth is not None:
+            revoke_token(request.auth)
+
+        refresh = request.data.get("refresh")
+        if refresh:
+            try:
+                revoke_token(ClaimsRefreshToken(refresh))
+            except TokenError:
+                return Response({"detail": "Invalid refresh token"}, status=400)
+
+        return Response({"detail": "Logged out"})
@@ -0,0 +1,185 @@
+"""
+Stateless JWT authentication for the LIMS API.
+
+Tokens issued by LoginView carry the user's id, role, tenant and a few identity
+fields as claims. ClaimsJWTAuthentication turns those claims into a ``User``
+instance without touching the database; every other field is deferred and is
+loaded lazily the first time a view reads it.
+
+Revocation is checked against the cache: individual tokens are revoked by
+``jti`` (logout), and saving a user marks every token issued to them before
+that moment as stale, so those tokens fall back to a database load until they
+expire.
+
+That only works when every worker sees the same cache (REDIS_URL or
+CACHE_DIR). With the per-process local memory cache the authenticator fails
+closed: revoked tokens are recorded in the RevokedToken table instead of the
+cache, and every request loads the user from the database with the revocation
+check folded into the same query, so it costs one query as plain simplejwt does.
+"""
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Exists
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from lab.cache_utils import cache_is_shared
+
+User = get_user_model()
+
+# User fields embedded in tokens, in addition to the user id
+CLAIM_FIELDS = ('role', 'tenant', 'email', 'username', 'is_staff', 'is_superuser', 'is_active')
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """Refresh token whose access tokens carry the user's role and tenant"""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field, None)
+        return token
+
+
+def _revoked_key(jti):
+    return f"auth:revoked:{jti}"
+
+
+def _stale_key(user_id):
+    return f"auth:stale-before:{user_id}"
+
+
+def revoke_token(token):
+    """Reject ``token`` (by jti) until it would have expired anyway"""
+    jti = token.get(api_settings.JTI_CLAIM)
+    if not jti:
+        return
+    if cache_is_shared():
+        cache.set(_revoked_key(jti), True, max(int(token['exp'] - time.time()), 1))
+        return
+    from .Login.models import RevokedToken
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    RevokedToken.objects.get_or_create(
+        jti=jti, defaults={'expires_at': datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)}
+    )
+
+
+def is_revoked(token):
+    jti = token.get(api_settings.JTI_CLAIM)
+    if not jti:
+        return False
+    if cache_is_shared():
+        return bool(cache.get(_revoked_key(jti)))
+    from .Login.models import RevokedToken
+    return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def _issued_before_change(token, user_id):
+    """True when the user may have changed since ``token`` was issued"""
+    if not cache_is_shared():
+        # Other workers' change markers are invisible here, so assume a change
+        return True
+    stale_before = cache.get(_stale_key(user_id))
+    return bool(stale_before) and token.get('iat', 0) <= stale_before
+
+
+def mark_user_tokens_stale(user_id):
+    """Make tokens issued to a user so far reload the user from the database"""
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    cache.set(_stale_key(user_id), time.time(), int(lifetime.total_seconds()))
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that builds the request user from token claims"""
+
+    def _load_user(self, validated_token):
+        """Load the user and whether ``validated_token`` is revoked in one query"""
+        from .Login.models import RevokedToken
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        users = self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if jti:
+            users = users.annotate(token_revoked=Exists(RevokedToken.objects.filter(jti=jti)))
+        user = users.first()
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if getattr(user, 'token_revoked', False):
+            raise InvalidToken(_("Token has been revoked"))
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    def get_user(self, validated_token):
+        if not cache_is_shared():
+            # Change markers of other workers are invisible here
+            return self._load_user(validated_token)
+        if is_revoked(validated_token):
+            raise InvalidToken(_("Token has been revoked"))
+
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or any(field not in validated_token for field in CLAIM_FIELDS):
+            # Token issued before claims were embedded
+            return super().get_user(validated_token)
+
+        if _issued_before_change(validated_token, user_id):
+            # The user changed after this token was issued; super() also checks is_active
+            return super().get_user(validated_token)
+        if not validated_token['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        claims = {field: validated_token[field] for field in CLAIM_FIELDS}
+        claims[api_settings.USER_ID_FIELD] = user_id
+        names = [f.attname for f in User._meta.concrete_fields if f.attname in claims]
+        return User.from_db(DEFAULT_DB_ALIAS, names, [claims[name] for name in names])
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refresh serializer that honours revocation and re-reads stale claims.
+
+    Access tokens inherit their claims from the refresh token, so a refresh
+    token issued before the user changed gets its claims reloaded first.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_revoked(refresh):
+            raise InvalidToken(_("Token has been revoked"))
+
+        user_id = refresh.get(api_settings.USER_ID_CLAIM)
+        if _issued_before_change(refresh, user_id):
+            user = User.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id, 'is_active': True}
+            ).first()
+            if user is None:
+                raise InvalidToken(_("User is inactive"))
+            for field in CLAIM_FIELDS:
+                refresh[field] = getattr(user, field, None)
+
+        access = refresh.access_token
+        # Claims were just validated, so date the access token from now
+        access.set_iat()
+        data = {'access': str(access)}
+
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            revoke_token(refresh)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+
+        return data
@@ -1,28 +1,65 @@
-from django.contrib.auth.backends import BaseBackend
+import hashlib
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db.models import Q
+
+from lab.cache_utils import cache_is_shared
 
 User = get_user_model()
 
-class EmailBackend(BaseBackend):
+# Seconds an identifier that matched no account is remembered
+UNKNOWN_IDENTIFIER_TTL = getattr(settings, 'AUTH_UNKNOWN_IDENTIFIER_TTL', 300)
+
+
+def _unknown_key(identifier):
+    digest = hashlib.sha256(identifier.encode('utf-8')).hexdigest()
+    return f"auth:unknown:{digest}"
+
+
+def forget_unknown_identifiers(*identifiers):
+    """Clear the negative cache for identifiers that now belong to an account"""
+    cache.delete_many([_unknown_key(identifier) for identifier in identifiers if identifier])
+
+
+class EmailBackend(ModelBackend):
     """
-    Custom authentication backend that allows users to log in using their email address.
+    Authenticate with an email address or a username and a password.
+
+    The identifier is resolved with a single indexed query matching either the
+    email or the username column. When the cache is shared, identifiers that
+    match no account are kept in a short-lived negative cache so repeated
+    attempts skip the database; a per-process cache would keep rejecting a new
+    account on workers that never saw it being created. Stored
+    hashes that use outdated hasher parameters are upgraded on a successful
+    login by ``check_password``.
     """
-    
-    def authenticate(self, request, email=None, password=None, **kwargs):
-        if email is None or password is None:
+
+    def authenticate(self, request, email=None, username=None, password=None, **kwargs):
+        identifier = email or username or kwargs.get(User.USERNAME_FIELD)
+        if not identifier or password is None:
             return None
-        
-        try:
-            user = User.objects.get(email=email)
-            if user.check_password(password):
-                return user
-        except User.DoesNotExist:
+
+        user = None
+        negative_cache = cache_is_shared()
+        if not (negative_cache and cache.get(_unknown_key(identifier))):
+            candidates = list(
+                User._default_manager.filter(Q(email=identifier) | Q(username=identifier))[:2]
+            )
+            # An exact email match wins over another account's username
+            user = next((c for c in candidates if c.email == identifier), None)
+            if user is None and candidates:
+                user = candidates[0]
+            if user is None and negative_cache:
+                cache.set(_unknown_key(identifier), True, UNKNOWN_IDENTIFIER_TTL)
+
+        if user is None:
+            # Run the default password hasher once to keep response times uniform
+            User().set_password(password)
             return None
-        
+
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
         return None
-    
-    def get_user(self, user_id):
-        try:
-            return User.objects.get(pk=user_id)
-        except User.DoesNotExist:
-            return None
@@ -5,3 +5,6 @@ class SuperadminConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'lab.components.superadmin'
     verbose_name = 'SuperAdmin Management'
+
+    def ready(self):
+        import lab.components.superadmin.signals
@@ -0,0 +1,381 @@
+"""
+Online SQLite backups for DatabaseBackup.
+
+A backup first copies the live database with SQLite's online backup API,
+BACKUP_PAGES_PER_STEP pages at a time with BACKUP_STEP_SLEEP seconds between
+steps, so writers are only locked out for the duration of one step. The copy
+is then archived under BACKUP_DIR, gzip-compressed and SHA-256 checksummed:
+
+* ``full`` archives the whole database file.
+* ``differential`` archives the pages that changed since the latest full backup.
+* ``incremental`` archives the pages that changed since the latest backup of any
+  type, forming a chain back to a full backup.
+
+Changed pages are found by comparing per-page digests with the base backup's
+page manifest (``<archive>.pages``), which every backup writes alongside its
+archive. ``restore_backup`` replays a chain into a new database file.
+
+Backups run in a bounded in-process worker pool (BACKUP_WORKERS threads).
+Progress is published to the cache rather than the database, since writes to
+the source database from another connection restart SQLite's backup. For the
+same reason there is no heartbeat: a backup still in progress
+BACKUP_STALE_MINUTES after it started is assumed to have died with its worker
+and is marked failed by ``fail_stale`` so it can be retried.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+import gzip
+import hashlib
+import logging
+import sqlite3
+import struct
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import DatabaseBackup
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = Path(getattr(settings, 'BACKUP_DIR', Path(settings.BASE_DIR) / 'backups'))
+BACKUP_WORKERS = getattr(settings, 'BACKUP_WORKERS', 1)
+BACKUP_PAGES_PER_STEP = getattr(settings, 'BACKUP_PAGES_PER_STEP', 1024)
+BACKUP_STEP_SLEEP = getattr(settings, 'BACKUP_STEP_SLEEP', 0.01)
+BACKUP_COMPRESSION_LEVEL = getattr(settings, 'BACKUP_COMPRESSION_LEVEL', 6)
+BACKUP_STALE_AFTER = timedelta(minutes=getattr(settings, 'BACKUP_STALE_MINUTES', 6 * 60))
+
+DELTA_MAGIC = b'LIMSDELTA1'
+DELTA_HEADER = struct.Struct('>IIQ')  # page size, page count, base backup id
+PAGE_NUMBER = struct.Struct('>I')
+DIGEST_SIZE = 16
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+class BackupError(Exception):
+    pass
+
+
+# ------------------------
+# Progress
+# ------------------------
+def _progress_key(backup_id):
+    return f"superadmin:backup:progress:{backup_id}"
+
+
+def _report(backup_id, phase, percent, **extra):
+    cache.set(_progress_key(backup_id), {'phase': phase, 'percent': percent, **extra}, 24 * 60 * 60)
+
+
+def get_progress(backup):
+    """Return the latest progress report for ``backup``"""
+    if backup.status == 'completed':
+        return {'phase': 'completed', 'percent': 100}
+    progress = cache.get(_progress_key(backup.pk))
+    if progress is None:
+        return {'phase': backup.status, 'percent': 0}
+    return progress
+
+
+# ------------------------
+# Worker pool
+# ------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def submit(backup_id):
+    """Queue a backup on the worker pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(BACKUP_WORKERS, 1), thread_name_prefix='database-backup'
+            )
+    _report(backup_id, 'queued', 0)
+    return _executor.submit(_run_in_worker, backup_id)
+
+
+def fail_stale():
+    """Mark backups abandoned mid-run by a dead worker as failed; returns how many"""
+    cutoff = timezone.now() - BACKUP_STALE_AFTER
+    stale = list(DatabaseBackup.objects.filter(
+        Q(started_at__lt=cutoff) | Q(started_at__isnull=True), status='in_progress'
+    ).values_list('pk', flat=True))
+    if not stale:
+        return 0
+    error = 'Backup stopped before completing'
+    failed = DatabaseBackup.objects.filter(pk__in=stale, status='in_progress').update(
+        status='failed', error_message=error
+    )
+    for backup_id in stale:
+        _report(backup_id, 'failed', 0, error=error)
+    return failed
+
+
+def _run_in_worker(backup_id):
+    try:
+        run_backup(backup_id)
+    except Exception as e:
+        logger.error(f"❌ Error running database backup {backup_id}: {e}")
+    finally:
+        close_old_connections()
+
+
+# ------------------------
+# Files
+# ------------------------
+class _HashingWriter:
+    """File wrapper computing the SHA-256 and size of what is written"""
+
+    def __init__(self, file):
+        self.file = file
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.file.write(data)
+
+    def flush(self):
+        self.file.flush()
+
+
+def resolve_archive(backup):
+    """
+    The backup's archive as an absolute path inside BACKUP_DIR. Raises
+    BackupError for a missing path or one that points anywhere else, so a
+    tampered ``file_path`` can never be read or deleted.
+    """
+    if not backup.file_path:
+        raise BackupError(f"Backup {backup.pk} has no archive")
+    path = Path(backup.file_path).resolve()
+    if not path.is_relative_to(BACKUP_DIR.resolve()):
+        raise BackupError(f"Backup {backup.pk} archive is outside BACKUP_DIR")
+    return path
+
+
+def _manifest_path(archive_path):
+    return Path(f"{archive_path}.pages")
+
+
+def _write_manifest(archive_path, page_size, digests):
+    with gzip.open(_manifest_path(archive_path), 'wb') as manifest:
+        manifest.write(struct.pack('>I', page_size))
+        manifest.write(b''.join(digests))
+
+
+def _read_manifest(archive_path):
+    with gzip.open(_manifest_path(archive_path), 'rb') as manifest:
+        page_size = struct.unpack('>I', manifest.read(4))[0]
+        data = manifest.read()
+    return page_size, [data[i:i + DIGEST_SIZE] for i in range(0, len(data), DIGEST_SIZE)]
+
+
+def _page_digests(path, page_size):
+    digests = []
+    with open(path, 'rb') as db:
+        for page in iter(lambda: db.read(page_size), b''):
+            digests.append(hashlib.blake2b(page, digest_size=DIGEST_SIZE).digest())
+    return digests
+
+
+def file_checksum(path):
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
+def delete_backup_files(backup):
+    try:
+        path = resolve_archive(backup)
+    except BackupError as e:
+        logger.warning(f"Not deleting files of backup {backup.pk}: {e}")
+        return
+    for path in (path, _manifest_path(path)):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ------------------------
+# Backup
+# ------------------------
+def _database_path():
+    database = connections['default'].settings_dict
+    if database['ENGINE'] != 'django.db.backends.sqlite3':
+        raise BackupError('The backup engine supports SQLite databases only')
+    return str(database['NAME'])
+
+
+def _snapshot(backup_id, target):
+    """Copy the live database to ``target`` with the online backup API"""
+    source = sqlite3.connect(_database_path())
+    destination = sqlite3.connect(str(target))
+
+    def progress(status, remaining, total):
+        done = total - remaining
+        percent = int(done * 80 / total) if total else 0
+        _report(backup_id, 'copying', percent, pages_done=done, pages_total=total)
+
+    try:
+        source.backup(
+            destination, pages=BACKUP_PAGES_PER_STEP, progress=progress, sleep=BACKUP_STEP_SLEEP
+        )
+        page_size = destination.execute('PRAGMA page_size').fetchone()[0]
+    finally:
+        destination.close()
+        source.close()
+    return page_size
+
+
+def _find_base(backup):
+    """Return the backup a differential or incremental backup is taken against"""
+    candidates = DatabaseBackup.objects.filter(
+        status='completed', file_path__isnull=False
+    ).exclude(pk=backup.pk).order_by('-completed_at')
+    if backup.backup_type == 'differential':
+        candidates = candidates.filter(backup_type='full')
+    for candidate in candidates:
+        try:
+            if _manifest_path(resolve_archive(candidate)).exists():
+                return candidate
+        except BackupError:
+            continue
+    return None
+
+
+def _write_full(snapshot, archive_path):
+    with open(archive_path, 'wb') as raw:
+        writer = _HashingWriter(raw)
+        with gzip.GzipFile(fileobj=writer, mode='wb', compresslevel=BACKUP_COMPRESSION_LEVEL) as archive:
+            with open(snapshot, 'rb') as db:
+                for block in iter(lambda: db.read(READ_BLOCK_SIZE), b''):
+                    archive.write(block)
+    return writer
+
+
+def _write_delta(snapshot, archive_path, page_size, digests, base):
+    base_page_size, base_digests = _read_manifest(resolve_archive(base))
+    if base_page_size != page_size:
+        raise BackupError('Page size changed since the base backup; take a full backup')
+
+    changed = 0
+    with open(archive_path, 'wb') as raw:
+        writer = _HashingWriter(raw)
+        with gzip.GzipFile(fileobj=writer, mode='wb', compresslevel=BACKUP_COMPRESSION_LEVEL) as archive:
+            archive.write(DELTA_MAGIC)
+            archive.write(DELTA_HEADER.pack(page_size, len(digests), base.pk))
+            with open(snapshot, 'rb') as db:
+                for page_number, digest in enumerate(digests):
+                    if page_number < len(base_digests) and base_digests[page_number] == digest:
+                        continue
+                    db.seek(page_number * page_size)
+                    archive.write(PAGE_NUMBER.pack(page_number))
+                    archive.write(db.read(page_size))
+                    changed += 1
+    return writer, changed
+
+
+def run_backup(backup_id):
+    """Take the backup described by DatabaseBackup ``backup_id``"""
+    # Time spent queued behind other backups does not count towards going stale
+    DatabaseBackup.objects.filter(pk=backup_id).update(started_at=timezone.now())
+    backup = DatabaseBackup.objects.get(pk=backup_id)
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = timezone.now().strftime('%Y%m%d%H%M%S')
+    snapshot = BACKUP_DIR / f".backup_{backup.pk}_{stamp}.sqlite3"
+    archive_path = None
+
+    try:
+        page_size = _snapshot(backup.pk, snapshot)
+        _report(backup.pk, 'compressing', 80)
+        digests = _page_digests(snapshot, page_size)
+
+        base = None
+        notes = backup.notes
+        if backup.backup_type != 'full':
+            base = _find_base(backup)
+            if base is None:
+                backup.backup_type = 'full'
+                notes = '\n'.join(filter(None, [notes, 'No base backup found; a full backup was taken']))
+
+        if base is None:
+            archive_path = BACKUP_DIR / f"backup_{backup.pk}_full_{stamp}.sqlite3.gz"
+            writer = _write_full(snapshot, archive_path)
+        else:
+            archive_path = BACKUP_DIR / f"backup_{backup.pk}_{backup.backup_type}_{stamp}.delta.gz"
+            writer, changed = _write_delta(snapshot, archive_path, page_size, digests, base)
+            logger.info(f"✅ Backup {backup.pk}: {changed} of {len(digests)} pages changed since backup {base.pk}")
+        _write_manifest(archive_path, page_size, digests)
+
+        backup.base_backup = base
+        backup.notes = notes
+        backup.status = 'completed'
+        backup.completed_at = timezone.now()
+        backup.file_path = str(archive_path)
+        backup.file_size = writer.size
+        backup.checksum = writer.sha256.hexdigest()
+        backup.error_message = None
+        backup.save()
+        _report(backup.pk, 'completed', 100)
+    except Exception as e:
+        if archive_path is not None:
+            for path in (archive_path, _manifest_path(archive_path)):
+                path.unlink(missing_ok=True)
+        DatabaseBackup.objects.filter(pk=backup.pk).update(status='failed', error_message=str(e))
+        _report(backup.pk, 'failed', 0, error=str(e))
+        raise
+    finally:
+        snapshot.unlink(missing_ok=True)
+
+
+# ------------------------
+# Restore
+# ------------------------
+def backup_chain(backup):
+    """Return the backups to replay, from the full backup to ``backup``"""
+    chain = [backup]
+    while chain[-1].backup_type != 'full':
+        base = chain[-1].base_backup
+        if base is None or base.status != 'completed':
+            raise BackupError(f"Backup {chain[-1].pk} has no usable base backup")
+        chain.append(base)
+    return list(reversed(chain))
+
+
+def restore_backup(backup, target):
+    """Rebuild the database captured by ``backup`` at the path ``target``"""
+    target = Path(target)
+    chain = backup_chain(backup)
+    paths = {item.pk: resolve_archive(item) for item in chain}
+    for item in chain:
+        if item.checksum and file_checksum(paths[item.pk]) != item.checksum:
+            raise BackupError(f"Checksum mismatch for backup {item.pk}")
+
+    with gzip.open(paths[chain[0].pk], 'rb') as archive, open(target, 'wb') as db:
+        for block in iter(lambda: archive.read(READ_BLOCK_SIZE), b''):
+            db.write(block)
+
+    for item in chain[1:]:
+        with gzip.open(paths[item.pk], 'rb') as archive, open(target, 'r+b') as db:
+            if archive.read(len(DELTA_MAGIC)) != DELTA_MAGIC:
+                raise BackupError(f"Backup {item.pk} is not a page delta")
+            page_size, page_count, _ = DELTA_HEADER.unpack(archive.read(DELTA_HEADER.size))
+            while True:
+                number = archive.read(PAGE_NUMBER.size)
+                if not number:
+                    break
+                page_number = PAGE_NUMBER.unpack(number)[0]
+                db.seek(page_number * page_size)
+                db.write(archive.read(page_size))
+            db.truncate(page_count * page_size)
+    return target
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from lab.components.superadmin.models import DatabaseBackup
+from lab.components.superadmin.backup_engine import BackupError, backup_chain, restore_backup
+from pathlib import Path
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the database captured by a backup (and its base chain) into a new file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('backup_id', type=int, help='DatabaseBackup to restore')
+        parser.add_argument('target', help='Path of the SQLite file to create')
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Overwrite the target file if it exists',
+        )
+
+    def handle(self, *args, **options):
+        target = Path(options['target'])
+        if target.exists() and not options['force']:
+            raise CommandError(f'{target} already exists; pass --force to overwrite it')
+
+        try:
+            backup = DatabaseBackup.objects.get(pk=options['backup_id'], status='completed')
+        except DatabaseBackup.DoesNotExist:
+            raise CommandError(f"No completed backup with id {options['backup_id']}")
+
+        try:
+            chain = backup_chain(backup)
+            restore_backup(backup, target)
+        except BackupError as e:
+            raise CommandError(str(e))
+
+        steps = ' -> '.join(f'{item.pk} ({item.backup_type})' for item in chain)
+        self.stdout.write(self.style.SUCCESS(f'Restored {steps} into {target}'))
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('superadmin', '0002_databasebackup_globalnotification_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='databasebackup',
+            name='base_backup',
+            field=models.ForeignKey(blank=True, help_text='Backup this differential or incremental backup is taken against', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='dependent_backups', to='superadmin.databasebackup'),
+        ),
+        migrations.AddField(
+            model_name='databasebackup',
+            name='checksum',
+            field=models.CharField(blank=True, help_text='SHA-256 of the backup archive', max_length=64, null=True),
+        ),
+    ]
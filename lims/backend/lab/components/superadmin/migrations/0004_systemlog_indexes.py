@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('superadmin', '0003_databasebackup_checksum_base_backup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['created_at'], name='superadmin_log_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['level', 'created_at'], name='superadmin_log_level_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('superadmin', '0004_systemlog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='databasebackup',
+            name='started_at',
+            field=models.DateTimeField(blank=True, help_text='When the current attempt started', null=True),
+        ),
+    ]
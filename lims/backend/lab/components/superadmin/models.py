@@ -177,6 +177,10 @@ class SystemLog(models.Model):
     class Meta:
         db_table = 'superadmin_system_logs'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='superadmin_log_created_idx'),
+            models.Index(fields=['level', 'created_at'], name='superadmin_log_level_idx'),
+        ]
 
 
 class SystemHealth(models.Model):
@@ -284,8 +288,14 @@ class DatabaseBackup(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     file_path = models.CharField(max_length=500, null=True, blank=True)
     file_size = models.BigIntegerField(null=True, blank=True, help_text="File size in bytes")
+    checksum = models.CharField(max_length=64, null=True, blank=True, help_text="SHA-256 of the backup archive")
+    base_backup = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='dependent_backups',
+        help_text="Backup this differential or incremental backup is taken against"
+    )
     created_by = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, help_text="When the current attempt started")
     completed_at = models.DateTimeField(null=True, blank=True)
     scheduled_at = models.DateTimeField(null=True, blank=True)
     is_scheduled = models.BooleanField(default=False)
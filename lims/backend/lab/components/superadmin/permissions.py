@@ -0,0 +1,13 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsSuperAdmin(BasePermission):
+    """Allows access only to authenticated super admins"""
+    message = 'Super admin access required'
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(
+            user and user.is_authenticated
+            and (getattr(user, 'role', None) == 'superadmin' or user.is_superuser)
+        )
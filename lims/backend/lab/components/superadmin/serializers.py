@@ -173,6 +173,12 @@ class UsageAnalysisSerializer(serializers.Serializer):
     avg_response_time = serializers.FloatField()
 
 
+class RevenuePeriodSerializer(serializers.Serializer):
+    period = serializers.DateTimeField()
+    revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
+    transactions = serializers.IntegerField()
+
+
 class BillingAnalyticsSerializer(serializers.Serializer):
     total_revenue = serializers.DecimalField(max_digits=12, decimal_places=2)
     monthly_recurring = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -180,6 +186,7 @@ class BillingAnalyticsSerializer(serializers.Serializer):
     churn_rate = serializers.FloatField()
     average_revenue_per_user = serializers.DecimalField(max_digits=10, decimal_places=2)
     total_customers = serializers.IntegerField()
+    revenue_series = RevenuePeriodSerializer(many=True, required=False)
 
 
 # New Serializers for Additional Models
@@ -235,11 +242,14 @@ class DatabaseBackupSerializer(serializers.ModelSerializer):
         model = DatabaseBackup
         fields = [
             'id', 'name', 'backup_type', 'status', 'file_path', 'file_size',
-            'file_size_mb', 'created_by', 'created_by_name', 'created_at',
-            'completed_at', 'scheduled_at', 'is_scheduled', 'schedule_frequency',
+            'file_size_mb', 'checksum', 'base_backup', 'created_by', 'created_by_name', 'created_at',
+            'started_at', 'completed_at', 'scheduled_at', 'is_scheduled', 'schedule_frequency',
             'notes', 'error_message'
         ]
-        read_only_fields = ['id', 'created_at', 'completed_at']
+        read_only_fields = [
+            'id', 'created_at', 'started_at', 'completed_at', 'checksum', 'base_backup',
+            'file_path', 'status', 'file_size', 'error_message'
+        ]
 
     def get_file_size_mb(self, obj):
         if obj.file_size:
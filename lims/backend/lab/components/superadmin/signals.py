@@ -0,0 +1,13 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Tenant, BillingPlan, TenantPlan, BillingTransaction, UsageMetrics
+from . import snapshots
+
+@receiver([post_save, post_delete], sender=Tenant)
+@receiver([post_save, post_delete], sender=BillingPlan)
+@receiver([post_save, post_delete], sender=TenantPlan)
+@receiver([post_save, post_delete], sender=BillingTransaction)
+@receiver([post_save, post_delete], sender=UsageMetrics)
+def invalidate_snapshots(sender, **kwargs):
+    """Dashboard snapshots are derived from these tables"""
+    snapshots.invalidate()
@@ -0,0 +1,42 @@
+"""
+Short-lived cached snapshots of superadmin aggregates.
+
+Dashboard figures are computed by one aggregate query and kept in the cache for
+SUPERADMIN_SNAPSHOT_TTL seconds. Writes to the tenant and billing tables bump a
+generation number (see signals.py), which retires every snapshot at once, so
+the landing pages cost a cache read per load regardless of the tenant count.
+"""
+from django.conf import settings
+from django.core.cache import cache
+import hashlib
+import json
+
+SNAPSHOT_TTL = getattr(settings, 'SUPERADMIN_SNAPSHOT_TTL', 60)
+GENERATION_KEY = 'superadmin:snapshot:generation'
+
+
+def _generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        generation = 1
+        cache.add(GENERATION_KEY, generation, None)
+    return generation
+
+
+def invalidate():
+    """Retire every cached snapshot"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, None)
+
+
+def get_snapshot(name, params, compute, refresh=False):
+    """Return the cached result of ``compute()`` for ``name`` and ``params``"""
+    digest = hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+    key = f"superadmin:snapshot:{_generation()}:{name}:{digest}"
+    data = None if refresh else cache.get(key)
+    if data is None:
+        data = compute()
+        cache.set(key, data, SNAPSHOT_TTL)
+    return data
@@ -2,10 +2,13 @@ from rest_framework import generics, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.db.models import Count, Sum, Avg, Q
+from rest_framework.pagination import PageNumberPagination
+from django.db.models import Count, Sum, Avg, Q, F, Case, When, FloatField, OuterRef, Subquery
+from django.db.models.functions import Cast, TruncDay, TruncWeek, TruncMonth
+from django.http import FileResponse
 from django.utils import timezone
 from datetime import datetime, timedelta
-import random
+from decimal import Decimal, ROUND_HALF_UP
 
 from .models import (
     Tenant, BillingPlan, TenantPlan, BillingTransaction, UsageMetrics, 
@@ -20,6 +23,31 @@ from .serializers import (
     DatabaseBackupSerializer, GlobalNotificationSerializer, NotificationTemplateSerializer,
     NotificationHistorySerializer
 )
+from . import backup_engine, snapshots
+from .permissions import IsSuperAdmin
+from lab.components.Analytics.log_retention import archive_query, read_archive
+
+# ?series= bucket for billing analytics: (truncation, default window in days)
+REVENUE_SERIES_TRUNC = {
+    'day': (TruncDay, 30),
+    'week': (TruncWeek, 84),
+    'month': (TruncMonth, 365),
+}
+
+# ?ordering= keys for tenant usage and the annotations they sort on
+TENANT_USAGE_ORDERING = {
+    'tenant_name': 'company_name',
+    'users': 'latest_users',
+    'tests': 'latest_tests',
+    'reports': 'latest_reports',
+    'growth': 'growth',
+}
+
+
+class TenantUsagePagination(PageNumberPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
 
 
 class TenantViewSet(viewsets.ModelViewSet):
@@ -130,32 +158,31 @@ class TenantViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def dashboard_stats(self, request):
-        queryset = self.get_queryset()
-        
-        total_tenants = queryset.count()
-        active_tenants = queryset.filter(status='active').count()
-        total_users = queryset.aggregate(total=Sum('current_users'))['total'] or 0
-        
-        # Calculate total revenue
-        total_revenue = 0
-        for tenant in queryset.filter(status='active'):
-            try:
-                plan = tenant.plan.billing_plan
-                total_revenue += float(plan.price)
-            except:
-                pass
-        
-        # System health (mock data)
-        system_health = 99.9
-        
-        data = {
-            'total_tenants': total_tenants,
-            'active_tenants': active_tenants,
-            'total_users': total_users,
-            'total_revenue': total_revenue,
-            'system_health': system_health
+        queryset = self.get_queryset().order_by()
+        params = {
+            'status': request.query_params.get('status'),
+            'search': request.query_params.get('search'),
         }
-        
+        refresh = request.query_params.get('refresh') == 'true'
+
+        def compute():
+            # One aggregate query; revenue sums the plan price of active tenants
+            totals = queryset.aggregate(
+                total_tenants=Count('id'),
+                active_tenants=Count('id', filter=Q(status='active')),
+                total_users=Sum('current_users'),
+                total_revenue=Sum('plan__billing_plan__price', filter=Q(status='active')),
+            )
+            return {
+                'total_tenants': totals['total_tenants'],
+                'active_tenants': totals['active_tenants'],
+                'total_users': totals['total_users'] or 0,
+                'total_revenue': totals['total_revenue'] or Decimal('0'),
+                # System health (mock data)
+                'system_health': 99.9
+            }
+
+        data = snapshots.get_snapshot('tenant-dashboard', params, compute, refresh=refresh)
         serializer = TenantDashboardSerializer(data)
         return Response(serializer.data)
 
@@ -167,37 +194,101 @@ class BillingPlanViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'])
     def analytics(self, request):
-        # Calculate billing analytics
-        total_revenue = 0
-        monthly_recurring = 0
+        """
+        Billing analytics from one grouped query over active tenant plans.
+
+        Pass ?series=day|week|month to include paid BillingTransaction revenue
+        bucketed by period, optionally bounded by ?since= and ?until= (ISO dates).
+        """
+        series = request.query_params.get('series')
+        if series and series not in REVENUE_SERIES_TRUNC:
+            return Response(
+                {'error': f"series must be one of: {', '.join(REVENUE_SERIES_TRUNC)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        since = request.query_params.get('since')
+        until = request.query_params.get('until')
+        try:
+            since = datetime.fromisoformat(since) if since else None
+            until = datetime.fromisoformat(until) if until else None
+        except ValueError:
+            return Response(
+                {'error': 'since and until must be ISO 8601 dates'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        def compute():
+            data = self._recurring_revenue()
+            if series:
+                data['revenue_series'] = self._revenue_series(series, since, until)
+            return data
+
+        params = {'series': series, 'since': since, 'until': until}
+        refresh = request.query_params.get('refresh') == 'true'
+        data = snapshots.get_snapshot('billing-analytics', params, compute, refresh=refresh)
+        serializer = BillingAnalyticsSerializer(data)
+        return Response(serializer.data)
+
+    def _recurring_revenue(self):
+        # Active subscriptions grouped by billing cycle, summed in the database
+        by_cycle = TenantPlan.objects.filter(
+            is_active=True, billing_plan__in=self.get_queryset()
+        ).values('billing_plan__billing_cycle').annotate(
+            customers=Count('id'),
+            revenue=Sum('billing_plan__price'),
+        ).order_by()
+
+        total_revenue = Decimal('0')
+        monthly_recurring = Decimal('0')
         total_customers = 0
-        
-        for plan in self.get_queryset():
-            active_tenants = plan.tenantplan_set.filter(is_active=True).count()
-            total_customers += active_tenants
-            plan_revenue = float(plan.price) * active_tenants
-            total_revenue += plan_revenue
-            
-            if plan.billing_cycle == 'monthly':
-                monthly_recurring += plan_revenue
+        for row in by_cycle:
+            revenue = row['revenue'] or Decimal('0')
+            total_customers += row['customers']
+            total_revenue += revenue
+            if row['billing_plan__billing_cycle'] == 'monthly':
+                monthly_recurring += revenue
             else:  # yearly
-                monthly_recurring += plan_revenue / 12
-        
-        annual_recurring = monthly_recurring * 12
-        churn_rate = 2.1  # Mock data
-        arpu = total_revenue / total_customers if total_customers > 0 else 0
-        
-        data = {
+                monthly_recurring += revenue / 12
+
+        cents = Decimal('0.01')
+        monthly_recurring = monthly_recurring.quantize(cents, rounding=ROUND_HALF_UP)
+        arpu = total_revenue / total_customers if total_customers > 0 else Decimal('0')
+        return {
             'total_revenue': total_revenue,
             'monthly_recurring': monthly_recurring,
-            'annual_recurring': annual_recurring,
-            'churn_rate': churn_rate,
-            'average_revenue_per_user': arpu,
+            'annual_recurring': monthly_recurring * 12,
+            'churn_rate': 2.1,  # Mock data
+            'average_revenue_per_user': arpu.quantize(cents, rounding=ROUND_HALF_UP),
             'total_customers': total_customers
         }
-        
-        serializer = BillingAnalyticsSerializer(data)
-        return Response(serializer.data)
+
+    def _revenue_series(self, series, since=None, until=None):
+        trunc, default_days = REVENUE_SERIES_TRUNC[series]
+        if until is None:
+            until = timezone.now()
+        if since is None:
+            since = until - timedelta(days=default_days)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        if timezone.is_naive(until):
+            until = timezone.make_aware(until)
+
+        rows = BillingTransaction.objects.filter(
+            status='paid',
+            paid_at__gte=since,
+            paid_at__lte=until,
+        ).annotate(period=trunc('paid_at')).values('period').annotate(
+            revenue=Sum('amount'),
+            transactions=Count('id'),
+        ).order_by('period')
+        return [
+            {
+                'period': row['period'],
+                'revenue': row['revenue'] or Decimal('0'),
+                'transactions': row['transactions'],
+            }
+            for row in rows
+        ]
 
 
 class BillingTransactionViewSet(viewsets.ReadOnlyModelViewSet):
@@ -264,25 +355,65 @@ class UsageMetricsViewSet(viewsets.ReadOnlyModelViewSet):
 
     @action(detail=False, methods=['get'])
     def tenant_usage(self, request):
-        # Get usage by tenant
-        tenants = Tenant.objects.filter(status='active')
-        usage_data = []
-        
-        for tenant in tenants:
-            # Get recent usage metrics
-            recent_metrics = UsageMetrics.objects.filter(
-                tenant=tenant
-            ).order_by('-date').first()
-            
-            if recent_metrics:
-                usage_data.append({
-                    'tenant_name': tenant.company_name,
-                    'users': recent_metrics.active_users,
-                    'tests': recent_metrics.total_tests,
-                    'reports': recent_metrics.total_reports,
-                    'growth': round(random.uniform(-5, 20), 1)  # Mock growth
-                })
-        
+        """
+        Latest usage per active tenant with growth against the previous period.
+
+        Latest and previous metrics come from correlated subqueries, so the
+        whole page is one query. Growth is the percentage change in tests.
+        Sort with ?ordering= (tenant_name, users, tests, reports, growth, prefix
+        '-' for descending). Pass ?page= or ?page_size= for a paginated response;
+        without them the full list is returned as before.
+        """
+        ordering = request.query_params.get('ordering', 'tenant_name')
+        if ordering.lstrip('-') not in TENANT_USAGE_ORDERING:
+            return Response(
+                {'error': f"ordering must be one of: {', '.join(TENANT_USAGE_ORDERING)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        field = TENANT_USAGE_ORDERING[ordering.lstrip('-')]
+        descending = ordering.startswith('-')
+        order = F(field).desc(nulls_last=True) if descending else F(field).asc(nulls_last=True)
+
+        by_tenant = UsageMetrics.objects.filter(tenant=OuterRef('pk')).order_by('-date')
+        latest = by_tenant[:1]
+        previous = by_tenant[1:2]
+        tenants = Tenant.objects.filter(status='active').annotate(
+            latest_date=Subquery(latest.values('date')),
+            latest_users=Subquery(latest.values('active_users')),
+            latest_tests=Subquery(latest.values('total_tests')),
+            latest_reports=Subquery(latest.values('total_reports')),
+            previous_tests=Subquery(previous.values('total_tests')),
+        ).filter(latest_date__isnull=False).annotate(
+            growth=Case(
+                When(
+                    previous_tests__gt=0,
+                    then=(Cast('latest_tests', FloatField()) - F('previous_tests')) * 100.0
+                    / F('previous_tests')
+                ),
+                default=None,
+                output_field=FloatField(),
+            )
+        ).order_by(order, 'id').values(
+            'company_name', 'latest_users', 'latest_tests', 'latest_reports', 'growth'
+        )
+
+        paginator = None
+        if 'page' in request.query_params or 'page_size' in request.query_params:
+            paginator = TenantUsagePagination()
+            tenants = paginator.paginate_queryset(tenants, request, view=self)
+
+        usage_data = [
+            {
+                'tenant_name': row['company_name'],
+                'users': row['latest_users'],
+                'tests': row['latest_tests'],
+                'reports': row['latest_reports'],
+                'growth': round(row['growth'], 1) if row['growth'] is not None else None
+            }
+            for row in tenants
+        ]
+        if paginator is not None:
+            return paginator.get_paginated_response(usage_data)
         return Response(usage_data)
 
     @action(detail=False, methods=['get'])
@@ -331,6 +462,16 @@ class SystemLogViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(logs, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def archived(self, request):
+        # Query logs pruned into the archive (start/end dates, level, search, limit)
+        try:
+            params = archive_query(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        logs = read_archive(SystemLog, search_fields=['message', 'action', 'user'], **params)
+        return Response(list(logs))
+
 
 class SystemHealthViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = SystemHealth.objects.all()
@@ -514,6 +655,13 @@ class DatabaseBackupViewSet(viewsets.ModelViewSet):
     queryset = DatabaseBackup.objects.all().order_by('-created_at')
     serializer_class = DatabaseBackupSerializer
     permission_classes = [AllowAny]  # Temporarily allow unauthenticated access for testing
+    # Archives are full database dumps; these actions read, write or delete them
+    superadmin_actions = {'download', 'start_backup', 'destroy'}
+
+    def get_permissions(self):
+        if self.action in self.superadmin_actions:
+            return [IsSuperAdmin()]
+        return super().get_permissions()
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -530,37 +678,59 @@ class DatabaseBackupViewSet(viewsets.ModelViewSet):
         
         return queryset
 
+    def perform_destroy(self, instance):
+        backup_engine.delete_backup_files(instance)
+        instance.delete()
+
+    def destroy(self, request, *args, **kwargs):
+        backup = self.get_object()
+        dependents = backup.dependent_backups.filter(status='completed').count()
+        if dependents:
+            return Response(
+                {'error': f'Backup is the base of {dependents} other backups'},
+                status=status.HTTP_409_CONFLICT
+            )
+        return super().destroy(request, *args, **kwargs)
+
     @action(detail=True, methods=['post'])
     def start_backup(self, request, pk=None):
+        backup_engine.fail_stale()
         backup = self.get_object()
-        backup.status = 'in_progress'
-        backup.save()
-        
-        # Here you would implement actual backup logic
-        # For now, we'll simulate it
-        import threading
-        def simulate_backup():
-            import time
-            time.sleep(5)  # Simulate backup time
-            backup.status = 'completed'
-            backup.completed_at = timezone.now()
-            backup.file_path = "/backups/{}_{}.sql".format(backup.name, backup.id)
-            backup.file_size = 1024 * 1024 * 50  # 50MB
-            backup.save()
-        
-        thread = threading.Thread(target=simulate_backup)
-        thread.start()
-        
+        started = DatabaseBackup.objects.filter(
+            pk=backup.pk, status__in=['pending', 'failed', 'cancelled']
+        ).update(status='in_progress', error_message=None, started_at=timezone.now())
+        if not started:
+            return Response(
+                {'error': f'Backup is already {backup.status}'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        backup_engine.submit(backup.pk)
         return Response({'message': 'Backup started successfully'})
 
-    @action(detail=True, methods=['post'])
+    @action(detail=True, methods=['get'])
+    def progress(self, request, pk=None):
+        backup_engine.fail_stale()
+        backup = self.get_object()
+        return Response({'status': backup.status, **backup_engine.get_progress(backup)})
+
+    @action(detail=True, methods=['get', 'post'])
     def download(self, request, pk=None):
         backup = self.get_object()
         if backup.status != 'completed':
             return Response({'error': 'Backup not completed'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Here you would implement actual file download
-        return Response({'message': 'Download started', 'file_path': backup.file_path})
+
+        try:
+            path = backup_engine.resolve_archive(backup)
+            archive = open(path, 'rb')
+        except backup_engine.BackupError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except OSError:
+            return Response({'error': 'Backup file is missing'}, status=status.HTTP_404_NOT_FOUND)
+        response = FileResponse(archive, as_attachment=True, filename=path.name)
+        if backup.checksum:
+            response['X-Checksum-SHA256'] = backup.checksum
+        return response
 
 
 class GlobalNotificationViewSet(viewsets.ModelViewSet):
@@ -1,4 +1,3 @@
-import time
 from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
@@ -6,6 +5,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .branch_models import Branch, BRANCH_STATUS_CHOICES
 from .branch_serializers import BranchSerializer, BranchListSerializer
 from lab.components.superadmin.models import Tenant
+from lab.id_generator import new_id
 
 class BranchListCreateView(generics.ListCreateAPIView):
     serializer_class = BranchSerializer
@@ -47,7 +47,7 @@ class BranchListCreateView(generics.ListCreateAPIView):
 
         # Generate unique ID if missing
         if not data.get("id"):
-            data["id"] = f"BR{int(time.time() * 1000)}"
+            data["id"] = new_id("BR")
 
         # Set default values
         data.setdefault("status", "active")
@@ -1,4 +1,3 @@
-import time
 from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
@@ -7,6 +6,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .cultures_models import Culture, AntibioticSensitivity, SPECIMEN_TYPE_CHOICES, CULTURE_TYPE_CHOICES, STATUS_CHOICES, SENSITIVITY_CHOICES
 from .cultures_serializers import CultureSerializer, CultureListSerializer, AntibioticSensitivitySerializer, AntibioticSensitivityListSerializer
 from lab.components.superadmin.models import Tenant
+from lab.id_generator import new_id
 
 @api_view(['GET'])
 def test_api(request):
@@ -53,7 +53,7 @@ class CultureListCreateView(generics.ListCreateAPIView):
 
         # Generate unique ID if missing
         if not data.get("id"):
-            data["id"] = f"CULT{int(time.time() * 1000)}"
+            data["id"] = new_id("CULT")
 
         # Set default values
         data.setdefault("status", "pending")
@@ -148,7 +148,7 @@ class AntibioticSensitivityListCreateView(generics.ListCreateAPIView):
 
         # Generate unique ID if missing
         if not data.get("id"):
-            data["id"] = f"AS{int(time.time() * 1000)}"
+            data["id"] = new_id("AS")
 
         # Check tenant exists
         try:
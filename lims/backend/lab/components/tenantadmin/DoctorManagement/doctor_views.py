@@ -1,4 +1,3 @@
-import time
 from django.utils import timezone
 from rest_framework import generics, status, filters, viewsets
 from rest_framework.response import Response
@@ -11,6 +10,7 @@ from .doctor_serializers import (
     PatientRecordSerializer, TestResultSerializer, DoctorAppointmentSerializer
 )
 from lab.components.superadmin.models import Tenant
+from lab.id_generator import new_id
 
 class DoctorListCreateView(generics.ListCreateAPIView):
     serializer_class = DoctorSerializer
@@ -52,7 +52,7 @@ class DoctorListCreateView(generics.ListCreateAPIView):
 
         # Generate unique ID if missing
         if not data.get("id"):
-            data["id"] = f"DOC{int(time.time() * 1000)}"
+            data["id"] = new_id("DOC")
 
         # Check tenant exists
         try:
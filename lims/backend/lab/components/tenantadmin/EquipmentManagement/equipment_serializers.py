@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .equipment_models import Equipment
+from lab.id_generator import new_id
 
 class EquipmentSerializer(serializers.ModelSerializer):
     class Meta:
@@ -30,8 +31,7 @@ class EquipmentSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Generate unique ID if not provided
         if 'id' not in validated_data or not validated_data['id']:
-            import time
-            validated_data['id'] = f"EQ{int(time.time() * 1000)}"
+            validated_data['id'] = new_id('EQ')
         
         # Set default created_by if not provided
         if 'created_by' not in validated_data:
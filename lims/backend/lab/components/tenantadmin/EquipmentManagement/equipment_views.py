@@ -1,4 +1,3 @@
-import time
 from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
@@ -6,6 +5,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .equipment_models import Equipment, EQUIPMENT_TYPE_CHOICES, EQUIPMENT_STATUS_CHOICES, EQUIPMENT_CONDITION_CHOICES
 from .equipment_serializers import EquipmentSerializer, EquipmentListSerializer
 from lab.components.superadmin.models import Tenant
+from lab.id_generator import new_id
 
 class EquipmentListCreateView(generics.ListCreateAPIView):
     serializer_class = EquipmentSerializer
@@ -51,7 +51,7 @@ class EquipmentListCreateView(generics.ListCreateAPIView):
 
         # Generate unique ID if missing
         if not data.get("id"):
-            data["id"] = f"EQ{int(time.time() * 1000)}"
+            data["id"] = new_id("EQ")
 
         # Set default values
         data.setdefault("status", "operational")
@@ -1,10 +1,10 @@
-import time
 from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from .manage_users_model import TenantUser, ROLE_CHOICES, BRANCH_CHOICES
 from .manage_users_serializers import TenantUserSerializer
 from lab.components.superadmin.models import Tenant
+from lab.id_generator import new_id
 
 class TenantUserListCreateView(generics.ListCreateAPIView):
     serializer_class = TenantUserSerializer
@@ -40,7 +40,7 @@ class TenantUserListCreateView(generics.ListCreateAPIView):
 
         # Generate unique ID if missing
         if not data.get("id"):
-            data["id"] = f"user-{int(time.time() * 1000)}"
+            data["id"] = new_id("user-")
 
         # Check tenant exists
         try:
@@ -1,4 +1,3 @@
-import time
 from rest_framework import generics, status, filters
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
@@ -6,6 +5,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .test_pricing_models import TestPricing, TestPricingDiscount, TEST_CATEGORY_CHOICES, PRICING_TYPE_CHOICES
 from .test_pricing_serializers import TestPricingSerializer, TestPricingListSerializer, TestPricingDiscountSerializer
 from lab.components.superadmin.models import Tenant
+from lab.id_generator import new_id
 
 class TestPricingListCreateView(generics.ListCreateAPIView):
     serializer_class = TestPricingSerializer
@@ -51,7 +51,7 @@ class TestPricingListCreateView(generics.ListCreateAPIView):
 
         # Generate unique ID if missing
         if not data.get("id"):
-            data["id"] = f"TP{int(time.time() * 1000)}"
+            data["id"] = new_id("TP")
 
         # Set default values
         data.setdefault("currency", "USD")
@@ -137,7 +137,7 @@ class TestPricingDiscountListCreateView(generics.ListCreateAPIView):
 
         # Generate unique ID if missing
         if not data.get("id"):
-            data["id"] = f"TD{int(time.time() * 1000)}"
+            data["id"] = new_id("TD")
 
         # Set default values
         data.setdefault("is_active", True)
@@ -0,0 +1,97 @@
+"""
+Field change tracking for models.
+
+Models listing ``tracked_fields`` snapshot those values when they are loaded
+from the database, so a save can tell what changed without re-reading the row.
+``tracked_fields_changed`` is sent after a save that changed a tracked field,
+and also for every row touched by a ``QuerySet.update()`` on a tracked field.
+
+Receivers get ``sender``, ``instance``, ``changes`` (``{field: (old, new)}``)
+and ``bulk`` (True when raised from ``QuerySet.update()``).
+"""
+from django.db import models, transaction
+from django.dispatch import Signal
+
+tracked_fields_changed = Signal()
+
+# Keep pk__in lookups under SQLite's bound parameter limit
+UPDATE_CHUNK_SIZE = 500
+
+
+class FieldTrackerQuerySet(models.QuerySet):
+    """QuerySet whose update() reports changes to the model's tracked fields"""
+
+    def update(self, **kwargs):
+        tracked = [name for name in self.model.tracked_fields if name in kwargs]
+        if not tracked or not tracked_fields_changed.has_listeners(self.model):
+            return super().update(**kwargs)
+
+        # Receivers run inside the same transaction so their own writes batch up
+        with transaction.atomic(using=self.db):
+            before = {
+                row[0]: row[1:]
+                for row in self.values_list('pk', *tracked)
+            }
+            rows = super().update(**kwargs)
+
+            pks = list(before)
+            for start in range(0, len(pks), UPDATE_CHUNK_SIZE):
+                chunk = self.model._base_manager.using(self.db).in_bulk(
+                    pks[start:start + UPDATE_CHUNK_SIZE]
+                )
+                for pk, instance in chunk.items():
+                    changes = {
+                        name: (old, getattr(instance, name))
+                        for name, old in zip(tracked, before[pk])
+                        if old != getattr(instance, name)
+                    }
+                    if changes:
+                        tracked_fields_changed.send(
+                            sender=self.model, instance=instance, changes=changes, bulk=True
+                        )
+        return rows
+
+
+class FieldTrackerMixin:
+    """
+    Model mixin recording the loaded value of each field in ``tracked_fields``.
+
+    Pair it with ``objects = FieldTrackerQuerySet.as_manager()`` to cover
+    bulk updates as well as instance saves.
+    """
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_tracked_fields()
+        return instance
+
+    def _snapshot_tracked_fields(self):
+        deferred = self.get_deferred_fields()
+        self._tracked_snapshot = {
+            name: getattr(self, name)
+            for name in self.tracked_fields
+            if name not in deferred
+        }
+
+    def tracked_changes(self):
+        """Return ``{field: (old, new)}`` for tracked fields changed since load"""
+        snapshot = getattr(self, '_tracked_snapshot', {})
+        return {
+            name: (old, getattr(self, name))
+            for name, old in snapshot.items()
+            if old != getattr(self, name)
+        }
+
+    def save(self, *args, **kwargs):
+        changes = {} if self._state.adding else self.tracked_changes()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            changes = {name: value for name, value in changes.items() if name in update_fields}
+        super().save(*args, **kwargs)
+        self._snapshot_tracked_fields()
+        if changes:
+            tracked_fields_changed.send(
+                sender=type(self), instance=self, changes=changes, bulk=False
+            )
@@ -0,0 +1,57 @@
+"""
+Identifiers for models with string primary keys.
+
+``new_id(prefix)`` returns ``prefix`` followed by a 26 character ULID: a 48 bit
+millisecond timestamp and 80 random bits in Crockford base32. IDs of a prefix
+sort by creation time, and within one process they are strictly increasing
+(IDs created in the same millisecond increment the random part). The random
+part makes IDs from different workers and hosts collide with negligible
+probability, so no database round trip or coordination is needed.
+"""
+import os
+import threading
+import time
+
+CROCKFORD_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+ULID_LENGTH = 26
+RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last = {}  # prefix -> (milliseconds, random part) of the last ID
+
+
+def _reset_after_fork():
+    # A forked worker must not continue its parent's sequence
+    global _lock
+    _lock = threading.Lock()
+    _last.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _encode(value):
+    chars = []
+    for _ in range(ULID_LENGTH):
+        value, index = divmod(value, 32)
+        chars.append(CROCKFORD_ALPHABET[index])
+    return ''.join(reversed(chars))
+
+
+def new_id(prefix=''):
+    """Return a new, time-sortable ID such as ``RCP01M569VYNVAASDSV5MN2HFK5AY``"""
+    with _lock:
+        millis = time.time_ns() // 1_000_000
+        last_millis, last_random = _last.get(prefix, (-1, 0))
+        if millis <= last_millis:
+            # Same millisecond, or the clock stepped back: keep counting up
+            millis = last_millis
+            random_part = last_random + 1
+            if random_part >> RANDOM_BITS:
+                millis += 1
+                random_part = int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big')
+        else:
+            random_part = int.from_bytes(os.urandom(RANDOM_BITS // 8), 'big')
+        _last[prefix] = (millis, random_part)
+    return f"{prefix}{_encode((millis << RANDOM_BITS) | random_part)}"
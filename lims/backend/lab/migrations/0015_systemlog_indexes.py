@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab', '0014_analytics_rollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['created_at'], name='lab_systemlog_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='systemlog',
+            index=models.Index(fields=['level', 'created_at'], name='lab_systemlog_level_idx'),
+        ),
+    ]
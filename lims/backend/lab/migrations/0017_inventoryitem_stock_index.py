@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab', '0016_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['tenant', 'status'], name='inventory_item_stock_idx'),
+        ),
+    ]
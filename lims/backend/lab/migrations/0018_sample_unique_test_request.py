@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:26
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_duplicate_samples(apps, schema_editor):
+    """Keep the earliest Sample of each test request and move the others' rows onto it"""
+    Sample = apps.get_model('lab', 'Sample')
+    duplicated = list(
+        Sample.objects.exclude(test_request_id__isnull=True).exclude(test_request_id='')
+        .order_by().values('test_request_id').annotate(samples=Count('pk')).filter(samples__gt=1)
+        .values_list('test_request_id', flat=True)
+    )
+    relations = [relation for relation in Sample._meta.related_objects if relation.one_to_many]
+    for test_request_id in duplicated:
+        kept, *extra = Sample.objects.filter(test_request_id=test_request_id).order_by('created_at', 'pk')
+        extra_ids = [sample.pk for sample in extra]
+        for relation in relations:
+            relation.related_model._base_manager.filter(
+                **{f'{relation.field.name}__in': extra_ids}
+            ).update(**{relation.field.name: kept})
+        Sample.objects.filter(pk__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab', '0017_inventoryitem_stock_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_samples, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='sample',
+            constraint=models.UniqueConstraint(condition=models.Q(('test_request_id__isnull', False), models.Q(('test_request_id', ''), _negated=True)), fields=('test_request_id',), name='unique_sample_per_test_request'),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.7 on 2026-10-18 01:28
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Copied from lab.models as of this migration, so later changes there do not
+# alter what it backfills
+QUEUE_TARGET_MINUTES = {
+    'emergency': 15,
+    'stat': 60,
+    'urgent': 4 * 60,
+    'routine': 24 * 60,
+}
+
+
+def queue_due_time(priority, start, due=None):
+    target = start + timedelta(minutes=QUEUE_TARGET_MINUTES.get(priority, QUEUE_TARGET_MINUTES['routine']))
+    return min(target, due) if due else target
+
+
+def backfill_queue_due_at(apps, schema_editor):
+    Sample = apps.get_model('lab', 'Sample')
+    LabWorkflow = apps.get_model('lab', 'LabWorkflow')
+    now = timezone.now()
+    samples = []
+    for sample in Sample.objects.only('priority', 'received_date', 'collection_date', 'expiry_date').iterator():
+        start = sample.received_date or sample.collection_date or now
+        sample.queue_due_at = queue_due_time(sample.priority, start, sample.expiry_date)
+        samples.append(sample)
+    Sample.objects.bulk_update(samples, ['queue_due_at'], batch_size=500)
+    workflows = []
+    for workflow in LabWorkflow.objects.only('priority', 'created_at', 'due_date').iterator():
+        workflow.queue_due_at = queue_due_time(workflow.priority, workflow.created_at or now, workflow.due_date)
+        workflows.append(workflow)
+    LabWorkflow.objects.bulk_update(workflows, ['queue_due_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab', '0018_sample_unique_test_request'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='labworkflow',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='labworkflow',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='labworkflow',
+            name='queue_due_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sample',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='sample',
+            name='lease_expires_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='sample',
+            name='queue_due_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='labworkflow',
+            index=models.Index(fields=['status', 'queue_due_at', 'id'], name='lab_workflow_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sample',
+            index=models.Index(fields=['status', 'queue_due_at', 'id'], name='lab_sample_queue_idx'),
+        ),
+        migrations.RunPython(backfill_queue_due_at, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
-from datetime import date, time
+from django.db.models.functions import Coalesce, Now
+from django.db.models.lookups import Exact, LessThan
+from django.utils import timezone
+from datetime import date, time, timedelta
 from django.contrib.auth import get_user_model
 from lab.components.Doctor.NewTestRequest.NewTestRequest_models import TestRequest
 
@@ -50,6 +53,7 @@ class TestReport(models.Model):
     doctor_name = models.CharField(max_length=255, blank=True, null=True)
     generated_date = models.DateField(auto_now_add=True)
     generated_time = models.TimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True, db_index=True)
 
     def __str__(self):
         patient_name = self.patient_name or (self.test_request.patient_name if self.test_request else "Unknown Patient")
@@ -64,6 +68,59 @@ class LabBaseModel(models.Model):
         abstract = True
 
 
+# Work queue: target turnaround per priority. Queued work is served earliest
+# due first, so waiting routine work ages ahead of newly arrived urgent work.
+QUEUE_TARGET_MINUTES = {
+    'emergency': 15,
+    'stat': 60,
+    'urgent': 4 * 60,
+    'routine': 24 * 60,
+}
+
+
+def queue_due_time(priority, start, due=None):
+    """When queued work of ``priority`` started at ``start`` is due"""
+    target = start + timedelta(minutes=QUEUE_TARGET_MINUTES.get(priority, QUEUE_TARGET_MINUTES['routine']))
+    return min(target, due) if due else target
+
+
+def queue_due_expression(priority, start, due):
+    """``queue_due_time`` as a database expression over ``priority``, ``start`` and ``due``"""
+    def after(minutes):
+        return start + models.Value(timedelta(minutes=minutes))
+
+    target = models.Case(
+        *[models.When(Exact(priority, models.Value(name)), then=after(minutes)) for name, minutes in QUEUE_TARGET_MINUTES.items()],
+        default=after(QUEUE_TARGET_MINUTES['routine']),
+        output_field=models.DateTimeField(),
+    )
+    return models.Case(models.When(LessThan(due, target), then=due), default=target, output_field=models.DateTimeField())
+
+
+class WorkQueueQuerySet(models.QuerySet):
+    """
+    QuerySet whose update() recomputes ``queue_due_at`` in the same statement
+    when it changes the priority or a start or due field, as save() would.
+    """
+
+    def update(self, **kwargs):
+        model = self.model
+        inputs = ('priority', *model.queue_start_fields, model.queue_due_field)
+        if 'queue_due_at' not in kwargs and any(name in kwargs for name in inputs):
+            def column(name):
+                value = kwargs.get(name, models.F(name))
+                if hasattr(value, 'resolve_expression'):
+                    return value
+                return models.Value(value, output_field=model._meta.get_field(name))
+
+            kwargs['queue_due_at'] = queue_due_expression(
+                column('priority'),
+                Coalesce(*[column(name) for name in model.queue_start_fields], Now()),
+                column(model.queue_due_field),
+            )
+        return super().update(**kwargs)
+
+
 # Technician Models
 class Technician(models.Model):
     """Technician model for laboratory operations"""
@@ -187,14 +244,41 @@ class Sample(models.Model):
     processing_notes = models.TextField(blank=True, null=True)
     rejection_reason = models.TextField(blank=True, null=True)
     tenant_id = models.CharField(max_length=100, null=True, blank=True)  # Reference to tenant
+    # Work queue position and the technician's lease on it
+    queue_due_at = models.DateTimeField(blank=True, null=True)
+    claimed_by = models.CharField(max_length=255, blank=True, null=True)
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = WorkQueueQuerySet.as_manager()
+    queue_start_fields = ('received_date', 'collection_date')
+    queue_due_field = 'expiry_date'
     
     class Meta:
         ordering = ['-collection_date']
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='lab_sample_cursor_idx'),
+            models.Index(fields=['status', 'queue_due_at', 'id'], name='lab_sample_queue_idx'),
+        ]
+        constraints = [
+            # One sample per accepted test request
+            models.UniqueConstraint(
+                fields=['test_request_id'],
+                condition=models.Q(test_request_id__isnull=False) & ~models.Q(test_request_id=''),
+                name='unique_sample_per_test_request',
+            ),
+        ]
     
     def __str__(self):
         return f"Sample {self.id} - {self.sample_type}"
+    
+    def save(self, *args, **kwargs):
+        start = self.received_date or self.collection_date or timezone.now()
+        self.queue_due_at = queue_due_time(self.priority, start, self.expiry_date)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'queue_due_at'}
+        super().save(*args, **kwargs)
 
 
 class TestResult(models.Model):
@@ -323,11 +407,28 @@ class LabWorkflow(models.Model):
     actual_duration = models.DurationField(blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
     tenant_id = models.CharField(max_length=100, null=True, blank=True)  # Reference to tenant
+    # Work queue position and the technician's lease on it
+    queue_due_at = models.DateTimeField(blank=True, null=True)
+    claimed_by = models.CharField(max_length=255, blank=True, null=True)
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    objects = WorkQueueQuerySet.as_manager()
+    queue_start_fields = ('created_at',)
+    queue_due_field = 'due_date'
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'queue_due_at', 'id'], name='lab_workflow_queue_idx'),
+        ]
     
     def __str__(self):
         return f"Workflow {self.id} - {self.title}"
+    
+    def save(self, *args, **kwargs):
+        self.queue_due_at = queue_due_time(self.priority, self.created_at or timezone.now(), self.due_date)
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'queue_due_at'}
+        super().save(*args, **kwargs)
@@ -0,0 +1,141 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered newest first on ``(created_at, pk)`` and the cursor holds the
+last row's values, so every page is one indexed range query and a deep page
+costs the same as the first. Models without ``created_at`` are paged on ``pk``.
+
+Paging is applied when the client asks for it with ``?cursor=`` or
+``?page_size=``, or on every list when API_PAGINATE_BY_DEFAULT is enabled;
+``?paginate=false`` opts a request out. Paginated responses look like::
+
+    {"next": "<url or null>", "results": [...]}
+
+While paging, the cursor ordering replaces the view's ordering. Querysets a
+view has already sliced are returned unpaginated since they are bounded.
+"""
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+API_PAGINATE_BY_DEFAULT = getattr(settings, 'API_PAGINATE_BY_DEFAULT', False)
+
+
+class CreatedAtCursorPagination(BasePagination):
+    page_size = api_settings.PAGE_SIZE or 100
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    opt_out_query_param = 'paginate'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def is_requested(self, request):
+        params = request.query_params
+        if params.get(self.opt_out_query_param, '').lower() == 'false':
+            return False
+        return (
+            API_PAGINATE_BY_DEFAULT
+            or self.cursor_query_param in params
+            or self.page_size_query_param in params
+        )
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    @staticmethod
+    def has_created_at(model):
+        try:
+            model._meta.get_field('created_at')
+        except FieldDoesNotExist:
+            return False
+        return True
+
+    # ------------------------
+    # Cursor encoding
+    # ------------------------
+    def encode_cursor(self, row):
+        position = [row.created_at.isoformat(), row.pk] if self.by_created_at else [row.pk]
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            if self.by_created_at:
+                created_at, pk = position
+                created_at = parse_datetime(created_at)
+                if created_at is None:
+                    raise ValueError(encoded)
+                return created_at, pk
+            (pk,) = position
+            return (pk,)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    # ------------------------
+    # Paging
+    # ------------------------
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request) or queryset.query.is_sliced:
+            return None
+
+        self.request = request
+        self.by_created_at = self.has_created_at(queryset.model)
+        page_size = self.get_page_size(request)
+
+        if self.by_created_at:
+            queryset = queryset.order_by('-created_at', '-pk')
+        else:
+            queryset = queryset.order_by('-pk')
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            if self.by_created_at:
+                created_at, pk = position
+                queryset = queryset.filter(
+                    Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(pk__lt=position[0])
+
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
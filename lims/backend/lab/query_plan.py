@@ -0,0 +1,45 @@
+"""
+Query plans declared by serializers.
+
+A serializer lists the relations it reads in its ``Meta``::
+
+    class Meta:
+        model = Appointment
+        fields = [...]
+        select_related = ['patient', 'doctor']
+        prefetch_related = []
+        only = ['id', 'patient', 'patient__first_name', ...]
+
+``plan_queryset(queryset, serializer_class)`` applies them, and viewsets that
+mix in ``QueryPlanMixin`` apply the plan of their current serializer class to
+every queryset they list or look up, so a listed row no longer costs a query
+per related object. ``only`` is meant for list serializers whose rows are
+never saved; it must name each ``select_related`` relation as well as the
+related fields read. ``lab.tests.utils.assert_constant_queries`` checks that
+an endpoint's query count stays flat as its result grows.
+"""
+
+
+def plan_queryset(queryset, serializer_class):
+    """Apply ``serializer_class``'s declared query plan to ``queryset``"""
+    meta = getattr(serializer_class, 'Meta', None)
+    if meta is None:
+        return queryset
+    select_related = getattr(meta, 'select_related', None)
+    prefetch_related = getattr(meta, 'prefetch_related', None)
+    only = getattr(meta, 'only', None)
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    if only:
+        queryset = queryset.only(*only)
+    return queryset
+
+
+class QueryPlanMixin:
+    """Viewset mixin applying the serializer's query plan to its querysets"""
+
+    def filter_queryset(self, queryset):
+        return plan_queryset(super().filter_queryset(queryset), self.get_serializer_class())
+
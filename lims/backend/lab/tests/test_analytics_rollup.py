@@ -0,0 +1,89 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from lab.components.Analytics.analytics_models import AnalyticsRollupState, LabAnalytics, TestCategoryAnalytics
+from lab.components.Analytics.analytics_rollup import DEFAULT_TENANT, ROLLUP_NAME, rollup_days, run_rollup
+from lab.components.Doctor.NewTestRequest.NewTestRequest_models import TestRequest
+from lab.models import Sample, TestReport, TestResult
+
+from .utils import unique
+
+
+def accept(test_request, tenant_id, completed_after=None):
+    sample = Sample.objects.create(
+        id=unique('S'), patient_id='P1', test_request_id=str(test_request.pk), sample_type='blood',
+        collection_date=timezone.now(), tenant_id=tenant_id,
+    )
+    if completed_after is not None:
+        TestResult.objects.create(
+            id=unique('R'), sample=sample, test_name='CBC',
+            completion_date=test_request.created_at + completed_after,
+        )
+    return sample
+
+
+class AnalyticsRollupTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        done = TestRequest.objects.create(status='Completed')
+        accept(done, 't1', completed_after=timedelta(hours=4))
+        self.pending = TestRequest.objects.create()
+        accept(self.pending, 't1')
+        rejected = TestRequest.objects.create(status='Rejected')
+        accept(rejected, 't1')
+        TestRequest.objects.create()
+        TestReport.objects.create(test_request=done, category='Hematology', status='Completed')
+
+    def test_rolls_up_requests_by_sample_tenant(self):
+        self.assertGreaterEqual(run_rollup(), 1)
+
+        row = LabAnalytics.objects.get(tenant='t1', date=self.today)
+        self.assertEqual(
+            (row.total_tests, row.completed_tests, row.pending_tests, row.failed_tests),
+            (3, 1, 1, 1),
+        )
+        self.assertEqual(row.success_rate, Decimal('33.33'))
+        self.assertEqual(row.avg_turnaround_time, timedelta(hours=4))
+        self.assertEqual(LabAnalytics.objects.get(tenant=DEFAULT_TENANT, date=self.today).total_tests, 1)
+
+        category = TestCategoryAnalytics.objects.get(tenant='t1', category='Hematology')
+        self.assertEqual((category.total_tests, category.success_rate), (1, Decimal('100.00')))
+        self.assertIsNotNone(AnalyticsRollupState.objects.get(name=ROLLUP_NAME).high_water_mark)
+
+    def test_incremental_run_picks_up_changes(self):
+        run_rollup()
+        self.pending.status = 'Completed'
+        self.pending.save()
+
+        run_rollup()
+
+        row = LabAnalytics.objects.get(tenant='t1', date=self.today)
+        self.assertEqual((row.completed_tests, row.pending_tests), (2, 0))
+
+    def test_recomputing_a_past_day_keeps_its_equipment_snapshot(self):
+        yesterday = self.today - timedelta(days=1)
+        LabAnalytics.objects.create(tenant='t1', date=yesterday, total_tests=4, equipment_operational=2,
+                                    equipment_out_of_service=1)
+        LabAnalytics.objects.create(tenant='t2', date=yesterday, total_tests=4)
+
+        rollup_days([yesterday])
+
+        row = LabAnalytics.objects.get(date=yesterday)
+        self.assertEqual((row.tenant, row.total_tests), ('t1', 0))
+        self.assertEqual((row.equipment_operational, row.equipment_out_of_service), (2, 1))
+
+    def test_since_leaves_high_water_mark_alone(self):
+        call_command('rollup_lab_analytics', since=self.today.isoformat(), stdout=StringIO())
+
+        self.assertTrue(LabAnalytics.objects.filter(tenant='t1', date=self.today).exists())
+        self.assertIsNone(AnalyticsRollupState.objects.get(name=ROLLUP_NAME).high_water_mark)
+
+    def test_command_rejects_malformed_since(self):
+        with self.assertRaises(CommandError):
+            call_command('rollup_lab_analytics', since='last week')
+        self.assertFalse(LabAnalytics.objects.exists())
@@ -0,0 +1,59 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from lab.components.superadmin.models import BillingPlan, BillingTransaction, TenantPlan
+
+from .utils import make_tenant, unique
+
+ANALYTICS_URL = '/api/superadmin/plans/analytics/'
+
+
+class BillingAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.monthly = BillingPlan.objects.create(name='Monthly', plan_type='basic', price=Decimal('10.00'), max_users=5)
+        self.yearly = BillingPlan.objects.create(
+            name='Yearly', plan_type='premium', price=Decimal('100.00'), billing_cycle='yearly', max_users=5,
+        )
+        for plan in (self.monthly, self.monthly, self.yearly):
+            TenantPlan.objects.create(tenant=make_tenant(), billing_plan=plan)
+        TenantPlan.objects.create(tenant=make_tenant(), billing_plan=self.yearly, is_active=False)
+
+    def pay(self, amount, paid_at, status='paid'):
+        BillingTransaction.objects.create(
+            tenant=make_tenant(), billing_plan=self.monthly, amount=Decimal(amount), status=status,
+            payment_method='other', transaction_id=unique('txn'), paid_at=paid_at,
+        )
+
+    def test_recurring_revenue_is_summed_as_decimal(self):
+        data = self.client.get(ANALYTICS_URL).json()
+        self.assertEqual(data['total_customers'], 3)
+        self.assertEqual(data['total_revenue'], '120.00')
+        self.assertEqual(data['monthly_recurring'], '28.33')
+        self.assertEqual(data['annual_recurring'], '339.96')
+        self.assertEqual(data['average_revenue_per_user'], '40.00')
+        self.assertNotIn('revenue_series', data)
+
+    def test_revenue_series_buckets_paid_transactions(self):
+        self.pay('5.00', datetime(2026, 3, 2, 9, tzinfo=timezone.utc))
+        self.pay('7.50', datetime(2026, 3, 20, 9, tzinfo=timezone.utc))
+        self.pay('9.00', datetime(2026, 4, 1, 9, tzinfo=timezone.utc))
+        self.pay('50.00', datetime(2026, 3, 5, 9, tzinfo=timezone.utc), status='refunded')
+        self.pay('1.00', datetime(2025, 12, 31, 9, tzinfo=timezone.utc))
+
+        data = self.client.get(ANALYTICS_URL, {'series': 'month', 'since': '2026-01-01', 'until': '2026-06-30'}).json()
+        self.assertEqual(
+            [(row['period'][:10], row['revenue'], row['transactions']) for row in data['revenue_series']],
+            [('2026-03-01', '12.50', 2), ('2026-04-01', '9.00', 1)],
+        )
+
+    def test_unknown_series_is_rejected(self):
+        response = self.client.get(ANALYTICS_URL, {'series': 'hour'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_malformed_bounds_are_rejected(self):
+        response = self.client.get(ANALYTICS_URL, {'series': 'day', 'since': 'last week'})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from lab.components.Doctor.NewTestRequest.NewTestRequest_models import TestRequest
+from lab.components.Notifications import notification_dispatch
+from lab.components.Technician.Sample.accept_views import BULK_ACCEPT_MAX, accept_test_requests
+from lab.models import Sample
+
+BULK_URL = '/api/accept/bulk/'
+
+
+class BulkAcceptTests(TestCase):
+    def setUp(self):
+        self.routine = TestRequest.objects.create(patient_id='P1', test_type='CBC')
+        self.critical = TestRequest.objects.create(patient_id='P2', priority='Critical')
+
+    def test_accepts_every_request_in_one_batch(self):
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                BULK_URL, {'ids': [self.routine.pk, self.critical.pk]}, content_type='application/json'
+            )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['accepted'], 2)
+        self.assertEqual([result['status'] for result in data['results']], ['accepted', 'accepted'])
+        sample = Sample.objects.get(test_request_id=str(self.critical.pk))
+        self.assertEqual((sample.id, sample.patient_id, sample.priority, sample.status),
+                         (data['results'][1]['sample_id'], 'P2', 'stat', 'received'))
+        self.assertIsNotNone(sample.queue_due_at)
+        self.assertEqual(TestRequest.objects.filter(accepted=True).count(), 2)
+
+    def test_reports_already_accepted_and_missing_requests(self):
+        first = self.client.post(f"/api/accept/{self.routine.pk}/").json()
+
+        data = self.client.post(
+            BULK_URL, {'ids': [self.routine.pk, 0, self.critical.pk, self.critical.pk]},
+            content_type='application/json'
+        ).json()
+
+        self.assertEqual(data['accepted'], 1)
+        self.assertEqual(data['results'], [
+            {'id': self.routine.pk, 'status': 'already_accepted', 'sample_id': first['id']},
+            {'id': 0, 'status': 'not_found', 'sample_id': None},
+            {'id': self.critical.pk, 'status': 'accepted', 'sample_id': data['results'][2]['sample_id']},
+        ])
+        self.assertEqual(Sample.objects.filter(test_request_id=str(self.routine.pk)).count(), 1)
+
+    def test_single_accept_errors(self):
+        self.assertEqual(self.client.post(f"/api/accept/{self.routine.pk}/").status_code, 201)
+        self.assertEqual(self.client.post(f"/api/accept/{self.routine.pk}/").status_code, 400)
+        self.assertEqual(self.client.post('/api/accept/0/').status_code, 404)
+
+    def test_rejects_malformed_batches(self):
+        for ids in (None, [], 'all', [self.routine.pk, 'x'], list(range(BULK_ACCEPT_MAX + 1))):
+            with self.subTest(ids=ids):
+                response = self.client.post(BULK_URL, {'ids': ids}, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Sample.objects.exists())
+
+
+# Outbox workers would compete with the batches for the database
+@mock.patch.object(notification_dispatch, 'OUTBOX_WORKERS', 0)
+class ConcurrentBulkAcceptTests(TransactionTestCase):
+    def accept(self, request_ids, start):
+        """Accept ``request_ids``, retrying while another writer holds the database"""
+        start.wait()
+        try:
+            while True:
+                try:
+                    return accept_test_requests(request_ids)[0]
+                except OperationalError:
+                    continue
+        finally:
+            connection.close()
+
+    def test_overlapping_batches_create_one_sample_per_request(self):
+        request_ids = [TestRequest.objects.create(patient_id=f"P{number}").pk for number in range(30)]
+        # Each batch overlaps its neighbours by half
+        batches = [request_ids[start:start + 10] for start in range(0, 25, 5)]
+        start = threading.Barrier(len(batches))
+        with ThreadPoolExecutor(len(batches)) as pool:
+            results = list(pool.map(lambda batch: self.accept(batch, start), batches))
+
+        accepted = [result['id'] for batch in results for result in batch if result['status'] == 'accepted']
+        self.assertEqual(sorted(accepted), request_ids)
+        self.assertEqual(
+            sorted(Sample.objects.values_list('test_request_id', flat=True)), sorted(map(str, request_ids))
+        )
+        samples = dict(Sample.objects.values_list('test_request_id', 'id'))
+        for batch in results:
+            for result in batch:
+                self.assertEqual(result['sample_id'], samples[str(result['id'])])
+
+
+class UniqueSampleMigrationTests(TransactionTestCase):
+    before = [('lab', '0017_inventoryitem_stock_index')]
+    after = [('lab', '0018_sample_unique_test_request')]
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicate_samples_are_merged_into_the_earliest(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        apps = executor.loader.project_state(self.before).apps
+        Sample, TestResult = apps.get_model('lab', 'Sample'), apps.get_model('lab', 'TestResult')
+        samples = [
+            Sample.objects.create(id=sample_id, patient_id='P1', sample_type='blood',
+                                  collection_date=timezone.now(), test_request_id=test_request_id)
+            for sample_id, test_request_id in (('S1', '7'), ('S2', '7'), ('S3', '7'), ('S4', '8'), ('S5', ''))
+        ]
+        Sample.objects.create(id='S6', patient_id='P1', sample_type='blood', collection_date=timezone.now(),
+                              test_request_id='')
+        TestResult.objects.create(id='R1', sample=samples[2], test_name='CBC')
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.after)
+
+        apps = executor.loader.project_state(self.after).apps
+        Sample, TestResult = apps.get_model('lab', 'Sample'), apps.get_model('lab', 'TestResult')
+        self.assertEqual(sorted(Sample.objects.values_list('pk', flat=True)), ['S1', 'S4', 'S5', 'S6'])
+        self.assertEqual(TestResult.objects.get().sample_id, 'S1')
@@ -0,0 +1,116 @@
+import hashlib
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from lab.components.FileManagement import file_blobs
+from lab.components.FileManagement.file_models import FileUpload, UploadSession
+
+from .utils import make_user, temporary_media
+
+UPLOADS_URL = '/api/files/uploads/'
+FILES_URL = '/api/files/files/'
+CONTENT = b'0123456789' * 10
+
+
+class ChunkedUploadTests(TestCase):
+    def setUp(self):
+        media = self.enterContext(temporary_media())
+        self.enterContext(mock.patch.object(file_blobs, 'PARTIAL_DIR', Path(media) / 'partial'))
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('doctor'))
+
+    def open_session(self, **fields):
+        data = {'name': 'scan.bin', 'file_type': 'other', 'total_size': len(CONTENT), **fields}
+        response = self.client.post(UPLOADS_URL, data, format='json')
+        self.assertEqual(response.status_code, 201)
+        return f"{UPLOADS_URL}{response.json()['id']}/"
+
+    def put(self, url, start, end):
+        return self.client.put(
+            url, CONTENT[start:end + 1], content_type='application/octet-stream',
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end}/{len(CONTENT)}",
+        )
+
+    def upload(self, **fields):
+        url = self.open_session(**fields)
+        for start in range(0, len(CONTENT), 40):
+            self.assertEqual(self.put(url, start, min(start + 39, len(CONTENT) - 1)).status_code, 200)
+        return url, self.client.post(f"{url}commit/")
+
+    def test_chunks_are_assembled_and_stored_by_content(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            url, response = self.upload()
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(file_blobs.partial_path(UploadSession.objects.get()).exists())
+        upload = FileUpload.objects.get(pk=response.json()['id'])
+        digest = hashlib.sha256(CONTENT).hexdigest()
+        self.assertEqual((upload.content_hash, upload.file_size), (digest, len(CONTENT)))
+        self.assertEqual(upload.file.name, file_blobs.blob_name(digest))
+        with upload.file.open('rb') as stored:
+            self.assertEqual(stored.read(), CONTENT)
+        # Committing again returns the same file
+        self.assertEqual(self.client.post(f"{url}commit/").json()['id'], upload.pk)
+
+    def test_commit_keeps_the_partial_until_the_session_is_complete(self):
+        url = self.open_session()
+        self.put(url, 0, len(CONTENT) - 1)
+        session = UploadSession.objects.get()
+        with self.captureOnCommitCallbacks() as callbacks:
+            with mock.patch.object(FileUpload.objects, 'create', side_effect=RuntimeError):
+                with self.assertRaises(RuntimeError):
+                    self.client.post(f"{url}commit/")
+        # The failed commit rolled back, so a retry still finds the partial
+        self.assertEqual(callbacks, [])
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'active')
+        self.assertTrue(file_blobs.partial_path(session).exists())
+        self.assertEqual(self.client.post(f"{url}commit/").status_code, 201)
+
+    def test_replacing_a_file_stores_it_by_content(self):
+        upload_id = self.upload()[1].json()['id']
+        replacement = SimpleUploadedFile('scan.bin', b'replacement')
+        response = self.client.patch(f"{FILES_URL}{upload_id}/", {'file': replacement}, format='multipart')
+        self.assertEqual(response.status_code, 200)
+        upload = FileUpload.objects.get(pk=upload_id)
+        digest = hashlib.sha256(b'replacement').hexdigest()
+        self.assertEqual((upload.content_hash, upload.file_size), (digest, len(b'replacement')))
+        self.assertEqual(upload.file.name, file_blobs.blob_name(digest))
+
+    def test_identical_uploads_share_one_blob(self):
+        _, first = self.upload()
+        _, second = self.upload(name='copy.bin')
+        names = FileUpload.objects.filter(pk__in=[first.json()['id'], second.json()['id']]).values_list('file', flat=True)
+        self.assertEqual(len(set(names)), 1)
+
+    def test_retransmits_are_acknowledged_and_gaps_refused(self):
+        url = self.open_session()
+        self.put(url, 0, 39)
+        retransmit = self.put(url, 0, 39)
+        self.assertEqual(retransmit.json()['received_bytes'], 40)
+
+        gap = self.put(url, 60, 79)
+        self.assertEqual(gap.status_code, 409)
+        self.assertEqual(gap.json()['received_bytes'], 40)
+
+    def test_incomplete_upload_cannot_be_committed(self):
+        url = self.open_session()
+        self.put(url, 0, 39)
+        response = self.client.post(f"{url}commit/")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['received_bytes'], 40)
+
+    def test_hash_mismatch_aborts_the_session(self):
+        url, response = self.upload(expected_hash='0' * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(UploadSession.objects.get().status, 'aborted')
+        self.assertFalse(FileUpload.objects.exists())
+        self.assertEqual(self.put(url, 0, 39).status_code, 410)
+
+    def test_missing_content_range_is_rejected(self):
+        url = self.open_session()
+        response = self.client.put(url, CONTENT, content_type='application/octet-stream')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,100 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+from lab.components.TenantAccessAuth.authentication import (
+    ClaimsJWTAuthentication, ClaimsRefreshToken, revoke_token,
+)
+from lab.components.TenantAccessAuth.Login.models import RevokedToken
+
+from .utils import make_user, shared_cache
+
+factory = APIRequestFactory()
+
+
+def authenticate(token):
+    request = factory.get('/', HTTP_AUTHORIZATION=f"Bearer {token}")
+    return ClaimsJWTAuthentication().authenticate(request)[0]
+
+
+class SharedCacheAuthenticationTests(TestCase):
+    def setUp(self):
+        self.enterContext(shared_cache())
+        self.user = make_user('doctor', tenant='t1')
+        self.refresh = ClaimsRefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+
+    def test_user_is_built_from_claims_without_a_query(self):
+        with self.assertNumQueries(0):
+            user = authenticate(self.access)
+        self.assertEqual((user.pk, user.role, user.tenant), (self.user.pk, 'doctor', 't1'))
+
+    def test_saved_user_is_reloaded(self):
+        self.user.role = 'technician'
+        self.user.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(authenticate(self.access).role, 'technician')
+
+    def test_deactivated_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(self.access)
+
+    def test_inactive_claim_is_rejected(self):
+        self.access['is_active'] = False
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(self.access)
+
+    def test_revoked_token_is_rejected(self):
+        revoke_token(self.access)
+        with self.assertRaises(InvalidToken):
+            authenticate(self.access)
+        self.assertFalse(RevokedToken.objects.exists())
+
+
+class LocalCacheAuthenticationTests(TestCase):
+    def setUp(self):
+        self.user = make_user('doctor')
+        self.access = ClaimsRefreshToken.for_user(self.user).access_token
+
+    def test_user_and_revocation_cost_one_query(self):
+        with self.assertNumQueries(1):
+            user = authenticate(self.access)
+        self.assertEqual((user.pk, user.role), (self.user.pk, 'doctor'))
+
+        revoke_token(self.access)
+        with self.assertNumQueries(1), self.assertRaises(InvalidToken):
+            authenticate(self.access)
+
+    def test_user_is_loaded_from_the_database(self):
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        with self.assertRaises(AuthenticationFailed):
+            authenticate(self.access)
+
+    def test_logout_records_revocation_in_the_database(self):
+        response = self.client.post('/api/logout/', HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(RevokedToken.objects.filter(jti=self.access['jti']).exists())
+        with self.assertRaises(InvalidToken):
+            authenticate(self.access)
+
+
+class TokenRefreshTests(TestCase):
+    def setUp(self):
+        self.user = make_user('doctor', tenant='t1')
+        self.refresh = ClaimsRefreshToken.for_user(self.user)
+
+    def test_refresh_reloads_claims(self):
+        self.user.tenant = 't2'
+        self.user.save()
+        response = self.client.post('/api/token/refresh/', {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, 200)
+        access = ClaimsJWTAuthentication().get_validated_token(response.json()['access'])
+        self.assertEqual(access['tenant'], 't2')
+
+    def test_revoked_refresh_token_is_rejected(self):
+        self.client.post('/api/logout/', {'refresh': str(self.refresh)})
+        response = self.client.post('/api/token/refresh/', {'refresh': str(self.refresh)})
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,142 @@
+import sqlite3
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from lab.components.superadmin import backup_engine
+from lab.components.superadmin.models import DatabaseBackup
+
+from .utils import make_user
+
+BACKUPS_URL = '/api/superadmin/backups/'
+
+
+class BackupEngineTestCase(TestCase):
+    """Backs up a scratch SQLite file into a scratch BACKUP_DIR"""
+
+    def setUp(self):
+        root = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.backup_dir = root / 'backups'
+        self.source = root / 'source.sqlite3'
+        self.enterContext(mock.patch.object(backup_engine, 'BACKUP_DIR', self.backup_dir))
+        self.enterContext(mock.patch.object(backup_engine, '_database_path', return_value=str(self.source)))
+        self.write_rows(range(500))
+
+    def write_rows(self, numbers):
+        with sqlite3.connect(self.source) as db:
+            db.execute('CREATE TABLE IF NOT EXISTS t (n INTEGER PRIMARY KEY, payload TEXT)')
+            db.executemany('INSERT OR REPLACE INTO t VALUES (?, ?)', [(n, 'x' * 200) for n in numbers])
+
+    def rows(self, path):
+        with sqlite3.connect(path) as db:
+            return db.execute('SELECT count(*), sum(n) FROM t').fetchone()
+
+    def take(self, backup_type):
+        backup = DatabaseBackup.objects.create(name=backup_type, backup_type=backup_type, created_by='tests')
+        backup_engine.run_backup(backup.pk)
+        backup.refresh_from_db()
+        return backup
+
+
+class BackupEngineTests(BackupEngineTestCase):
+    def test_incremental_chain_restores_the_latest_state(self):
+        full = self.take('full')
+        self.write_rows(range(500, 520))
+        incremental = self.take('incremental')
+
+        self.assertEqual(incremental.base_backup, full)
+        self.assertLess(incremental.file_size, full.file_size)
+        self.assertEqual(incremental.checksum, backup_engine.file_checksum(incremental.file_path))
+        restored = backup_engine.restore_backup(incremental, self.backup_dir / 'restored.sqlite3')
+        self.assertEqual(self.rows(restored), self.rows(self.source))
+
+    def test_delta_without_a_base_falls_back_to_full(self):
+        backup = self.take('differential')
+        self.assertEqual((backup.status, backup.backup_type), ('completed', 'full'))
+        self.assertIn('No base backup found', backup.notes)
+
+    def test_corrupted_archive_is_not_restored(self):
+        backup = self.take('full')
+        with open(backup.file_path, 'ab') as archive:
+            archive.write(b'tampered')
+        with self.assertRaisesMessage(backup_engine.BackupError, 'Checksum mismatch'):
+            backup_engine.restore_backup(backup, self.backup_dir / 'restored.sqlite3')
+
+    def test_failure_is_recorded(self):
+        backup = DatabaseBackup.objects.create(name='bad', backup_type='full', created_by='tests')
+        with mock.patch.object(backup_engine, '_database_path', side_effect=backup_engine.BackupError('not sqlite')):
+            with self.assertRaises(backup_engine.BackupError):
+                backup_engine.run_backup(backup.pk)
+        backup.refresh_from_db()
+        self.assertEqual((backup.status, backup.error_message), ('failed', 'not sqlite'))
+
+
+class BackupApiTests(BackupEngineTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('superadmin'))
+        self.backup = self.take('full')
+
+    def test_superadmin_downloads_the_archive(self):
+        response = self.client.get(f"{BACKUPS_URL}{self.backup.pk}/download/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Checksum-SHA256'], self.backup.checksum)
+        self.assertEqual(b''.join(response.streaming_content), Path(self.backup.file_path).read_bytes())
+
+    def test_other_users_cannot_touch_archives(self):
+        self.client.force_authenticate(make_user('tenant-admin'))
+        self.assertEqual(self.client.get(f"{BACKUPS_URL}{self.backup.pk}/download/").status_code, 403)
+        self.assertEqual(self.client.delete(f"{BACKUPS_URL}{self.backup.pk}/").status_code, 403)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.post(f"{BACKUPS_URL}{self.backup.pk}/start_backup/").status_code, 401)
+
+    def test_archive_fields_cannot_be_written(self):
+        response = self.client.post(BACKUPS_URL, {
+            'name': 'x', 'backup_type': 'full', 'created_by': 'tests',
+            'status': 'completed', 'file_path': '/etc/hostname',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['status'], response.json()['file_path']), ('pending', None))
+
+    def test_paths_outside_backup_dir_are_neither_read_nor_deleted(self):
+        outside = self.backup_dir.parent / 'secret.txt'
+        outside.write_text('secret')
+        DatabaseBackup.objects.filter(pk=self.backup.pk).update(file_path=str(self.backup_dir / '..' / 'secret.txt'))
+
+        self.assertEqual(self.client.get(f"{BACKUPS_URL}{self.backup.pk}/download/").status_code, 400)
+        with self.assertLogs(backup_engine.logger, 'WARNING'):
+            self.assertEqual(self.client.delete(f"{BACKUPS_URL}{self.backup.pk}/").status_code, 204)
+        self.assertTrue(outside.exists())
+
+    def test_start_backup_queues_once(self):
+        pending = DatabaseBackup.objects.create(name='next', backup_type='full', created_by='tests')
+        with mock.patch.object(backup_engine, 'submit') as submit:
+            first = self.client.post(f"{BACKUPS_URL}{pending.pk}/start_backup/")
+            second = self.client.post(f"{BACKUPS_URL}{pending.pk}/start_backup/")
+        self.assertEqual((first.status_code, second.status_code), (200, 409))
+        submit.assert_called_once_with(pending.pk)
+
+    def test_backup_abandoned_mid_run_can_be_retried(self):
+        running = DatabaseBackup.objects.create(name='running', backup_type='full', created_by='tests')
+        with mock.patch.object(backup_engine, 'submit'):
+            self.client.post(f"{BACKUPS_URL}{running.pk}/start_backup/")
+            self.assertEqual(self.client.post(f"{BACKUPS_URL}{running.pk}/start_backup/").status_code, 409)
+            self.assertEqual(self.client.get(f"{BACKUPS_URL}{running.pk}/progress/").json()['status'], 'in_progress')
+
+            # The worker died without recording an outcome
+            DatabaseBackup.objects.filter(pk=running.pk).update(
+                started_at=timezone.now() - backup_engine.BACKUP_STALE_AFTER - timedelta(minutes=1)
+            )
+            progress = self.client.get(f"{BACKUPS_URL}{running.pk}/progress/").json()
+            self.assertEqual((progress['status'], progress['phase']), ('failed', 'failed'))
+            self.assertEqual(self.client.post(f"{BACKUPS_URL}{running.pk}/start_backup/").status_code, 200)
+
+        running.refresh_from_db()
+        self.assertEqual((running.status, running.error_message), ('in_progress', None))
+        self.assertGreater(running.started_at, timezone.now() - timedelta(minutes=1))
@@ -0,0 +1,53 @@
+from django.test import TestCase
+
+from lab.components.Doctor.NewTestRequest.NewTestRequest_models import TestRequest
+from lab.field_tracking import tracked_fields_changed
+
+
+class FieldTrackingTests(TestCase):
+    def setUp(self):
+        self.request = TestRequest.objects.create(patient_name='Ada', test_type='CBC')
+        self.received = []
+        tracked_fields_changed.connect(self.record, sender=TestRequest)
+        self.addCleanup(tracked_fields_changed.disconnect, self.record, sender=TestRequest)
+
+    def record(self, sender, instance, changes, bulk, **kwargs):
+        self.received.append((instance.pk, changes, bulk))
+
+    def test_save_reports_change_without_reading_the_row(self):
+        request = TestRequest.objects.get(pk=self.request.pk)
+        request.status = 'Approved'
+        with self.assertNumQueries(1):
+            request.save()
+        self.assertEqual(self.received, [(request.pk, {'status': ('Pending', 'Approved')}, False)])
+
+    def test_snapshot_moves_forward_after_save(self):
+        request = TestRequest.objects.get(pk=self.request.pk)
+        request.status = 'Approved'
+        request.save()
+        request.status = 'Completed'
+        request.save()
+        self.assertEqual([changes for _, changes, _ in self.received], [
+            {'status': ('Pending', 'Approved')}, {'status': ('Approved', 'Completed')},
+        ])
+
+    def test_unchanged_or_excluded_fields_are_not_reported(self):
+        request = TestRequest.objects.get(pk=self.request.pk)
+        request.notes = 'fasting'
+        request.save()
+        request.status = 'Approved'
+        request.save(update_fields=['notes'])
+        self.assertEqual(self.received, [])
+
+    def test_creation_is_not_a_change(self):
+        TestRequest.objects.create(patient_name='Grace', status='Approved')
+        self.assertEqual(self.received, [])
+
+    def test_queryset_update_reports_each_changed_row(self):
+        other = TestRequest.objects.create(patient_name='Grace', status='Approved')
+        TestRequest.objects.filter(pk__in=[self.request.pk, other.pk]).update(status='Approved')
+        self.assertEqual(self.received, [(self.request.pk, {'status': ('Pending', 'Approved')}, True)])
+
+    def test_update_of_untracked_field_is_not_reported(self):
+        TestRequest.objects.filter(pk=self.request.pk).update(notes='fasting')
+        self.assertEqual(self.received, [])
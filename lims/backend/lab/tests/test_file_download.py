@@ -0,0 +1,86 @@
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from lab.components.FileManagement import file_streaming
+from lab.components.FileManagement.file_models import FileUpload
+from lab.components.FileManagement.file_streaming import parse_range
+
+from .utils import make_user, temporary_media
+
+CONTENT = bytes(range(256)) * 4
+
+
+def body(response):
+    return b''.join(response.streaming_content)
+
+
+class FileDownloadTests(TestCase):
+    def setUp(self):
+        self.enterContext(temporary_media())
+        self.owner = make_user('doctor')
+        self.upload = FileUpload(name='report.bin', file_type='other', file_size=len(CONTENT), uploaded_by=self.owner)
+        self.upload.file.save('report.bin', ContentFile(CONTENT))
+        self.url = f"/api/files/files/{self.upload.pk}/download/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def download_count(self):
+        self.upload.refresh_from_db()
+        return self.upload.download_count
+
+    def test_full_download_streams_the_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body(response), CONTENT)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="report.bin"')
+        self.assertEqual(self.download_count(), 1)
+
+    def test_range_resume_is_partial_and_not_counted(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1000-')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 1000-1023/{len(CONTENT)}')
+        self.assertEqual(body(response), CONTENT[1000:])
+        self.assertEqual(self.download_count(), 0)
+
+    def test_stale_if_range_sends_the_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_revalidation_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.download_count(), 1)
+
+    def test_unsatisfiable_range_is_416(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=5000-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_other_users_are_refused(self):
+        self.client.force_authenticate(make_user())
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_offload_hands_the_transfer_to_the_web_server(self):
+        with mock.patch.object(file_streaming, 'DOWNLOAD_OFFLOAD', 'x-accel-redirect'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + self.upload.file.name)
+        self.assertEqual(response.content, b'')
+
+
+class ParseRangeTests(TestCase):
+    def test_forms(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-2000', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1000))
+        self.assertIsNone(parse_range(None, 1000))
+
+    def test_unsatisfiable(self):
+        for header in ('bytes=1000-', 'bytes=-0', 'bytes=9-3'):
+            with self.assertRaises(ValueError):
+                parse_range(header, 1000)
@@ -0,0 +1,85 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from lab import id_generator
+from lab.components.tenantadmin.EquipmentManagement.equipment_models import Equipment
+from lab.id_generator import new_id
+
+from .utils import make_tenant
+
+EQUIPMENT_URL = '/api/equipment/'
+ULID = re.compile(r'^[0-9A-HJKMNP-TV-Z]{26}$')
+MILLISECOND = 1_000_000
+
+
+class NewIdTests(SimpleTestCase):
+    def setUp(self):
+        self.enterContext(mock.patch.dict(id_generator._last, clear=True))
+
+    def test_ids_are_prefixed_crockford_ulids(self):
+        value = new_id('RCP')
+        self.assertTrue(value.startswith('RCP'))
+        self.assertRegex(value[3:], ULID)
+        self.assertRegex(new_id(), ULID)
+
+    def test_ids_sort_by_creation_within_a_millisecond(self):
+        with mock.patch.object(id_generator.time, 'time_ns', return_value=1_700_000_000_000 * MILLISECOND):
+            ids = [new_id('S') for _ in range(100)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 100)
+        self.assertEqual({value[1:11] for value in ids}, {ids[0][1:11]})
+
+    def test_clock_stepping_back_keeps_counting_up(self):
+        clock = mock.patch.object(id_generator.time, 'time_ns')
+        with clock as time_ns:
+            time_ns.return_value = 1_700_000_000_500 * MILLISECOND
+            before = new_id('S')
+            time_ns.return_value = 1_700_000_000_000 * MILLISECOND
+            after = new_id('S')
+        self.assertLess(before, after)
+
+    def test_random_overflow_moves_to_the_next_millisecond(self):
+        millis = 1_700_000_000_000
+        largest = (1 << id_generator.RANDOM_BITS) - 1
+        id_generator._last['S'] = (millis, largest)
+        with mock.patch.object(id_generator.time, 'time_ns', return_value=millis * MILLISECOND):
+            value = new_id('S')
+        self.assertEqual(id_generator._last['S'][0], millis + 1)
+        self.assertGreater(value, 'S' + id_generator._encode((millis << id_generator.RANDOM_BITS) | largest))
+
+    def test_threads_never_collide(self):
+        with ThreadPoolExecutor(8) as pool:
+            ids = list(pool.map(lambda _: new_id('T'), range(2000)))
+        self.assertEqual(len(set(ids)), 2000)
+
+    def test_fork_starts_a_fresh_sequence(self):
+        new_id('S')
+        id_generator._reset_after_fork()
+        self.assertEqual(id_generator._last, {})
+
+
+class GeneratedPrimaryKeyTests(TestCase):
+    def equipment(self, serial_number, **fields):
+        data = {
+            'name': 'Analyzer', 'type': 'laboratory', 'category': 'Hematology', 'serial_number': serial_number,
+            'manufacturer': 'Acme', 'model': 'A1', 'location': 'Lab 1', 'purchase_date': '2026-01-05',
+        }
+        data.update(fields)
+        return self.client.post(EQUIPMENT_URL, data, content_type='application/json')
+
+    def test_created_rows_get_generated_ids(self):
+        tenant = make_tenant()
+        first = self.equipment('SN-1', tenant=tenant.id).json()['equipment']['id']
+        second = self.equipment('SN-2', tenant=tenant.id).json()['equipment']['id']
+        self.assertRegex(first, r'^EQ[0-9A-Z]{26}$')
+        self.assertLess(first, second)
+        self.assertEqual(list(Equipment.objects.order_by('pk').values_list('serial_number', flat=True)),
+                         ['SN-1', 'SN-2'])
+
+    def test_rejected_create_stores_nothing(self):
+        response = self.equipment('SN-1', tenant=0)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Equipment.objects.exists())
@@ -0,0 +1,114 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from lab.components.Inventory.inventory_ledger import InsufficientStock, apply_adjustments
+from lab.components.Inventory.inventory_models import InventoryItem, InventoryTransaction
+
+from .utils import make_item, make_user
+
+ITEMS_URL = '/api/inventory/items/'
+
+
+class InventoryLedgerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('technician', username='tech'))
+        self.gloves = make_item(20)
+        self.swabs = make_item(3)
+
+    def test_bulk_adjust_applies_every_delta_and_logs_it(self):
+        response = self.client.post(ITEMS_URL + 'bulk_adjust/', {'adjustments': [
+            {'item': self.gloves.pk, 'quantity': -16, 'transaction_type': 'out'},
+            {'item': self.swabs.pk, 'quantity': 10, 'transaction_type': 'in', 'reference_number': 'PO-1'},
+            {'item': self.swabs.pk, 'quantity': -1},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        items = {item['id']: item for item in response.json()['items']}
+        self.assertEqual((items[self.gloves.pk]['quantity'], items[self.gloves.pk]['status']), (4, 'low-stock'))
+        self.assertEqual((items[self.swabs.pk]['quantity'], items[self.swabs.pk]['status']), (12, 'in-stock'))
+        self.assertEqual(
+            sorted(InventoryTransaction.objects.values_list('transaction_type', 'quantity', 'performed_by')),
+            [('adjustment', -1, 'tech'), ('in', 10, 'tech'), ('out', -16, 'tech')],
+        )
+
+    def test_adjust_quantity_to_zero_marks_out_of_stock(self):
+        response = self.client.post(
+            f"{ITEMS_URL}{self.swabs.pk}/adjust_quantity/", {'quantity': -3}, format='json'
+        )
+        self.assertEqual(response.json()['stock_status'], 'out-of-stock')
+        self.assertEqual(InventoryItem.objects.get(pk=self.swabs.pk).quantity, 0)
+
+    def test_shortage_rejects_the_whole_batch(self):
+        response = self.client.post(ITEMS_URL + 'bulk_adjust/', {'adjustments': [
+            {'item': self.gloves.pk, 'quantity': -5},
+            {'item': self.swabs.pk, 'quantity': -2},
+            {'item': self.swabs.pk, 'quantity': -2},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['available'], {str(self.swabs.pk): 3})
+        self.assertEqual(InventoryItem.objects.get(pk=self.gloves.pk).quantity, 20)
+        self.assertFalse(InventoryTransaction.objects.exists())
+
+    def test_rejects_malformed_and_unknown_items(self):
+        for adjustments in ([{'item': self.gloves.pk, 'quantity': 1.5}],
+                            [{'item': self.gloves.pk, 'quantity': 1, 'transaction_type': 'gift'}],
+                            ['gloves'], []):
+            with self.subTest(adjustments=adjustments):
+                response = self.client.post(ITEMS_URL + 'bulk_adjust/', {'adjustments': adjustments}, format='json')
+                self.assertEqual(response.status_code, 400)
+        response = self.client.post(ITEMS_URL + 'bulk_adjust/', {'adjustments': [{'item': 0, 'quantity': 1}]},
+                                    format='json')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(InventoryItem.objects.get(pk=self.gloves.pk).quantity, 20)
+
+    def test_stock_alerts_lists_low_and_out_of_stock_items(self):
+        make_item(0, tenant='t1')
+        names = {item['id'] for item in self.client.get(ITEMS_URL + 'stock_alerts/').json()}
+        self.assertEqual(len(names), 2)
+        self.assertIn(self.swabs.pk, names)
+        self.assertEqual(len(self.client.get(ITEMS_URL + 'stock_alerts/', {'tenant': 't1'}).json()), 1)
+
+
+class ConcurrentLedgerTests(TransactionTestCase):
+    workers = 8
+
+    def withdraw(self, item, start):
+        """Take one unit, retrying while another writer holds the database"""
+        start.wait()
+        try:
+            while True:
+                try:
+                    apply_adjustments([{'item': item.pk, 'quantity': -1}], 'worker', 'out')
+                    return True
+                except InsufficientStock:
+                    return False
+                except OperationalError:
+                    continue
+        finally:
+            connection.close()
+
+    def run_withdrawals(self, item, count):
+        start = threading.Barrier(min(count, self.workers))
+        with ThreadPoolExecutor(self.workers) as pool:
+            return list(pool.map(lambda _: self.withdraw(item, start), range(count)))
+
+    def test_concurrent_withdrawals_are_not_lost(self):
+        item = make_item(40)
+        self.assertTrue(all(self.run_withdrawals(item, 24)))
+        item.refresh_from_db()
+        self.assertEqual(item.quantity, 16)
+        self.assertEqual(InventoryTransaction.objects.filter(item=item).count(), 24)
+
+    def test_concurrent_withdrawals_never_overdraw(self):
+        item = make_item(5)
+        results = self.run_withdrawals(item, 16)
+        self.assertEqual(results.count(True), 5)
+        item.refresh_from_db()
+        self.assertEqual((item.quantity, item.status), (0, 'out-of-stock'))
+        self.assertEqual(InventoryTransaction.objects.filter(item=item).count(), 5)
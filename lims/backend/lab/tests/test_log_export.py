@@ -0,0 +1,71 @@
+import csv
+import gzip
+import io
+import json
+
+from django.test import TestCase
+
+from lab.components.Analytics.analytics_export import iter_rows
+from lab.components.Analytics.analytics_models import SystemLog
+
+EXPORT_URL = '/api/analytics/system-logs/export/'
+
+
+def content(response):
+    return b''.join(response.streaming_content)
+
+
+class LogExportTests(TestCase):
+    def setUp(self):
+        self.logs = [
+            SystemLog.objects.create(
+                user='tech', action=f"action {number}", level='error' if number % 2 else 'info',
+                details='with "quotes", commas' if number == 1 else None,
+            )
+            for number in range(5)
+        ]
+
+    def test_iter_rows_reads_in_keyset_batches(self):
+        with self.assertNumQueries(3):
+            rows = list(iter_rows(SystemLog.objects.all(), ['action'], batch_size=2))
+        self.assertEqual([row['action'] for row in rows], [f"action {number}" for number in range(5)])
+
+    def test_streams_each_format(self):
+        response = self.client.get(EXPORT_URL, {'export_format': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('.csv"', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(content(response).decode())))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[1]['details'], 'with "quotes", commas')
+        self.assertEqual(rows[0]['details'], '')
+
+        lines = content(self.client.get(EXPORT_URL, {'export_format': 'ndjson'})).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [log.id for log in self.logs])
+
+        data = json.loads(content(self.client.get(EXPORT_URL)))
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]['action'], 'action 0')
+
+    def test_filters_and_gzip(self):
+        response = self.client.get(EXPORT_URL, {'export_format': 'ndjson', 'level': 'error', 'gzip': 'true'})
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('.ndjson.gz"', response['Content-Disposition'])
+        lines = gzip.decompress(content(response)).decode().splitlines()
+        self.assertEqual([json.loads(line)['level'] for line in lines], ['error', 'error'])
+
+    def test_limit_pages_with_next_after_id(self):
+        response = self.client.get(EXPORT_URL, {'limit': 2})
+        self.assertEqual([row['id'] for row in json.loads(content(response))], [log.id for log in self.logs[:2]])
+        after_id = response['X-Next-After-Id']
+
+        response = self.client.get(EXPORT_URL, {'limit': 3, 'after_id': after_id})
+        self.assertEqual([row['id'] for row in json.loads(content(response))], [log.id for log in self.logs[2:]])
+        self.assertFalse(response.has_header('X-Next-After-Id'))
+
+    def test_rejects_bad_parameters(self):
+        for params in ({'export_format': 'xml'}, {'limit': 0}, {'after_id': 'last'}, {'start': 'yesterday'}):
+            with self.subTest(params=params):
+                response = self.client.get(EXPORT_URL, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
@@ -0,0 +1,92 @@
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from lab.components.Analytics import log_retention
+from lab.components.Analytics.analytics_models import SystemLog
+from lab.components.Analytics.log_retention import partition_path, prune, read_archive
+from lab.components.superadmin.models import SystemLog as SuperAdminSystemLog
+
+ARCHIVED_URL = '/api/analytics/system-logs/archived/'
+
+
+def log(model, level, age_days, **fields):
+    entry = model.objects.create(level=level, user='tech', action=f"{level} {age_days}d", **fields)
+    model.objects.filter(pk=entry.pk).update(created_at=timezone.now() - timedelta(days=age_days))
+    return entry
+
+
+class LogRetentionTests(TestCase):
+    def setUp(self):
+        archive_dir = Path(self.enterContext(tempfile.TemporaryDirectory()))
+        self.enterContext(mock.patch.object(log_retention, 'LOG_ARCHIVE_DIR', archive_dir))
+        self.enterContext(mock.patch.object(log_retention.time, 'sleep'))
+
+        self.kept = [log(SystemLog, 'info', 10), log(SystemLog, 'error', 100)]
+        self.expired = [
+            log(SystemLog, 'info', 40, details='disk nearly full'),
+            log(SystemLog, 'warning', 100),
+            log(SystemLog, 'success', 45),
+        ]
+        log(SuperAdminSystemLog, 'critical', 1000, message='kept forever')
+        log(SuperAdminSystemLog, 'debug', 8, message='expired')
+
+    def test_prunes_expired_rows_into_day_partitions(self):
+        self.assertEqual(prune(SystemLog, batch_size=2), 3)
+
+        self.assertEqual(
+            sorted(SystemLog.objects.values_list('pk', flat=True)), sorted(entry.pk for entry in self.kept)
+        )
+        day = timezone.localdate(timezone.now() - timedelta(days=100))
+        self.assertTrue(partition_path(SystemLog, day).exists())
+        archived = list(read_archive(SystemLog, day, timezone.localdate()))
+        # Newest first: 40, 45 then 100 days old
+        self.assertEqual(
+            [row['id'] for row in archived], [self.expired[0].pk, self.expired[2].pk, self.expired[1].pk]
+        )
+
+    def test_archived_endpoint_filters_rows(self):
+        prune(SystemLog)
+        start = (timezone.localdate() - timedelta(days=120)).isoformat()
+
+        response = self.client.get(ARCHIVED_URL, {'start': start, 'search': 'DISK'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.json()], [self.expired[0].pk])
+        rows = self.client.get(ARCHIVED_URL, {'start': start, 'level': 'warning'}).json()
+        self.assertEqual([row['id'] for row in rows], [self.expired[1].pk])
+        self.assertEqual(len(self.client.get(ARCHIVED_URL, {'start': start, 'limit': 2}).json()), 2)
+
+    def test_command_dry_run_and_no_archive(self):
+        out = StringIO()
+        call_command('prune_system_logs', dry_run=True, stdout=out)
+        self.assertIn('analytics: 3 log rows would be pruned', out.getvalue())
+        self.assertIn('superadmin: 1 log rows would be pruned', out.getvalue())
+        self.assertEqual(SystemLog.objects.count(), 5)
+
+        call_command('prune_system_logs', table='superadmin', no_archive=True, stdout=StringIO())
+        self.assertEqual(list(SuperAdminSystemLog.objects.values_list('level', flat=True)), ['critical'])
+        self.assertFalse(any(log_retention.LOG_ARCHIVE_DIR.iterdir()))
+        self.assertEqual(SystemLog.objects.count(), 5)
+
+    def test_rows_stay_when_the_archive_cannot_be_written(self):
+        with mock.patch.object(log_retention, '_archive_rows', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                prune(SystemLog)
+        self.assertEqual(SystemLog.objects.count(), 5)
+
+    def test_rejects_bad_parameters(self):
+        for params in ({'start': '2026-02-01', 'end': '2026-01-01'}, {'end': 'today'}, {'limit': 'all'}, {'limit': 0},
+                       {'start': '2024-12-31', 'end': '2026-01-01'}):
+            with self.subTest(params=params):
+                response = self.client.get(ARCHIVED_URL, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+        self.assertEqual(self.client.get(ARCHIVED_URL, {'start': '2025-01-01', 'end': '2026-01-01'}).status_code, 200)
+        with self.assertRaises(CommandError):
+            call_command('prune_system_logs', '--table=audit')
@@ -0,0 +1,66 @@
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.core.cache import cache
+from django.test import TestCase
+
+from lab.components.TenantAccessAuth.hashers import TunablePBKDF2PasswordHasher
+
+from .utils import make_user, shared_cache
+
+LOGIN_URL = '/api/login/'
+
+
+class LoginTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        patcher = mock.patch.object(TunablePBKDF2PasswordHasher, 'iterations', 1000)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user = make_user('doctor', password='s3cret', tenant='t1')
+
+    def test_login_by_email_or_username_returns_tokens(self):
+        for identifier in (self.user.email, self.user.username):
+            response = self.client.post(LOGIN_URL, {'email': identifier, 'password': 's3cret'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['tenant'], {'name': 't1'})
+            self.assertIn('access', response.json())
+
+    def test_lookup_is_one_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(authenticate(email=self.user.email, password='s3cret'), self.user)
+
+    def test_wrong_password_is_rejected(self):
+        response = self.client.post(LOGIN_URL, {'email': self.user.email, 'password': 'nope'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_missing_fields_are_rejected(self):
+        response = self.client.post(LOGIN_URL, {'email': self.user.email})
+        self.assertEqual(response.status_code, 400)
+
+    def test_unknown_identifier_is_remembered_until_it_is_registered(self):
+        self.enterContext(shared_cache())
+        self.assertIsNone(authenticate(email='new@example.com', password='s3cret'))
+        with self.assertNumQueries(0):
+            self.assertIsNone(authenticate(email='new@example.com', password='s3cret'))
+
+        user = make_user(email='new@example.com', password='s3cret')
+        self.assertEqual(authenticate(email='new@example.com', password='s3cret'), user)
+
+    def test_unknown_identifier_is_not_remembered_per_process(self):
+        self.assertIsNone(authenticate(email='new@example.com', password='s3cret'))
+        # Another worker creates the account; this process never sees the signal
+        with mock.patch('lab.components.TenantAccessAuth.Login.login_signals.forget_unknown_identifiers'):
+            user = make_user(email='new@example.com', password='s3cret')
+        self.assertEqual(authenticate(email='new@example.com', password='s3cret'), user)
+
+    def test_inactive_user_cannot_log_in(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(authenticate(email=self.user.email, password='s3cret'))
+
+    def test_changed_work_factor_rehashes_on_login(self):
+        with mock.patch.object(TunablePBKDF2PasswordHasher, 'iterations', 2000):
+            authenticate(email=self.user.email, password='s3cret')
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$2000$'))
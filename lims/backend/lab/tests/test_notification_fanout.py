@@ -0,0 +1,57 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from lab.components.Notifications.notification_models import Notification
+from lab.components.Notifications.notification_service import NotificationService
+
+from .utils import make_user
+
+
+class GlobalNotificationFanOutTests(TestCase):
+    def setUp(self):
+        self.doctors = [make_user('doctor') for _ in range(5)]
+        self.patient = make_user('patient')
+        make_user('doctor', is_active=False)
+
+    def announce(self, **kwargs):
+        return NotificationService.create_global_notification(title='Maintenance', message='Tonight', **kwargs)
+
+    def test_writes_one_row_per_targeted_user_in_batches(self):
+        with mock.patch.object(NotificationService, 'FANOUT_BATCH_SIZE', 2), \
+                mock.patch.object(Notification.objects, 'bulk_create', wraps=Notification.objects.bulk_create) as bulk:
+            result = self.announce(target_audience='roles', target_roles=['doctor'])
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['delivered_count'], 5)
+        self.assertEqual(bulk.call_count, 3)
+        self.assertEqual(
+            set(Notification.objects.filter(recipient__isnull=False).values_list('recipient_id', flat=True)),
+            {user.id for user in self.doctors},
+        )
+
+    def test_all_audience_skips_inactive_users(self):
+        result = self.announce()
+        self.assertEqual(result['delivered_count'], 6)
+
+    def test_unknown_audience_reaches_nobody(self):
+        result = self.announce(target_audience='specific')
+        self.assertTrue(result['success'])
+        self.assertEqual(result['delivered_count'], 0)
+
+    def test_failed_batch_rolls_back_earlier_batches(self):
+        bulk_create = Notification.objects.bulk_create
+
+        def fail_second_batch(batch, **kwargs):
+            if Notification.objects.filter(recipient__isnull=False).exists():
+                raise RuntimeError('disk full')
+            return bulk_create(batch, **kwargs)
+
+        with mock.patch.object(NotificationService, 'FANOUT_BATCH_SIZE', 2), \
+                mock.patch.object(Notification.objects, 'bulk_create', side_effect=fail_second_batch), \
+                self.assertLogs('lab.components.Notifications.notification_service', 'ERROR'):
+            result = self.announce()
+
+        self.assertFalse(result['success'])
+        self.assertIn('disk full', result['error'])
+        self.assertFalse(Notification.objects.filter(recipient__isnull=False).exists())
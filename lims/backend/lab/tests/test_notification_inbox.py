@@ -0,0 +1,101 @@
+import tempfile
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from lab.components.Notifications import notification_cache
+from lab.components.Notifications.notification_models import Notification
+from lab.components.Notifications.notification_service import NotificationService
+
+from .utils import make_user, shared_cache
+
+INBOX_URL = '/api/notifications/notifications/inbox/'
+
+
+def notify(user, count, **fields):
+    return [
+        Notification.objects.create(title=f"n{index}", message='m', recipient=user, **fields)
+        for index in range(count)
+    ]
+
+
+class InboxTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_returns_only_newer_notifications(self):
+        notifications = notify(self.user, 3)
+        notify(make_user(), 1)
+
+        first = self.client.get(INBOX_URL, {'limit': 2}).json()
+        self.assertEqual([row['id'] for row in first['results']], [n.id for n in notifications[:2]])
+        self.assertTrue(first['has_more'])
+        self.assertEqual(first['unread_count'], 3)
+
+        second = self.client.get(INBOX_URL, {'since': first['cursor'], 'limit': 2}).json()
+        self.assertEqual([row['id'] for row in second['results']], [notifications[2].id])
+        self.assertFalse(second['has_more'])
+
+    def test_limit_is_clamped(self):
+        notify(self.user, 2)
+        response = self.client.get(INBOX_URL, {'limit': -5})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['results']), 1)
+
+    def test_non_integer_cursor_is_rejected(self):
+        response = self.client.get(INBOX_URL, {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+
+
+class UnreadCountTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+
+    def test_local_cache_counts_in_the_database(self):
+        notify(self.user, 2)
+        self.assertEqual(notification_cache.get_unread_count(self.user.id), 2)
+        Notification.objects.filter(recipient=self.user).update(is_read=True)
+        with self.assertNumQueries(1):
+            self.assertEqual(notification_cache.get_unread_count(self.user.id), 0)
+
+    def test_shared_cache_keeps_counters_in_step(self):
+        with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }):
+            notify(self.user, 2, tenant='t1')
+            self.assertEqual(notification_cache.get_unread_count(self.user.id), 2)
+            with self.assertNumQueries(0):
+                self.assertEqual(notification_cache.get_unread_count(self.user.id), 2)
+
+            notification_cache.increment(self.user.id, 't1')
+            notification_cache.decrement(self.user.id, delta=2)
+            self.assertEqual(notification_cache.get_unread_count(self.user.id), 1)
+
+            # A counter driven below zero is dropped and recounted
+            notification_cache.decrement(self.user.id, delta=5)
+            self.assertEqual(notification_cache.get_unread_count(self.user.id), 2)
+            cache.clear()
+
+    def test_counter_follows_committed_notifications_only(self):
+        self.enterContext(shared_cache())
+        self.assertEqual(notification_cache.get_unread_count(self.user.id), 0)
+        try:
+            with transaction.atomic():
+                NotificationService.create_notification('t', 'm', recipient_id=self.user.id)
+                raise RuntimeError('abort')
+        except RuntimeError:
+            pass
+        with self.assertNumQueries(0):
+            self.assertEqual(notification_cache.get_unread_count(self.user.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = NotificationService.create_notification('t', 'm', recipient_id=self.user.id)
+        self.assertEqual(notification_cache.get_unread_count(self.user.id), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            NotificationService.mark_notification_as_read(notification.id, self.user.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(notification_cache.get_unread_count(self.user.id), 0)
@@ -0,0 +1,127 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from lab.components.Notifications import notification_dispatch
+from lab.components.Notifications.notification_dispatch import (
+    EVENT_HANDLERS, dispatch_pending, enqueue, prune_processed,
+)
+from lab.components.Notifications.notification_models import NotificationOutbox
+
+from .utils import make_user
+
+
+@mock.patch.object(notification_dispatch, 'OUTBOX_WORKERS', 0)
+class OutboxProducerTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+
+    def test_events_are_written_once_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue('appointment_status_changed', self.user, old_status='Scheduled', new_status='Confirmed')
+            enqueue('appointment_status_changed', self.user, old_status='Confirmed', new_status='Completed')
+            self.assertFalse(NotificationOutbox.objects.exists())
+
+        row = NotificationOutbox.objects.get()
+        self.assertEqual(row.status, 'pending')
+        self.assertEqual(row.payload, {'old_status': 'Scheduled', 'new_status': 'Completed'})
+
+    def test_round_trip_transition_is_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue('appointment_status_changed', self.user, old_status='Scheduled', new_status='Confirmed')
+            enqueue('appointment_status_changed', self.user, old_status='Confirmed', new_status='Scheduled')
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_rolled_back_savepoint_writes_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    enqueue('message_created', self.user)
+                    raise RuntimeError('abort')
+            except RuntimeError:
+                pass
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+
+class OutboxDispatchTests(TestCase):
+    def setUp(self):
+        self.user = make_user()
+
+    def add_row(self, event='test_event'):
+        return NotificationOutbox.objects.create(
+            event=event, model_label='tenantaccess_login.user', object_id=str(self.user.pk),
+            dedupe_key=f"{event}:tenantaccess_login.user:{self.user.pk}",
+        )
+
+    def test_delivered_rows_are_marked_done(self):
+        handler = mock.Mock(return_value={'success': True})
+        row = self.add_row()
+        with mock.patch.dict(EVENT_HANDLERS, {'test_event': handler}):
+            self.assertEqual(dispatch_pending(), 1)
+
+        handler.assert_called_once_with(self.user, {})
+        row.refresh_from_db()
+        self.assertEqual(row.status, 'done')
+        self.assertIsNotNone(row.processed_at)
+
+    def test_failed_delivery_is_retried_then_given_up(self):
+        row = self.add_row()
+        handler = mock.Mock(return_value={'success': False, 'error': 'smtp down'})
+        with mock.patch.dict(EVENT_HANDLERS, {'test_event': handler}), \
+                mock.patch.object(notification_dispatch, 'OUTBOX_MAX_ATTEMPTS', 2), \
+                self.assertLogs(notification_dispatch.logger, 'ERROR'):
+            dispatch_pending()
+            row.refresh_from_db()
+            self.assertEqual((row.status, row.attempts, row.last_error), ('pending', 1, 'smtp down'))
+            # The retry waits out its backoff
+            self.assertEqual(dispatch_pending(), 0)
+            dispatch_pending(due_before=row.next_attempt_at)
+
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('failed', 2))
+        self.assertEqual(handler.call_count, 2)
+
+    def test_retries_back_off_exponentially(self):
+        row = self.add_row()
+        failing = {'test_event': mock.Mock(return_value=None)}
+        delays = []
+        with mock.patch.dict(EVENT_HANDLERS, failing), self.assertLogs(notification_dispatch.logger, 'ERROR'):
+            for _ in range(3):
+                before = timezone.now()
+                dispatch_pending(due_before=row.next_attempt_at)
+                row.refresh_from_db()
+                delays.append(row.next_attempt_at - before)
+        base = notification_dispatch.OUTBOX_RETRY_DELAY
+        for delay, expected in zip(delays, (base, base * 2, base * 4)):
+            self.assertGreaterEqual(delay, expected)
+            self.assertLess(delay, expected + timedelta(seconds=5))
+        self.assertEqual(notification_dispatch.retry_delay(50), notification_dispatch.OUTBOX_MAX_RETRY_DELAY)
+
+    @mock.patch.object(notification_dispatch, 'OUTBOX_RETRY_DELAY', timedelta(0))
+    def test_drain_does_not_reclaim_rows_that_failed_during_it(self):
+        self.add_row()
+        handler = mock.Mock(return_value=None)
+        with mock.patch.dict(EVENT_HANDLERS, {'test_event': handler}), \
+                self.assertLogs(notification_dispatch.logger, 'ERROR'):
+            notification_dispatch._background_drain()
+        handler.assert_called_once()
+        self.assertEqual(NotificationOutbox.objects.get().attempts, 1)
+
+    def test_handler_returning_none_is_not_delivered(self):
+        row = self.add_row()
+        with mock.patch.dict(EVENT_HANDLERS, {'test_event': mock.Mock(return_value=None)}), \
+                self.assertLogs(notification_dispatch.logger, 'ERROR'):
+            dispatch_pending()
+        row.refresh_from_db()
+        self.assertEqual(row.status, 'pending')
+
+    def test_prune_keeps_recent_and_undelivered_rows(self):
+        old, recent, pending = self.add_row('a'), self.add_row('b'), self.add_row('c')
+        NotificationOutbox.objects.filter(pk=old.pk).update(status='done', processed_at=timezone.now() - timedelta(days=30))
+        NotificationOutbox.objects.filter(pk=recent.pk).update(status='done', processed_at=timezone.now())
+
+        self.assertEqual(prune_processed(), 1)
+        self.assertEqual(set(NotificationOutbox.objects.values_list('pk', flat=True)), {recent.pk, pending.pk})
@@ -0,0 +1,58 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.test import TestCase
+
+from lab.components.Notifications import notification_stream
+from lab.components.Notifications.notification_models import Notification
+from lab.components.TenantAccessAuth.authentication import ClaimsRefreshToken
+
+from .utils import make_user
+
+STREAM_URL = '/api/notifications/stream/'
+
+
+async def next_event(stream):
+    return await asyncio.wait_for(stream.__anext__(), 5)
+
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        self.user = make_user(tenant='t1')
+        self.token = str(ClaimsRefreshToken.for_user(self.user).access_token)
+
+    def test_wsgi_requests_are_refused(self):
+        response = self.client.get(STREAM_URL, {'token': self.token})
+        self.assertEqual(response.status_code, 501)
+
+    async def test_invalid_token_is_rejected(self):
+        response = await self.async_client.get(STREAM_URL, {'token': 'not-a-jwt'})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_replays_missed_then_pushes_new_notifications(self):
+        missed = await Notification.objects.acreate(title='missed', message='m', recipient=self.user)
+        await Notification.objects.acreate(title='other user', message='m', recipient=await sync_to_async(make_user)())
+        response = await self.async_client.get(STREAM_URL, {'token': self.token, 'last_event_id': missed.id - 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+
+        self.assertEqual(await next_event(stream), b'retry: 5000\n\n')
+        self.assertIn(f"id: {missed.id}\n".encode(), await next_event(stream))
+
+        tenant_wide = await Notification.objects.acreate(title='tenant', message='m', tenant='t1')
+        pending = asyncio.ensure_future(next_event(stream))
+        await asyncio.sleep(0)
+        notification_stream.publish([tenant_wide])
+        event = await pending
+        self.assertIn(f"id: {tenant_wide.id}\n".encode(), event)
+        self.assertIn(b'"title": "tenant"', event)
+        await stream.aclose()
+
+
+class ChannelTests(TestCase):
+    def test_channels_follow_the_addressee(self):
+        user = make_user()
+        self.assertEqual(notification_stream.channels_for(Notification(recipient=user)), [f"user:{user.id}"])
+        self.assertEqual(notification_stream.channels_for(Notification(tenant='t1')), ['tenant:t1'])
+        self.assertEqual(notification_stream.channels_for(Notification(is_global=True)), [])
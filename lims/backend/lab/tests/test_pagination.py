@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from lab import pagination
+from lab.components.Analytics.analytics_models import SystemLog
+from lab.pagination import CreatedAtCursorPagination
+
+LOGS_URL = '/api/analytics/system-logs/'
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        # Half the rows share a timestamp, so the cursor must break ties on pk
+        stamp = timezone.now()
+        self.logs = [SystemLog.objects.create(user='tech', action=f"action {number}") for number in range(6)]
+        SystemLog.objects.filter(pk__in=[log.pk for log in self.logs[:3]]).update(created_at=stamp)
+
+    def pages(self, url, params):
+        ids = []
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            ids.append([row['id'] for row in data['results']])
+            url, params = data['next'], None
+        return ids
+
+    def test_walks_every_row_once_newest_first(self):
+        pages = self.pages(LOGS_URL, {'page_size': 2, 'ordering': 'level'})
+        self.assertEqual([len(page) for page in pages], [2, 2, 2])
+        self.assertEqual(sum(pages, []), [log.pk for log in reversed(self.logs)])
+
+    def test_rows_added_while_paging_do_not_shift_pages(self):
+        first = self.client.get(LOGS_URL, {'page_size': 3}).json()
+        SystemLog.objects.create(user='tech', action='late')
+        second = self.client.get(first['next']).json()
+        self.assertEqual([row['id'] for row in second['results']], [log.pk for log in reversed(self.logs[:3])])
+        self.assertIsNone(second['next'])
+
+    def test_paging_is_opt_in(self):
+        data = self.client.get(LOGS_URL).json()
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 6)
+        with mock.patch.object(pagination, 'API_PAGINATE_BY_DEFAULT', True):
+            self.assertIn('results', self.client.get(LOGS_URL).json())
+            self.assertIsInstance(self.client.get(LOGS_URL, {'paginate': 'false'}).json(), list)
+
+    def test_models_without_created_at_page_on_pk(self):
+        groups = [Group.objects.create(name=f"group {number}") for number in range(3)]
+        paginator = CreatedAtCursorPagination()
+        request = Request(APIRequestFactory().get('/', {'page_size': 2}))
+        self.assertEqual(paginator.paginate_queryset(Group.objects.all(), request), [groups[2], groups[1]])
+        self.assertTrue(paginator.has_next)
+
+        request = Request(APIRequestFactory().get('/', {'cursor': paginator.encode_cursor(groups[1])}))
+        self.assertEqual(paginator.paginate_queryset(Group.objects.all(), request), [groups[0]])
+        self.assertFalse(paginator.has_next)
+
+    def test_rejects_malformed_cursor(self):
+        for cursor in ('not-base64!', 'WzFd', 'WyJ5ZXN0ZXJkYXkiLCAxXQ=='):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(LOGS_URL, {'cursor': cursor}).status_code, 404)
@@ -0,0 +1,79 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+
+from lab.components.Patient.patient_models import Appointment, Message, Patient, TestResult
+from lab.components.Patient.patient_serializers import TestResultListSerializer
+from lab.query_plan import plan_queryset
+
+from .utils import assert_constant_queries, make_user, unique
+
+TODAY = datetime.date(2026, 1, 5)
+
+
+def make_patient():
+    name = unique('patient')
+    return Patient.objects.create(
+        patient_id=name, first_name='Ada', last_name=name, email=f"{name}@example.com",
+        date_of_birth=datetime.date(1990, 1, 1), gender='Female',
+    )
+
+
+class PatientListQueryTests(TestCase):
+    def setUp(self):
+        self.patient = make_patient()
+
+    def add_appointments(self, count):
+        for _ in range(count):
+            Appointment.objects.create(
+                appointment_id=unique('APT'), patient=make_patient(), doctor=make_user('doctor'),
+                appointment_date=TODAY, appointment_time=datetime.time(9), reason='Checkup',
+            )
+
+    def add_messages(self, count):
+        for _ in range(count):
+            Message.objects.create(
+                message_id=unique('MSG'), sender=make_user('doctor'), recipient=make_user(),
+                patient=self.patient, subject='Results', message='Ready',
+            )
+
+    def add_test_results(self, count):
+        for _ in range(count):
+            TestResult.objects.create(
+                test_id=unique('TST'), patient=self.patient, doctor=make_user('doctor'),
+                technician=make_user('technician'), test_name='CBC', test_date=TODAY,
+            )
+
+    def test_appointment_list_runs_constant_queries(self):
+        assert_constant_queries(self.client, '/api/patient/appointments/', self.add_appointments, sizes=(2, 6))
+
+    def test_message_list_runs_constant_queries(self):
+        assert_constant_queries(self.client, '/api/patient/messages/', self.add_messages, sizes=(2, 6))
+
+    def test_test_result_list_runs_constant_queries(self):
+        assert_constant_queries(self.client, '/api/patient/test-results/', self.add_test_results, sizes=(2, 6))
+
+    def test_missing_plan_is_reported(self):
+        meta = TestResultListSerializer.Meta
+        with mock.patch.object(meta, 'select_related', None), mock.patch.object(meta, 'only', None):
+            with self.assertRaisesMessage(AssertionError, 'query count grows with row count'):
+                assert_constant_queries(
+                    self.client, '/api/patient/test-results/', self.add_test_results, sizes=(1, 3)
+                )
+
+    def test_failed_request_is_reported(self):
+        with self.assertRaisesMessage(AssertionError, 'returned 404'):
+            assert_constant_queries(self.client, '/api/patient/no-such-list/', lambda count: None)
+
+
+class PlanQuerysetTests(TestCase):
+    def test_applies_declared_relations(self):
+        queryset = plan_queryset(TestResult.objects.all(), TestResultListSerializer)
+        self.assertEqual(
+            set(queryset.query.select_related), set(TestResultListSerializer.Meta.select_related)
+        )
+
+    def test_serializer_without_meta_is_unchanged(self):
+        queryset = TestResult.objects.all()
+        self.assertIs(plan_queryset(queryset, object), queryset)
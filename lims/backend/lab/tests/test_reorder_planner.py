@@ -0,0 +1,121 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from lab.components.Inventory.inventory_models import InventoryItem, InventoryTransaction, ReorderRequest, Supplier
+from lab.components.Inventory.inventory_planner import create_reorders, plan_reorders
+
+from .utils import make_item, make_user
+
+REORDERS_URL = '/api/inventory/reorders/'
+
+
+def consume(item, quantity, days_ago):
+    entry = InventoryTransaction.objects.create(
+        item=item, transaction_type='out', quantity=-quantity, performed_by='tech'
+    )
+    InventoryTransaction.objects.filter(pk=entry.pk).update(created_at=timezone.now() - timedelta(days=days_ago))
+
+
+class ReorderPlannerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(make_user('technician', username='buyer'))
+        acme = Supplier.objects.create(name='Acme')
+        # 20/day over the last week: 5 days of stock left
+        self.surging = make_item(100, threshold=10, supplier=acme, tenant='t1')
+        consume(self.surging, 140, days_ago=2)
+        # 10/day over the month, nothing this week: still 5 days left
+        self.steady = make_item(50, threshold=10, supplier=acme, tenant='t2')
+        consume(self.steady, 300, days_ago=20)
+        # At its threshold with no consumption
+        self.idle = make_item(4, threshold=5)
+        self.healthy = make_item(500, threshold=10, supplier=acme)
+        consume(self.healthy, 30, days_ago=1)
+        self.reordered = make_item(0)
+        ReorderRequest.objects.create(item=self.reordered, requested_quantity=10, requested_by='someone')
+
+    def test_plans_items_running_out_grouped_by_supplier(self):
+        plan = plan_reorders()
+
+        self.assertEqual([group['supplier_name'] for group in plan], ['Acme', None])
+        acme = {item['item']: item for item in plan[0]['items']}
+        self.assertEqual(set(acme), {self.surging.pk, self.steady.pk})
+        self.assertEqual(acme[self.surging.pk]['daily_consumption'], 20)
+        self.assertEqual(acme[self.surging.pk]['days_to_stockout'], 5)
+        # Back to the threshold plus 37 days of consumption
+        self.assertEqual(acme[self.surging.pk]['reorder_quantity'], 11 + 20 * 37 - 100)
+        self.assertEqual(acme[self.steady.pk]['daily_consumption'], 10)
+        [idle] = plan[1]['items']
+        self.assertEqual((idle['item'], idle['days_to_stockout'], idle['reorder_quantity']), (self.idle.pk, None, 2))
+
+        self.assertEqual([item['item'] for group in plan_reorders(tenant='t2') for item in group['items']],
+                         [self.steady.pk])
+
+    def test_post_creates_requests_once(self):
+        response = self.client.post(REORDERS_URL + 'plan/', {}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()['created']), 3)
+        self.assertEqual(
+            ReorderRequest.objects.filter(requested_by='buyer', status='pending').count(), 3
+        )
+        self.assertEqual(self.client.get(REORDERS_URL + 'plan/').json(), {'plan': []})
+
+    def test_items_reordered_after_planning_are_skipped(self):
+        plan = plan_reorders()
+        ReorderRequest.objects.create(item=self.idle, requested_quantity=5, requested_by='someone')
+        created = create_reorders(plan)
+        self.assertEqual({reorder.item_id for reorder in created}, {self.surging.pk, self.steady.pk})
+
+    def test_command_dry_run_creates_nothing(self):
+        out = StringIO()
+        call_command('plan_inventory_reorders', dry_run=True, stdout=out)
+        self.assertIn('3 reorders planned (dry run)', out.getvalue())
+        self.assertEqual(ReorderRequest.objects.count(), 1)
+
+    def test_receiving_restocks_once(self):
+        reorder = ReorderRequest.objects.get(item=self.reordered)
+        url = f"{REORDERS_URL}{reorder.pk}/mark_received/"
+
+        self.assertEqual(self.client.post(url).status_code, 200)
+        self.assertEqual(self.client.post(url).status_code, 409)
+        self.reordered.refresh_from_db()
+        self.assertEqual((self.reordered.quantity, self.reordered.status), (10, 'in-stock'))
+        self.assertEqual(
+            list(InventoryTransaction.objects.filter(item=self.reordered).values_list('reference_number', flat=True)),
+            [f"REORDER-{reorder.pk}"],
+        )
+        self.assertEqual(InventoryItem.objects.get(pk=self.idle.pk).quantity, 4)
+
+
+class ConcurrentReorderTests(TransactionTestCase):
+    def create(self, plan, start):
+        """Create the planned reorders, retrying while another planner holds the database"""
+        start.wait()
+        try:
+            while True:
+                try:
+                    return len(create_reorders(plan))
+                except OperationalError:
+                    continue
+        finally:
+            connection.close()
+
+    def test_concurrent_planners_reorder_each_item_once(self):
+        items = [make_item(0) for _ in range(5)]
+        plan = plan_reorders()
+        start = threading.Barrier(4)
+        with ThreadPoolExecutor(4) as pool:
+            created = list(pool.map(lambda _: self.create(plan, start), range(4)))
+
+        self.assertEqual(sum(created), len(items))
+        self.assertEqual(
+            sorted(ReorderRequest.objects.values_list('item_id', flat=True)), sorted(item.pk for item in items)
+        )
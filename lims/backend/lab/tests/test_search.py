@@ -0,0 +1,93 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from lab.components.Receipts.receipts_models import Receipt
+from lab.components.Search.search_index import is_indexed, search
+from lab.components.Search.search_models import SearchDocument, SearchIndexState
+
+from .utils import make_tenant, make_user, unique
+
+SEARCH_URL = '/api/search/'
+RECEIPTS_URL = '/api/receipts/receipts/'
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.tenant = make_tenant()
+        self.other_tenant = make_tenant()
+        self.user = make_user('admin')
+        self.jonathan = self.receipt('Jonathan Harker', doctor='Dr Seward')
+        self.mina = self.receipt('Mina Murray', doctor='Dr Jonathan Van Helsing')
+        self.elsewhere = self.receipt('Jonathan Morris', tenant=self.other_tenant)
+
+    def receipt(self, patient_name, doctor='Dr Who', tenant=None, save=True):
+        receipt = Receipt(
+            id=unique('RCP'), patient_name=patient_name, patient_id=unique('P'), amount=10, doctor=doctor,
+            tenant=tenant or self.tenant, created_by=self.user,
+        )
+        if save:
+            receipt.save()
+        return receipt
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return [row['id'] for row in (data['results'] if isinstance(data, dict) else data)]
+
+    def test_ranks_title_matches_first_and_matches_prefixes(self):
+        response = self.client.get(SEARCH_URL, {'q': 'jonat', 'tenant': self.tenant.id})
+        self.assertEqual(self.ids(response), [self.jonathan.id, self.mina.id])
+        self.assertFalse(response.json()['fuzzy'])
+        self.assertEqual(response.json()['results'][0]['title'], 'Jonathan Harker')
+
+        self.assertEqual(len(self.ids(self.client.get(SEARCH_URL, {'q': 'jonathan', 'kind': 'receipt'}))), 3)
+
+    def test_typos_fall_back_to_similar_terms(self):
+        response = self.client.get(SEARCH_URL, {'q': 'Harkre', 'tenant': self.tenant.id})
+        self.assertEqual(self.ids(response), [self.jonathan.id])
+        self.assertTrue(response.json()['fuzzy'])
+        self.assertEqual(search('zzzz'), ([], False))
+
+    def test_signals_keep_documents_current(self):
+        self.jonathan.patient_name = 'Quincey Morris'
+        self.jonathan.save()
+        self.assertEqual([row['id'] for row in search('quincey')[0]], [self.jonathan.id])
+        self.mina.delete()
+        self.assertFalse(SearchDocument.objects.filter(object_id=self.mina.id).exists())
+        self.assertEqual(search('murray'), ([], False))
+
+    def test_list_filter_uses_the_index_only_once_rebuilt(self):
+        # bulk_create bypasses the signals, so this receipt has no document yet
+        [unindexed] = Receipt.objects.bulk_create([self.receipt('Lucy Westenra', doctor='Dr Seward', save=False)])
+        self.assertFalse(is_indexed('receipt'))
+        # The scan covers search_fields, which do not include the doctor
+        self.assertEqual(self.ids(self.client.get(RECEIPTS_URL, {'search': 'lucy'})), [unindexed.id])
+        self.assertEqual(self.ids(self.client.get(RECEIPTS_URL, {'search': 'seward'})), [])
+
+        out = StringIO()
+        call_command('rebuild_search_index', kind=['receipt'], stdout=out)
+        self.assertIn('receipt: 4 documents', out.getvalue())
+        self.assertTrue(SearchIndexState.objects.filter(kind='receipt').exists())
+        self.assertFalse(is_indexed('home_visit'))
+
+        self.assertEqual(
+            sorted(self.ids(self.client.get(RECEIPTS_URL, {'search': 'seward'}))),
+            sorted([self.jonathan.id, unindexed.id]),
+        )
+        self.assertEqual(
+            self.ids(self.client.get(RECEIPTS_URL, {'search': 'jonathan', 'tenant': self.other_tenant.id})),
+            [self.elsewhere.id],
+        )
+
+    def test_rejects_bad_parameters(self):
+        for params in ({'q': 'jonathan', 'kind': 'invoice'}, {'q': 'jonathan', 'limit': 'many'}):
+            with self.subTest(params=params):
+                response = self.client.get(SEARCH_URL, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
+        self.assertEqual(self.client.get(SEARCH_URL, {'q': '  '}).json()['results'], [])
+        with self.assertRaises(CommandError):
+            call_command('rebuild_search_index', '--batch-size=0')
+        self.assertFalse(SearchIndexState.objects.exists())
@@ -0,0 +1,55 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from lab.components.superadmin.models import BillingPlan, TenantPlan
+
+from .utils import make_tenant
+
+DASHBOARD_URL = '/api/superadmin/tenants/dashboard_stats/'
+
+
+class DashboardStatsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        basic = BillingPlan.objects.create(name='Basic', plan_type='basic', price=Decimal('10.10'), max_users=5)
+        pro = BillingPlan.objects.create(name='Pro', plan_type='premium', price=Decimal('20.20'), max_users=50)
+        for plan, status, users in [(basic, 'active', 3), (pro, 'active', 4), (pro, 'suspended', 5)]:
+            TenantPlan.objects.create(tenant=make_tenant(status=status, current_users=users), billing_plan=plan)
+        make_tenant(current_users=1)
+
+    def test_totals_come_from_one_query_and_are_cached(self):
+        with self.assertNumQueries(1):
+            data = self.client.get(DASHBOARD_URL).json()
+        self.assertEqual(data['total_tenants'], 4)
+        self.assertEqual(data['active_tenants'], 3)
+        self.assertEqual(data['total_users'], 13)
+        self.assertEqual(data['total_revenue'], '30.30')
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(DASHBOARD_URL).json(), data)
+
+    def test_filters_are_part_of_the_snapshot(self):
+        self.client.get(DASHBOARD_URL)
+        data = self.client.get(DASHBOARD_URL, {'status': 'suspended'}).json()
+        self.assertEqual((data['total_tenants'], data['total_revenue']), (1, '0.00'))
+
+    def test_tenant_writes_retire_snapshots(self):
+        self.client.get(DASHBOARD_URL)
+        make_tenant(current_users=10)
+        self.assertEqual(self.client.get(DASHBOARD_URL).json()['total_users'], 23)
+
+    def test_refresh_bypasses_the_cache(self):
+        self.client.get(DASHBOARD_URL)
+        with self.assertNumQueries(1):
+            self.client.get(DASHBOARD_URL, {'refresh': 'true'})
+
+
+class EmptyDashboardTests(TestCase):
+    def test_no_tenants_reports_zeros(self):
+        cache.clear()
+        data = self.client.get(DASHBOARD_URL).json()
+        self.assertEqual(
+            (data['total_tenants'], data['total_users'], data['total_revenue']), (0, 0, '0.00')
+        )
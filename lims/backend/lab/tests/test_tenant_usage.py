@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.test import TestCase
+
+from lab.components.superadmin.models import UsageMetrics
+
+from .utils import make_tenant
+
+USAGE_URL = '/api/superadmin/usage/tenant_usage/'
+
+
+def record(tenant, day, users, tests, reports=0):
+    UsageMetrics.objects.create(
+        tenant=tenant, date=date(2026, 5, day), active_users=users, total_tests=tests, total_reports=reports,
+    )
+
+
+class TenantUsageTests(TestCase):
+    def setUp(self):
+        self.alpha = make_tenant(company_name='Alpha')
+        record(self.alpha, 1, users=3, tests=40)
+        record(self.alpha, 2, users=4, tests=50, reports=7)
+        self.beta = make_tenant(company_name='Beta')
+        record(self.beta, 2, users=9, tests=10)
+        suspended = make_tenant(company_name='Gamma', status='suspended')
+        record(suspended, 2, users=1, tests=1)
+        make_tenant(company_name='Delta')
+
+    def test_latest_period_and_growth_in_one_query(self):
+        with self.assertNumQueries(1):
+            data = self.client.get(USAGE_URL).json()
+        self.assertEqual(data, [
+            {'tenant_name': 'Alpha', 'users': 4, 'tests': 50, 'reports': 7, 'growth': 25.0},
+            {'tenant_name': 'Beta', 'users': 9, 'tests': 10, 'reports': 0, 'growth': None},
+        ])
+
+    def test_ordering_puts_missing_growth_last(self):
+        data = self.client.get(USAGE_URL, {'ordering': '-users'}).json()
+        self.assertEqual([row['tenant_name'] for row in data], ['Beta', 'Alpha'])
+        data = self.client.get(USAGE_URL, {'ordering': '-growth'}).json()
+        self.assertEqual([row['tenant_name'] for row in data], ['Alpha', 'Beta'])
+
+    def test_pagination_is_opt_in(self):
+        data = self.client.get(USAGE_URL, {'page_size': 1}).json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual([row['tenant_name'] for row in data['results']], ['Alpha'])
+
+    def test_unknown_ordering_is_rejected(self):
+        response = self.client.get(USAGE_URL, {'ordering': 'api_calls'})
+        self.assertEqual(response.status_code, 400)
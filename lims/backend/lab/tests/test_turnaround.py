@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from lab.components.Analytics.analytics_turnaround import percentiles, timelines
+from lab.components.Doctor.NewTestRequest.NewTestRequest_models import TestRequest
+from lab.models import Sample, TestResult
+
+from .utils import unique
+
+TURNAROUND_URL = '/api/analytics/lab-analytics/turnaround/'
+
+
+def order(hours, priority='Normal', tenant_id='t1', received_after=timedelta(hours=1)):
+    """A request completed ``hours`` after it was created"""
+    test_request = TestRequest.objects.create(priority=priority)
+    sample = Sample.objects.create(
+        id=unique('S'), patient_id='P1', test_request_id=str(test_request.pk), sample_type='blood',
+        collection_date=test_request.created_at, tenant_id=tenant_id,
+        received_date=test_request.created_at + received_after if received_after else None,
+    )
+    TestResult.objects.create(
+        id=unique('R'), sample=sample, test_name='CBC',
+        completion_date=test_request.created_at + timedelta(hours=hours),
+    )
+    return test_request
+
+
+class TurnaroundTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        for hours in range(1, 11):
+            order(hours, priority='Urgent' if hours <= 2 else 'Normal')
+
+    def test_nearest_rank_percentiles(self):
+        [overall] = percentiles(timelines())
+        self.assertEqual(overall['count'], 10)
+        self.assertEqual(
+            (overall['p50'], overall['p90'], overall['p99']),
+            (timedelta(hours=5), timedelta(hours=9), timedelta(hours=10)),
+        )
+
+        by_priority = {group['key']: group for group in percentiles(timelines(), dimension='priority')}
+        self.assertEqual(by_priority['Urgent']['count'], 2)
+        self.assertEqual(by_priority['Urgent']['p50'], timedelta(hours=1))
+        self.assertEqual(by_priority['Normal']['p99'], timedelta(hours=10))
+
+    def test_segments_skip_orders_missing_a_timestamp(self):
+        order(20, received_after=None)
+        [analytical] = percentiles(timelines(), segment='analytical')
+        self.assertEqual(analytical['count'], 10)
+        self.assertEqual(analytical['p50'], timedelta(hours=4))
+        [total] = percentiles(timelines(), segment='total')
+        self.assertEqual(total['count'], 11)
+
+    def test_endpoint_reports_and_caches(self):
+        response = self.client.get(TURNAROUND_URL, {'group_by': 'tenant'})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['overall']['count'], 10)
+        self.assertEqual(data['overall']['p50'], '05:00:00')
+        self.assertEqual([group['key'] for group in data['by_tenant']], ['t1'])
+        self.assertNotIn('by_priority', data)
+
+        order(30)
+        with self.assertNumQueries(0):
+            cached = self.client.get(TURNAROUND_URL, {'group_by': 'tenant'}).json()
+        self.assertEqual(cached['overall']['count'], 10)
+        fresh = self.client.get(TURNAROUND_URL, {'group_by': 'tenant', 'refresh': 'true'}).json()
+        self.assertEqual(fresh['overall']['count'], 11)
+
+    def test_window_excludes_older_orders(self):
+        old = order(50)
+        TestRequest.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=60))
+        data = self.client.get(TURNAROUND_URL, {'days': 30}).json()
+        self.assertEqual(data['overall']['count'], 10)
+
+    def test_rejects_unknown_parameters(self):
+        for params in ({'segment': 'billing'}, {'group_by': 'priority,doctor'}, {'days': 'week'}):
+            with self.subTest(params=params):
+                response = self.client.get(TURNAROUND_URL, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('error', response.json())
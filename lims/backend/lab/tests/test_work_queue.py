@@ -0,0 +1,155 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.db import OperationalError, connection
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from lab.components.Notifications import notification_dispatch
+from lab.components.Technician import work_queue
+from lab.components.Technician.work_queue import SAMPLE_QUEUE, claim_next, queued
+from lab.models import LabWorkflow, Sample
+
+from .utils import make_user, unique
+
+SAMPLES_URL = '/api/technician/samples/'
+WORKFLOWS_URL = '/api/technician/workflows/'
+
+
+def received(priority='routine', hours_ago=0, **fields):
+    received_date = timezone.now() - timedelta(hours=hours_ago)
+    return Sample.objects.create(
+        id=unique('S'), patient_id='P1', sample_type='blood', status='received', priority=priority,
+        collection_date=received_date, received_date=received_date, **fields
+    )
+
+
+class WorkQueueTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        # Due 1 hour ago, in 30 minutes (expiry), in 1 hour and in 4 hours
+        self.overdue = received('routine', hours_ago=25)
+        self.expiring = received('routine', expiry_date=now + timedelta(minutes=30))
+        self.stat = received('stat', tenant_id='t1')
+        self.urgent = received('urgent')
+        done = received('stat', hours_ago=2)
+        Sample.objects.filter(pk=done.pk).update(status='completed')
+
+    def claim(self, claimed_by='alice', **data):
+        return self.client.post(SAMPLES_URL + 'claim_next/', {'claimed_by': claimed_by, **data},
+                                content_type='application/json')
+
+    def test_queue_serves_earliest_due_first(self):
+        ids = [row['id'] for row in self.client.get(SAMPLES_URL + 'queue/').json()]
+        self.assertEqual(ids, [self.overdue.id, self.expiring.id, self.stat.id, self.urgent.id])
+        self.assertEqual(len(self.client.get(SAMPLES_URL + 'queue/', {'limit': 2}).json()), 2)
+
+    def test_claims_lease_items_in_order(self):
+        self.assertEqual(self.claim('alice').json()['id'], self.overdue.id)
+        self.assertEqual(self.claim('bob').json()['id'], self.expiring.id)
+        self.assertEqual(self.claim('carol', tenant='t1').json()['id'], self.stat.id)
+
+        sample = Sample.objects.get(pk=self.overdue.id)
+        self.assertEqual(sample.claimed_by, 'alice')
+        self.assertGreater(sample.lease_expires_at, timezone.now())
+        ids = [row['id'] for row in self.client.get(SAMPLES_URL + 'queue/').json()]
+        self.assertEqual(ids, [self.urgent.id])
+
+    def test_expired_leases_return_to_the_queue(self):
+        self.claim('alice')
+        Sample.objects.filter(pk=self.overdue.id).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(self.claim('bob').json()['id'], self.overdue.id)
+        response = self.client.post(f"{SAMPLES_URL}{self.overdue.id}/renew_lease/", {'claimed_by': 'alice'},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 409)
+
+    def test_renew_and_release_need_the_lease(self):
+        user = make_user('technician', username='alice')
+        self.client.force_login(user)
+        self.assertEqual(self.client.post(SAMPLES_URL + 'claim_next/').json()['id'], self.overdue.id)
+        url = f"{SAMPLES_URL}{self.overdue.id}/"
+
+        self.assertEqual(self.client.post(url + 'renew_lease/').status_code, 200)
+        self.assertEqual(self.client.post(url + 'release/').status_code, 200)
+        self.assertEqual(self.client.post(url + 'release/').status_code, 409)
+        self.assertIsNone(Sample.objects.get(pk=self.overdue.id).claimed_by)
+
+    def test_users_cannot_act_on_each_others_leases(self):
+        alice = make_user('technician', username='alice')
+        bob = make_user('technician', username='bob')
+        self.client.force_login(alice)
+        self.client.post(SAMPLES_URL + 'claim_next/')
+        url = f"{SAMPLES_URL}{self.overdue.id}/"
+
+        self.client.force_login(bob)
+        for action in ('renew_lease/', 'release/'):
+            with self.subTest(action=action):
+                self.assertEqual(self.client.post(url + action).status_code, 409)
+                response = self.client.post(
+                    url + action, {'claimed_by': alice.get_username()}, content_type='application/json'
+                )
+                self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.claim(alice.get_username()).status_code, 403)
+
+        self.assertEqual(Sample.objects.get(pk=self.overdue.id).claimed_by, alice.get_username())
+        self.assertEqual(self.claim(bob.get_username()).json()['id'], self.expiring.id)
+
+    def test_claim_errors(self):
+        self.assertEqual(self.client.post(SAMPLES_URL + 'claim_next/').status_code, 400)
+        self.assertEqual(self.client.get(SAMPLES_URL + 'queue/', {'limit': 'all'}).status_code, 400)
+        self.assertEqual(self.claim(tenant='t2').status_code, 204)
+
+    def test_update_recomputes_due_time(self):
+        Sample.objects.filter(pk=self.urgent.pk).update(priority='emergency')
+        urgent = Sample.objects.get(pk=self.urgent.pk)
+        self.assertEqual(urgent.queue_due_at, urgent.received_date + timedelta(minutes=15))
+        self.assertEqual(queued(SAMPLE_QUEUE)[1].pk, self.urgent.pk)
+
+        Sample.objects.filter(pk=self.stat.pk).update(received_date=self.stat.received_date - timedelta(days=1))
+        self.assertEqual(queued(SAMPLE_QUEUE)[0].pk, self.stat.pk)
+
+    def test_workflows_respect_due_dates(self):
+        now = timezone.now()
+        later = LabWorkflow.objects.create(id=unique('W'), workflow_type='sample_processing', title='Panel', priority='stat')
+        sooner = LabWorkflow.objects.create(
+            id=unique('W'), workflow_type='sample_processing', title='Recheck', due_date=now + timedelta(minutes=10)
+        )
+        ids = [row['id'] for row in self.client.get(WORKFLOWS_URL + 'queue/').json()]
+        self.assertEqual(ids, [sooner.id, later.id])
+
+
+# Outbox workers would compete with the claimers for the database
+@mock.patch.object(notification_dispatch, 'OUTBOX_WORKERS', 0)
+class ConcurrentClaimTests(TransactionTestCase):
+    def claim_all(self, claimed_by, start):
+        """Claim items until the queue is empty, retrying while the database is locked"""
+        start.wait()
+        claimed = []
+        try:
+            while True:
+                try:
+                    item = claim_next(SAMPLE_QUEUE, claimed_by)
+                except OperationalError:
+                    continue
+                if item is None:
+                    return claimed
+                claimed.append(item.pk)
+        finally:
+            connection.close()
+
+    def test_each_item_is_leased_once(self):
+        samples = {received().pk for _ in range(40)}
+        workers = [f"tech{number}" for number in range(6)]
+        start = threading.Barrier(len(workers))
+        with mock.patch.object(work_queue, 'CLAIM_ATTEMPTS', 100), ThreadPoolExecutor(len(workers)) as pool:
+            claims = dict(zip(workers, pool.map(lambda worker: self.claim_all(worker, start), workers)))
+
+        claimed = [pk for items in claims.values() for pk in items]
+        self.assertEqual(sorted(claimed), sorted(samples))
+        leases = dict(Sample.objects.values_list('pk', 'claimed_by'))
+        for worker, items in claims.items():
+            for pk in items:
+                self.assertEqual(leases[pk], worker)
@@ -0,0 +1,117 @@
+"""
+Shared helpers for the lab test suite.
+
+``make_tenant``, ``make_user`` and ``make_item`` create the rows most tests need,
+``shared_cache`` stands in for a cache that every worker sees and
+``temporary_media`` points file storage at a scratch directory.
+``assert_constant_queries`` fails when the number of queries an endpoint runs
+grows with the number of rows it returns.
+"""
+import itertools
+import re
+import tempfile
+from collections import Counter
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.core.cache import cache
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+_sequence = itertools.count(1)
+
+
+# ------------------------
+# Factories
+# ------------------------
+def unique(prefix='x'):
+    return f"{prefix}{next(_sequence)}"
+
+
+def make_tenant(**fields):
+    from lab.components.superadmin.models import Tenant
+
+    name = unique('tenant')
+    defaults = {'company_name': name, 'domain': name, 'email': f"{name}@example.com", 'created_by': 'tests'}
+    defaults.update(fields)
+    return Tenant.objects.create(**defaults)
+
+
+def make_user(role='patient', password=None, **fields):
+    name = unique(role.replace('-', ''))
+    defaults = {'username': name, 'email': f"{name}@example.com", 'role': role}
+    defaults.update(fields)
+    user = get_user_model()(**defaults)
+    user.set_password(password)
+    user.save()
+    return user
+
+
+def make_item(quantity, threshold=5, **fields):
+    from lab.components.Inventory.inventory_models import InventoryCategory, InventoryItem
+
+    category, _ = InventoryCategory.objects.get_or_create(name='Reagents')
+    return InventoryItem.objects.create(
+        name=unique('item'), category=category, quantity=quantity, threshold=threshold, **fields
+    )
+
+
+@contextmanager
+def shared_cache():
+    """Run with a file-based cache, which lab.cache_utils treats as shared"""
+    with tempfile.TemporaryDirectory() as location, override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+    }):
+        yield
+        cache.clear()
+
+
+@contextmanager
+def temporary_media():
+    """Run with MEDIA_ROOT in a directory removed afterwards; yields its path"""
+    with tempfile.TemporaryDirectory() as location, override_settings(MEDIA_ROOT=location):
+        yield location
+
+
+# ------------------------
+# Query count checks
+# ------------------------
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def _shape(sql):
+    # The statement without its literal values, so per-row queries compare equal
+    return _LITERAL.sub('?', sql)
+
+
+def assert_constant_queries(client, url, add_rows, sizes=(1, 5), using='default'):
+    """
+    Fail if ``GET url`` runs more queries as it returns more rows.
+
+    ``add_rows(count)`` must create ``count`` more rows visible at ``url``;
+    it is called to grow the result to each of ``sizes`` in turn. Returns the
+    query count, which is the same for every size.
+    """
+    counts = {}
+    statements = {}
+    created = 0
+    for size in sorted(sizes):
+        add_rows(size - created)
+        created = size
+        with CaptureQueriesContext(connections[using]) as captured:
+            response = client.get(url)
+        if response.status_code != 200:
+            raise AssertionError(f"GET {url} returned {response.status_code}")
+        counts[size] = len(captured.captured_queries)
+        statements[size] = [_shape(query['sql']) for query in captured.captured_queries]
+
+    if len(set(counts.values())) > 1:
+        largest = max(sizes)
+        repeated = Counter(statements[largest]).most_common(1)[0][0]
+        raise AssertionError(
+            f"GET {url} query count grows with row count: "
+            + ', '.join(f"{size} rows -> {count} queries" for size, count in counts.items())
+            + f". Most repeated query: {repeated}"
+        )
+    return counts[max(sizes)]